@@ -1,14 +1,20 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.http import HttpResponse
 
-from .models import Booking
+from core.pagination import LargeTablePaginator
+from core.search import IndexedSearchAdmin
+
+from .models import ArchivedBooking, Booking, DailyRoomTypeStats, RatePlan, RoomNight
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(IndexedSearchAdmin):
 	list_display = (
 		"booking_reference",
 		"full_name",
 		"room_type",
+		"room",
+		"check_in",
 		"booking_days",
 		"airport_pick_drop",
 		"total_price",
@@ -16,9 +22,26 @@ class BookingAdmin(admin.ModelAdmin):
 		"created_at",
 	)
 	list_filter = ("room_type", "status", "airport_pick_drop")
+	list_select_related = ("room",)
+	# The changelist reads only the columns it shows; see get_paginator.
+	list_only = (
+		"booking_reference",
+		"full_name",
+		"room_type",
+		"room__number",
+		"check_in",
+		"booking_days",
+		"airport_pick_drop",
+		"total_price",
+		"status",
+		"created_at",
+	)
+	paginator = LargeTablePaginator
+	show_full_result_count = False
 	search_fields = ("booking_reference", "full_name", "email", "phone_number")
 	readonly_fields = ("booking_reference", "total_price", "created_at", "updated_at")
 	autocomplete_fields = ("room",)
+	actions = ("confirm_bookings", "cancel_bookings", "preview_repricing", "reprice_bookings")
 	fieldsets = (
 		(
 			"Guest details",
@@ -40,6 +63,7 @@ class BookingAdmin(admin.ModelAdmin):
 				"fields": (
 					"room_type",
 					"room",
+					"check_in",
 					"booking_days",
 					"airport_pick_drop",
 					"total_price",
@@ -53,3 +77,94 @@ class BookingAdmin(admin.ModelAdmin):
 			{"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
 		),
 	)
+
+	@admin.action(description="Confirm selected bookings", permissions=("change",))
+	def confirm_bookings(self, request, queryset):
+		waiting = queryset.exclude(status="confirmed").count()
+		confirmed = queryset.confirm()
+		self.message_user(request, f"{confirmed} booking(s) confirmed.", messages.SUCCESS)
+		if confirmed < waiting:
+			self.message_user(
+				request,
+				f"{waiting - confirmed} booking(s) left as they were: no room of their type is free for the whole stay.",
+				messages.WARNING,
+			)
+
+	@admin.action(description="Cancel selected bookings", permissions=("change",))
+	def cancel_bookings(self, request, queryset):
+		cancelled = queryset.cancel()
+		self.message_user(request, f"{cancelled} booking(s) cancelled and their rooms released.", messages.SUCCESS)
+
+	@admin.action(description="Preview repricing of selected pending bookings (CSV diff)", permissions=("change",))
+	def preview_repricing(self, request, queryset):
+		response = HttpResponse(content_type="text/csv")
+		response["Content-Disposition"] = 'attachment; filename="repricing.csv"'
+		queryset.reprice(dry_run=True, diff=response)
+		return response
+
+	@admin.action(description="Reprice selected pending bookings at current rates", permissions=("change",))
+	def reprice_bookings(self, request, queryset):
+		result = queryset.reprice()
+		self.message_user(
+			request, f"{result.bookings} pending booking(s) repriced ({result.revenue:+,} PKR).", messages.SUCCESS
+		)
+
+	def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+		return self.paginator(queryset.only(*self.list_only), per_page, orphans, allow_empty_first_page)
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+	list_display = ("booking_reference", "full_name", "room_type", "check_in", "booking_days", "total_price", "status", "archived_at")
+	list_filter = ("room_type", "status")
+	list_select_related = ("room",)
+	search_fields = ("=booking_reference", "full_name", "email")
+
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
+
+
+@admin.register(RoomNight)
+class RoomNightAdmin(admin.ModelAdmin):
+	list_display = ("date", "room", "room_type", "booking")
+	list_filter = ("room_type",)
+	date_hierarchy = "date"
+	list_select_related = ("room", "booking")
+	raw_id_fields = ("room", "booking")
+
+
+@admin.register(DailyRoomTypeStats)
+class DailyRoomTypeStatsAdmin(admin.ModelAdmin):
+	list_display = ("date", "room_type", "bookings", "nights_sold", "revenue", "airport_transfers", "cancellations")
+	list_filter = ("room_type",)
+	date_hierarchy = "date"
+
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
+
+
+@admin.register(RatePlan)
+class RatePlanAdmin(admin.ModelAdmin):
+	list_display = (
+		"name",
+		"kind",
+		"room_type",
+		"start_date",
+		"end_date",
+		"days",
+		"min_nights",
+		"percent_change",
+		"is_active",
+	)
+	list_filter = ("kind", "room_type", "is_active")
+	search_fields = ("name",)
+
+	@admin.display(description="Weekdays")
+	def days(self, obj):
+		return ", ".join(RatePlan.WEEKDAY_NAMES[day] for day in obj.weekdays) or "All"
@@ -0,0 +1,49 @@
+"""Async versions of the public booking pages, routed when served through ASGI.
+
+See ``core.async_views``; the payloads and templates are the synchronous views'.
+"""
+
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from core import counters
+from core.async_views import arender
+from core.cache import acached_section
+from core.forms import AvailabilityForm
+from core.http import cacheable_json
+
+from . import inventory, views
+from .models import ArchivedBooking, Booking
+
+
+async def booking_confirmation(request, reference):
+    booking = await Booking.objects.select_related("room").filter(booking_reference=reference).afirst()
+    if booking is None:
+        booking = await ArchivedBooking.objects.select_related("room").filter(booking_reference=reference).afirst()
+    if booking is None:
+        raise Http404("No booking matches the given reference.")
+    context = {
+        "booking": booking,
+        "airport_charge": Booking.AIRPORT_CHARGE,
+    }
+    return await arender(request, "bookings/booking_confirmation.html", context)
+
+
+async def _tonight_availability():
+    check_in, check_out = inventory.tonight_range()
+    return views._availability_payload(check_in, check_out, await counters.aavailability_by_type())
+
+
+@require_GET
+async def availability_api(request):
+    """Rooms free per type, tonight by default or for ``check_in``/``check_out``."""
+    if "check_in" not in request.GET:
+        payload = await acached_section("availability", _tonight_availability)
+    else:
+        form = AvailabilityForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        check_in, check_out = form.stay()
+        by_type = await inventory.aavailability_by_type(check_in, check_out)
+        payload = views._availability_payload(check_in, check_out, by_type)
+    return cacheable_json(request, payload, views.AVAILABILITY_MAX_AGE, views.AVAILABILITY_S_MAXAGE)
@@ -1,8 +1,10 @@
 from django import forms
+from django.utils import timezone
 
 from core.forms import StyledFormMixin
 from core.models import Room
 
+from . import pricing
 from .models import Booking
 
 
@@ -12,30 +14,88 @@ class BookingForm(StyledFormMixin, forms.ModelForm):
         fields = (
             "full_name",
             "cnic",
+            "email",
             "address",
             "room_type",
+            "check_in",
             "booking_days",
             "airport_pick_drop",
         )
         widgets = {
             "full_name": forms.TextInput(attrs={"placeholder": "Guest full name"}),
             "cnic": forms.TextInput(attrs={"placeholder": "13-digit CNIC"}),
+            "email": forms.EmailInput(attrs={"placeholder": "you@example.com"}),
             "address": forms.Textarea(attrs={"rows": 3, "placeholder": "Residential address"}),
+            "check_in": forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
             "booking_days": forms.NumberInput(attrs={"min": 1, "max": 7, "value": 1}),
         }
         labels = {
             "cnic": "CNIC",
+            "check_in": "Check-in date",
             "airport_pick_drop": "Add Airport Pick & Drop (Rs. 7,000)",
         }
 
+    def __init__(self, *args, room_types=None, **kwargs):
+        # Callers validating many rows can pass the set of stocked room types
+        # up front instead of paying one EXISTS query per form.
+        self.room_types = room_types
+        super().__init__(*args, **kwargs)
+
     def clean_room_type(self):
         room_type = self.cleaned_data.get("room_type")
-        if room_type and not Room.objects.filter(room_type=room_type).exists():
+        if self.room_types is not None:
+            stocked = room_type in self.room_types
+        else:
+            stocked = not room_type or Room.objects.filter(room_type=room_type).exists()
+        if room_type and not stocked:
             raise forms.ValidationError("This room type is currently unavailable. Please choose another category or contact concierge.")
         return room_type
 
+    def clean_check_in(self):
+        check_in = self.cleaned_data.get("check_in")
+        if check_in and check_in < timezone.localdate():
+            raise forms.ValidationError("Check-in date cannot be in the past.")
+        return check_in
+
     def clean_booking_days(self):
         days = self.cleaned_data.get("booking_days")
         if days and not 1 <= days <= 7:
             raise forms.ValidationError("Bookings can be made for 1 to 7 days.")
         return days
+
+
+class BookingImportForm(BookingForm):
+    """``BookingForm`` rules for reservations migrated from other systems.
+
+    Imported rows may describe past stays and carry contact details, status
+    and notes that the public form does not collect.
+    """
+
+    class Meta(BookingForm.Meta):
+        fields = BookingForm.Meta.fields + ("phone_number", "status", "notes")
+
+    def clean_check_in(self):
+        return self.cleaned_data.get("check_in")
+
+
+class QuoteForm(forms.Form):
+    """Query parameters for the price quote endpoint."""
+
+    room_type = forms.ChoiceField(choices=Booking.ROOM_TYPE_CHOICES)
+    check_in = forms.DateField(required=False)
+    nights = forms.IntegerField(min_value=1, max_value=7, initial=1)
+    airport = forms.BooleanField(required=False)
+
+    def clean_check_in(self):
+        return self.cleaned_data.get("check_in") or timezone.localdate()
+
+
+class QuoteTableForm(QuoteForm):
+    """Query parameters for quoting every room type and stay length at once."""
+
+    room_type = None
+    nights = forms.IntegerField(min_value=1, max_value=pricing.MAX_QUOTE_NIGHTS, required=False)
+    airport = None
+
+    def clean_nights(self):
+        return self.cleaned_data.get("nights") or pricing.MAX_QUOTE_NIGHTS
@@ -0,0 +1,313 @@
+"""Nightly room inventory.
+
+Every occupied night is a ``RoomNight`` row, unique per (room, date). Range
+availability questions become index range scans over that table instead of
+scans over ``Booking``, and the unique constraint guarantees a room can never
+be sold twice for the same night.
+"""
+
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from core import counters
+from core.models import Room
+
+from .models import RoomNight
+
+# Concurrent requests pick randomly among this many free rooms instead of all
+# fighting over the lowest room number.
+ALLOCATION_SPREAD = 8
+CLAIM_ATTEMPTS = 5
+
+
+def stay_dates(check_in: date, nights: int) -> List[date]:
+    """Return each night covered by a stay starting on ``check_in``."""
+    return [check_in + timedelta(days=offset) for offset in range(nights)]
+
+
+def tonight_range(on: Optional[date] = None):
+    """Return the (check_in, check_out) pair covering a single night."""
+    start = on or timezone.localdate()
+    return start, start + timedelta(days=1)
+
+
+def occupied_nights(check_in: date, check_out: date, room=OuterRef("pk")):
+    return RoomNight.objects.filter(room=room, date__gte=check_in, date__lt=check_out)
+
+
+def free_rooms(room_type: str, check_in: date, check_out: date):
+    """Rooms of ``room_type`` with no occupied night in ``[check_in, check_out)``."""
+    return (
+        Room.objects.filter(room_type=room_type)
+        .exclude(Exists(occupied_nights(check_in, check_out)))
+        .order_by("number")
+    )
+
+
+def annotate_free(queryset, check_in: date, check_out: date):
+    """Annotate each room with ``is_free`` for the requested stay."""
+    return queryset.annotate(is_free=~Exists(occupied_nights(check_in, check_out)))
+
+
+def _totals_query():
+    return Room.objects.order_by().values_list("room_type").annotate(total=Count("id"))
+
+
+def _booked_query(check_in: date, check_out: date):
+    return (
+        RoomNight.objects.filter(date__gte=check_in, date__lt=check_out)
+        .order_by()
+        .values_list("room_type")
+        .annotate(rooms=Count("room", distinct=True))
+    )
+
+
+def _by_type(totals, booked) -> Dict[str, Dict[str, int]]:
+    return {
+        code: {
+            "total": total,
+            "booked": booked.get(code, 0),
+            "available": max(total - booked.get(code, 0), 0),
+        }
+        for code, total in totals.items()
+    }
+
+
+def availability_by_type(check_in: date, check_out: date) -> Dict[str, Dict[str, int]]:
+    """Return total, booked and available room counts per room type for a stay.
+
+    A room counts as booked if any night in the range is occupied. The answer
+    comes from two grouped queries regardless of how many room types exist.
+    """
+    return _by_type(dict(_totals_query()), dict(_booked_query(check_in, check_out)))
+
+
+async def aavailability_by_type(check_in: date, check_out: date) -> Dict[str, Dict[str, int]]:
+    """``availability_by_type`` for async views."""
+    totals = {code: total async for code, total in _totals_query()}
+    booked = {code: rooms async for code, rooms in _booked_query(check_in, check_out)}
+    return _by_type(totals, booked)
+
+
+def pick_room(room_type: str, check_in: date, check_out: date, exclude: Iterable[int] = ()):
+    """Choose one free room at random from the first few candidates, or ``None``."""
+    candidates = list(
+        free_rooms(room_type, check_in, check_out)
+        .exclude(pk__in=list(exclude))
+        .values_list("pk", flat=True)[:ALLOCATION_SPREAD]
+    )
+    return random.choice(candidates) if candidates else None
+
+
+def claim_subquery(room_type: str, check_in: date, check_out: date) -> Subquery:
+    """``pick_room`` as a subquery, for use as the ``room_id`` of a booking INSERT.
+
+    Choosing the room and writing the booking then take one statement; the
+    nights INSERT that follows still guards against concurrent claims.
+    """
+    candidates = free_rooms(room_type, check_in, check_out).values("pk")[:ALLOCATION_SPREAD]
+    return Subquery(Room.objects.filter(pk__in=Subquery(candidates)).order_by("?").values("pk")[:1])
+
+
+def covers_tonight(booking, on: Optional[date] = None) -> bool:
+    check_in, _ = tonight_range(on)
+    return booking.check_in <= check_in < booking.check_out
+
+
+def nights_for(booking) -> List[RoomNight]:
+    return [
+        RoomNight(room_id=booking.room_id, booking=booking, room_type=booking.room_type, date=night)
+        for night in stay_dates(booking.check_in, booking.booking_days)
+    ]
+
+
+def allocate_rooms(bookings, claimed: Optional[Dict[date, set]] = None) -> int:
+    """Assign rooms to a batch of unsaved bookings from a single inventory read.
+
+    Bookings that already carry a room keep it and block its nights for the
+    rest of the batch. ``claimed`` maps nights to room ids taken outside the
+    database, such as earlier batches of a dry run; the batch's own nights
+    are added to it. The chosen ``Room`` objects are attached (with only
+    their type loaded) so later use of ``booking.room`` needs no extra query.
+    Returns the number of bookings that received a room.
+    """
+    active = [booking for booking in bookings if booking.status != "cancelled"]
+    pending = [booking for booking in active if not booking.room_id]
+    if not pending:
+        _record_claims(active, claimed)
+        return 0
+    start = min(booking.check_in for booking in active)
+    end = max(booking.check_out for booking in active)
+    room_types = {booking.room_type for booking in pending}
+
+    rooms_by_type = defaultdict(list)
+    for room in Room.objects.filter(room_type__in=room_types).only("pk", "room_type").order_by("number"):
+        rooms_by_type[room.room_type].append(room)
+    occupied = defaultdict(set)
+    for night, room_id in RoomNight.objects.filter(
+        room_type__in=room_types, date__gte=start, date__lt=end
+    ).values_list("date", "room_id"):
+        occupied[night].add(room_id)
+    for night, room_ids in (claimed or {}).items():
+        if start <= night < end:
+            occupied[night] |= room_ids
+    for booking in active:
+        if booking.room_id:
+            for night in stay_dates(booking.check_in, booking.booking_days):
+                occupied[night].add(booking.room_id)
+
+    # Scan each type's rooms circularly from where the last fit was found, so
+    # a mostly-full front of the list is not rescanned for every booking.
+    hints = defaultdict(int)
+    assigned = 0
+    for booking in pending:
+        rooms = rooms_by_type.get(booking.room_type, [])
+        nights = stay_dates(booking.check_in, booking.booking_days)
+        for step in range(len(rooms)):
+            index = (hints[booking.room_type] + step) % len(rooms)
+            room = rooms[index]
+            if all(room.pk not in occupied[night] for night in nights):
+                booking.room = room
+                for night in nights:
+                    occupied[night].add(room.pk)
+                hints[booking.room_type] = index
+                assigned += 1
+                break
+    _record_claims(active, claimed)
+    return assigned
+
+
+def _record_claims(bookings, claimed: Optional[Dict[date, set]]):
+    if claimed is None:
+        return
+    for booking in bookings:
+        if booking.room_id:
+            for night in stay_dates(booking.check_in, booking.booking_days):
+                claimed.setdefault(night, set()).add(booking.room_id)
+
+
+def drop_taken_rooms(bookings) -> int:
+    """Unassign the room of each booking whose room is no longer free for its stay.
+
+    For bookings that hold no nights but keep a room from before, such as
+    cancelled ones being reinstated. One inventory read decides them all;
+    earlier bookings in the batch win a shared room. Returns the number of
+    rooms dropped, which ``allocate_rooms`` can then replace.
+    """
+    held = [booking for booking in bookings if booking.room_id]
+    if not held:
+        return 0
+    occupied = set(
+        RoomNight.objects.filter(
+            room_id__in={booking.room_id for booking in held},
+            date__gte=min(booking.check_in for booking in held),
+            date__lt=max(booking.check_out for booking in held),
+        ).order_by().values_list("room_id", "date")
+    )
+    dropped = 0
+    for booking in held:
+        nights = {(booking.room_id, night) for night in stay_dates(booking.check_in, booking.booking_days)}
+        if occupied.isdisjoint(nights):
+            occupied |= nights
+        else:
+            booking.room = None
+            dropped += 1
+    return dropped
+
+
+def reserve_batch(bookings):
+    """Write the nights for a batch of saved bookings and refresh the affected rooms."""
+    active = [booking for booking in bookings if booking.room_id and booking.status != "cancelled"]
+    RoomNight.objects.bulk_create(
+        (night for booking in active for night in nights_for(booking)), batch_size=2000
+    )
+    touched = {booking.room_id for booking in active}
+    if touched:
+        sync_room_flags(touched)
+
+
+def claim_nights(booking) -> bool:
+    """Insert the booking's nights, the step that actually reserves the room.
+
+    The unique (room, date) constraint makes the INSERT a conditional claim: if
+    a concurrent booking took one of the nights first it fails, and an
+    automatically assigned booking moves on to another free room. A room
+    chosen explicitly (e.g. by staff in the admin) is never swapped silently,
+    so the ``IntegrityError`` propagates instead.
+    """
+    tried = set()
+    for _ in range(CLAIM_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                RoomNight.objects.bulk_create(nights_for(booking))
+            return True
+        except IntegrityError:
+            if not getattr(booking, "_room_auto_assigned", False):
+                raise
+            tried.add(booking.room_id)
+            booking.room_id = pick_room(booking.room_type, booking.check_in, booking.check_out, exclude=tried)
+            if booking.room_id is None:
+                return False
+    booking.room_id = None
+    return False
+
+
+def sync_booking_nights(booking, is_new: bool = False):
+    """Make the booking's ``RoomNight`` rows match its room, dates and status."""
+    previous_rooms = set()
+    if not is_new:
+        previous_rooms = set(
+            RoomNight.objects.filter(booking=booking).values_list("room_id", flat=True).distinct()
+        )
+        if previous_rooms:
+            RoomNight.objects.filter(booking=booking).delete()
+    if booking.room_id and booking.status != "cancelled":
+        claim_nights(booking)
+    if not previous_rooms and not covers_tonight(booking):
+        # Only tonight's occupancy feeds the room flags.
+        return
+    touched = previous_rooms | ({booking.room_id} if booking.room_id else set())
+    if touched:
+        sync_room_flags(touched)
+
+
+def sync_room_flags(room_ids: Optional[Iterable[int]] = None, on: Optional[date] = None) -> int:
+    """Refresh the denormalised ``Room.is_available`` flag for tonight's occupancy.
+
+    The flag only answers "is this room free tonight"; date-ranged questions go
+    through ``RoomNight``. For a handful of rooms only the flags that actually
+    flip are written, and the per-type counters are adjusted by the same
+    delta. Without ``room_ids`` every flag is recomputed and the counters are
+    rebuilt, which is what the daily rollover does.
+    """
+    check_in, check_out = tonight_range(on)
+    occupied = Exists(occupied_nights(check_in, check_out))
+    if room_ids is None:
+        updated = Room.objects.update(is_available=~occupied)
+        counters.rebuild()
+        return updated
+
+    flipped = {True: [], False: []}
+    deltas = defaultdict(int)
+    for pk, room_type, is_available, now_occupied in (
+        Room.objects.filter(pk__in=list(room_ids))
+        .annotate(now_occupied=occupied)
+        .values_list("pk", "room_type", "is_available", "now_occupied")
+    ):
+        if is_available == now_occupied:
+            flipped[now_occupied].append(pk)
+            deltas[room_type] += 1 if now_occupied else -1
+    # One UPDATE per direction and one counter update per room type, however
+    # many rooms flipped.
+    for now_occupied, pks in flipped.items():
+        if pks:
+            Room.objects.filter(pk__in=pks).update(is_available=not now_occupied)
+    for room_type, booked in deltas.items():
+        counters.adjust(room_type, booked=booked)
+    return len(flipped[True]) + len(flipped[False])
@@ -0,0 +1,87 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from bookings import rollups
+from bookings.models import ArchivedBooking, Booking, RoomNight
+from core import archive
+from core.models import ArchivedContactMessage, ContactMessage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move bookings whose stay ended (or, if cancelled, whose check-in was) more than --older-than days "
+        "ago into the booking archive, and handled contact messages older than that into the message "
+        "archive. Rows move in chunks, each in its own short transaction; the daily rollups keep counting "
+        "archived bookings. --purge-after deletes archived rows older than that many days and freezes the "
+        "rollups those bookings counted towards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, required=True, metavar="DAYS")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per transaction.")
+        parser.add_argument(
+            "--pause", type=float, default=0.0, metavar="SECONDS",
+            help="Sleep between chunks to leave room for other writers.",
+        )
+        parser.add_argument(
+            "--purge-after", type=int, metavar="DAYS",
+            help="Also delete archived bookings and messages older than this many days.",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--older-than and --chunk-size must be positive.")
+        if options["purge_after"] is not None and options["purge_after"] < options["older_than"]:
+            raise CommandError("--purge-after cannot be shorter than --older-than.")
+        today = timezone.localdate()
+        cutoff = today - timedelta(days=options["older_than"])
+        bookings = Booking.objects.filter(
+            Q(check_in__lt=cutoff - timedelta(days=rollups.MAX_STAY)) | Q(status="cancelled", check_in__lt=cutoff)
+        )
+        messages = ContactMessage.objects.filter(
+            handled=True, created_at__lt=timezone.now() - timedelta(days=options["older_than"])
+        )
+
+        def release_nights(archived):
+            RoomNight.objects.filter(booking__in=archived).delete()
+
+        self._run("Archived", "bookings", archive.move(
+            bookings, ArchivedBooking, options["chunk_size"], before_delete=release_nights
+        ), options)
+        self._run("Archived", "handled messages", archive.move(
+            messages, ArchivedContactMessage, options["chunk_size"]
+        ), options)
+
+        if options["purge_after"] is not None:
+            days = options["purge_after"]
+            purge_cutoff = today - timedelta(days=days)
+            # Freeze the rollups first, so a rebuild never recomputes the days
+            # the purged bookings counted towards, even if the purge stops halfway.
+            frozen = rollups.freeze_before(purge_cutoff)
+            self.stdout.write(f"Daily rollups before {frozen} are frozen; rebuilds start from that day.")
+            self._run("Purged", "archived bookings", archive.purge(
+                ArchivedBooking.objects.filter(check_in__lt=purge_cutoff), options["chunk_size"]
+            ), options)
+            self._run("Purged", "archived messages", archive.purge(
+                ArchivedContactMessage.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)),
+                options["chunk_size"],
+            ), options)
+
+    def _run(self, verb, label, chunks, options):
+        began = time.perf_counter()
+        rows = count = 0
+        longest = 0.0
+        for moved, seconds in chunks:
+            rows += moved
+            count += 1
+            longest = max(longest, seconds)
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {rows:,} {label} in {count} chunk(s), {time.perf_counter() - began:.1f}s "
+            f"(longest transaction {longest * 1000:.0f} ms)."
+        ))
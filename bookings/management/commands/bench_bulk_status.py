@@ -0,0 +1,143 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings import rollups
+from bookings.models import Booking, DailyRoomTypeStats, RoomNight
+from core.models import Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark cancelling and confirming a selection of bookings with the set-based "
+        "BookingQuerySet.cancel()/confirm() against saving them one by one, as the admin used to. "
+        "It runs in a separate process on a freshly migrated scratch database, so existing data is untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=10000, help="Bookings selected for the bulk actions.")
+        parser.add_argument("--rooms", type=int, default=2000)
+        parser.add_argument(
+            "--per-row", type=int, default=500,
+            help="Bookings cancelled one save() at a time for the baseline; the rate is extrapolated.",
+        )
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--worker", action="store_true", help="Internal: run against this (scratch) database.")
+
+    def handle(self, *args, **options):
+        if options["per_row"] > options["bookings"]:
+            raise CommandError("--per-row cannot exceed --bookings.")
+        if not options["worker"]:
+            self._run_worker(options)
+            return
+        rng = random.Random(options["seed"])
+        room_types = [code for code, _ in Room.ROOM_TYPES]
+        start = timezone.localdate()
+
+        began = time.perf_counter()
+        Room.objects.bulk_create(
+            Room(number=f"S{index:06d}", room_type=room_types[index % len(room_types)])
+            for index in range(options["rooms"])
+        )
+        selected = Booking.objects.create_many(
+            Booking(
+                full_name="Benchmark Guest",
+                cnic="4210112345671",
+                address="Benchmark",
+                room_type=rng.choice(room_types),
+                check_in=start + timedelta(days=rng.randrange(365)),
+                booking_days=rng.randint(1, 7),
+            )
+            for _ in range(options["bookings"])
+        )
+        pks = [booking.pk for booking in selected]
+        self.stdout.write(
+            f"Created {len(pks):,} bookings ({sum(1 for booking in selected if booking.room_id):,} with a room) "
+            f"on {options['rooms']:,} rooms in {time.perf_counter() - began:.1f}s"
+        )
+
+        sample = selected[:options["per_row"]]
+        seconds, queries = self._measure(lambda: self._save_each(sample, "cancelled"))
+        per_booking = seconds / len(sample)
+        self._report(f"save() x {len(sample):,}", seconds, queries)
+        self.stdout.write(
+            f"{'':<24} {per_booking * 1000:.2f} ms and {queries / len(sample):.1f} queries per booking; "
+            f"about {per_booking * len(pks):.1f}s for {len(pks):,}"
+        )
+        self._save_each(sample, "pending")
+
+        chosen = Booking.objects.filter(pk__in=pks)
+        self._report(f"cancel() x {len(pks):,}", *self._measure(chosen.cancel))
+        released = RoomNight.objects.filter(booking_id__in=pks).count()
+        self._report(f"confirm() x {len(pks):,}", *self._measure(chosen.confirm))
+
+        confirmed = Booking.objects.filter(pk__in=pks, status="confirmed").count()
+        nights = RoomNight.objects.filter(booking_id__in=pks).count()
+        expected = sum(
+            booking.booking_days for booking in Booking.objects.filter(pk__in=pks, status="confirmed")
+        )
+        incremental = self._rollups()
+        rollups.rebuild()
+        self.stdout.write(
+            f"Checks: {released} nights left after cancel(), {confirmed:,} of {len(pks):,} confirmed, "
+            f"{nights:,}/{expected:,} nights held, rollups "
+            f"{'match' if incremental == self._rollups() else 'DIFFER from'} a rebuild"
+        )
+
+    def _run_worker(self, options):
+        """Run the benchmark in a child process on a scratch database, as bench_views does.
+
+        Every step commits, so the timings include the commit and the
+        ``on_commit`` work a rolled-back transaction would skip.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "HOTELEASE_DB_NAME": str(Path(directory) / "bench.sqlite3")}
+            manage = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")]
+            subprocess.run([*manage, "migrate", "--noinput", "-v", "0"], env=env, check=True)
+            worker = subprocess.run(
+                [
+                    *manage, "bench_bulk_status", "--worker",
+                    "--bookings", str(options["bookings"]), "--rooms", str(options["rooms"]),
+                    "--per-row", str(options["per_row"]), "--seed", str(options["seed"]),
+                ],
+                env=env, check=True, stdout=subprocess.PIPE, text=True,
+            )
+        self.stdout.write(worker.stdout, ending="")
+
+    @staticmethod
+    def _save_each(bookings, status):
+        for booking in bookings:
+            booking.status = status
+            booking.save()
+
+    @staticmethod
+    def _measure(func):
+        with CaptureQueriesContext(connection) as captured:
+            began = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - began
+        return seconds, len(captured)
+
+    @staticmethod
+    def _rollups():
+        return [
+            row
+            for row in DailyRoomTypeStats.objects.order_by("date", "room_type").values_list(
+                "date", "room_type", *rollups.METRICS
+            )
+            if any(row[2:])
+        ]
+
+    def _report(self, label, seconds, queries):
+        self.stdout.write(f"{label:<24} {seconds * 1000:10.1f} ms  {queries:7,} queries")
@@ -0,0 +1,111 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from bookings import inventory
+from bookings.models import Booking, RoomNight
+from core.models import Room
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark date-range availability lookups against a synthetic nightly inventory. "
+        "Everything runs inside a transaction that is rolled back, so existing data is untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=10000)
+        parser.add_argument("--nights", type=int, default=365)
+        parser.add_argument("--occupancy", type=float, default=0.6, help="Share of room-nights that are sold.")
+        parser.add_argument("--samples", type=int, default=200, help="Lookups timed per query type.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        room_types = [code for code, _ in Room.ROOM_TYPES]
+        start = timezone.localdate()
+
+        with transaction.atomic():
+            began = time.perf_counter()
+            nights = self._build_inventory(rng, room_types, start, options)
+            self.stdout.write(
+                f"Built {options['rooms']:,} rooms and {nights:,} occupied nights "
+                f"in {time.perf_counter() - began:.1f}s"
+            )
+
+            windows = []
+            for _ in range(options["samples"]):
+                check_in = start + timedelta(days=rng.randrange(options["nights"] - 7))
+                windows.append((rng.choice(room_types), check_in, check_in + timedelta(days=rng.randint(1, 7))))
+
+            self._report("availability_by_type", [
+                self._time(inventory.availability_by_type, check_in, check_out)
+                for _, check_in, check_out in windows
+            ])
+            self._report("free_rooms().first()", [
+                self._time(lambda *a: inventory.free_rooms(*a).first(), room_type, check_in, check_out)
+                for room_type, check_in, check_out in windows
+            ])
+            transaction.set_rollback(True)
+
+    def _build_inventory(self, rng, room_types, start, options) -> int:
+        batch_size = options["batch_size"]
+        Room.objects.bulk_create(
+            (
+                Room(number=f"B{index:06d}", room_type=room_types[index % len(room_types)])
+                for index in range(options["rooms"])
+            ),
+            batch_size=batch_size,
+        )
+        rooms = list(Room.objects.filter(number__startswith="B").values_list("pk", "room_type"))
+
+        written = 0
+        bookings = []
+        for room_id, room_type in rooms:
+            day = 0
+            while day < options["nights"]:
+                stay = rng.randint(1, 7)
+                if rng.random() < options["occupancy"]:
+                    booking = Booking(
+                        booking_reference=Booking.generate_reference(),
+                        full_name="Benchmark Guest",
+                        cnic="4210112345671",
+                        address="Benchmark",
+                        room_type=room_type,
+                        room_id=room_id,
+                        check_in=start + timedelta(days=day),
+                        booking_days=min(stay, options["nights"] - day),
+                    )
+                    bookings.append(booking)
+                day += stay
+            if len(bookings) >= batch_size:
+                written += self._flush(bookings, batch_size)
+                bookings = []
+        written += self._flush(bookings, batch_size)
+        return written
+
+    def _flush(self, bookings, batch_size) -> int:
+        Booking.objects.bulk_create(bookings, batch_size=batch_size)
+        nights = [night for booking in bookings for night in inventory.nights_for(booking)]
+        RoomNight.objects.bulk_create(nights, batch_size=batch_size)
+        return len(nights)
+
+    @staticmethod
+    def _time(func, *args) -> float:
+        began = time.perf_counter()
+        func(*args)
+        return (time.perf_counter() - began) * 1000
+
+    def _report(self, label, timings):
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<24} p50 {statistics.median(timings):8.2f} ms   "
+            f"p95 {p95:8.2f} ms   max {timings[-1]:8.2f} ms"
+        )
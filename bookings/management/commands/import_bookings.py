@@ -0,0 +1,188 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from bookings import inventory
+from bookings.forms import BookingImportForm
+from bookings.models import ArchivedBooking, Booking, BookingQuerySet
+from core.models import Room
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream bookings from a CSV or JSON Lines export, validate each row with the "
+        "BookingForm rules, allocate rooms per chunk and write them with Booking.objects.create_many. "
+        "Rejected rows are written to a side file together with the reasons."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import, or '-' for stdin.")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--rejects", help="Where to write rejected rows (default: <path>.rejects.jsonl).")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and allocate without writing.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        rejects_path = options["rejects"] or (
+            "import_bookings.rejects.jsonl" if path == "-" else f"{path}.rejects.jsonl"
+        )
+        self.room_types = set(Room.objects.values_list("room_type", flat=True).distinct())
+        self.rejects_path = Path(rejects_path)
+        self.rejects_file = None
+        self.dry_run = options["dry_run"]
+        # A dry run writes nothing, so the nights and references of earlier
+        # chunks are only known here.
+        self.claimed = {}
+        self.imported_references = set()
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        imported = rejected = assigned = 0
+        began = time.perf_counter()
+        try:
+            rows = self._read(stream, fmt)
+            while True:
+                chunk = list(islice(rows, options["chunk_size"]))
+                if not chunk:
+                    break
+                bookings = self._validate(chunk)
+                rejected += len(chunk) - len(bookings)
+                if bookings:
+                    imported_now, assigned_now = self._write(bookings)
+                    imported += imported_now
+                    assigned += assigned_now
+                    rejected += len(bookings) - imported_now
+                self.stdout.write(f"  {imported:,} imported, {rejected:,} rejected", ending="\r")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if self.rejects_file:
+                self.rejects_file.close()
+
+        elapsed = time.perf_counter() - began
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Validated' if self.dry_run else 'Imported'} {imported:,} bookings "
+            f"({assigned:,} with rooms) in {elapsed:.1f}s; {rejected:,} rejected."
+        ))
+        if rejected:
+            self.stdout.write(f"Rejected rows written to {self.rejects_path}")
+
+    def _read(self, stream, fmt):
+        """Yield ``(line_number, row)`` pairs without loading the file."""
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                row = {"_raw": line.rstrip("\n"), "_error": str(exc)}
+            yield line_number, row
+
+    def _validate(self, chunk):
+        bookings = []
+        for line_number, row in chunk:
+            if "_error" in row:
+                self._reject(line_number, row, {"__all__": [row["_error"]]})
+                continue
+            data = {key: ("" if value is None else value) for key, value in row.items()}
+            if "airport_pick_drop" in data:
+                data["airport_pick_drop"] = str(data["airport_pick_drop"]).strip().lower() in TRUE_VALUES
+            data.setdefault("status", "pending")
+            form = BookingImportForm(data, room_types=self.room_types)
+            if not form.is_valid():
+                self._reject(line_number, row, form.errors.get_json_data())
+                continue
+            booking = form.instance
+            reference = str(data.get("booking_reference", "")).strip().upper()
+            # Rows without one get a reference from create_many, checked in bulk.
+            booking.booking_reference = reference[:12]
+            booking._import_line = line_number
+            booking._import_row = row
+            bookings.append(booking)
+        return self._drop_duplicate_references(bookings)
+
+    def _drop_duplicate_references(self, bookings):
+        existing = self._taken_references(bookings) | self.imported_references
+        unique = []
+        for booking in bookings:
+            if not booking.booking_reference:
+                unique.append(booking)
+                continue
+            if booking.booking_reference in existing:
+                self._reject(
+                    booking._import_line,
+                    booking._import_row,
+                    {"booking_reference": ["A booking with this reference already exists."]},
+                )
+                continue
+            existing.add(booking.booking_reference)
+            unique.append(booking)
+        return unique
+
+    @staticmethod
+    def _taken_references(bookings):
+        references = [booking.booking_reference for booking in bookings if booking.booking_reference]
+        # Archived bookings keep their reference on the confirmation page, so it stays taken.
+        archived = ArchivedBooking.objects.filter(booking_reference__in=references).order_by().values_list(
+            "booking_reference", flat=True
+        )
+        return set(
+            Booking.objects.filter(booking_reference__in=references)
+            .order_by()
+            .values_list("booking_reference", flat=True)
+            .union(archived)
+        )
+
+    def _write(self, bookings):
+        """Allocate and insert one chunk; returns (imported, assigned) counts."""
+        for booking in bookings:
+            booking.room = None
+        if self.dry_run:
+            assigned = inventory.allocate_rooms(bookings, claimed=self.claimed)
+            self.imported_references.update(booking.booking_reference for booking in bookings)
+            return len(bookings), assigned
+        try:
+            Booking.objects.create_many(bookings)
+        except IntegrityError as exc:
+            taken = self._taken_references(bookings)
+            if not taken:
+                # Most likely live bookings kept claiming the chosen nights after each inventory read.
+                raise CommandError(
+                    f"Could not write a chunk after {BookingQuerySet.ALLOCATION_ATTEMPTS} attempts: {exc}. "
+                    "If rooms are being booked meanwhile, try a smaller --chunk-size."
+                )
+            # Another writer took some of the references since they were checked.
+            remaining = []
+            for booking in bookings:
+                if booking.booking_reference in taken:
+                    self._reject(
+                        booking._import_line,
+                        booking._import_row,
+                        {"booking_reference": ["A booking with this reference already exists."]},
+                    )
+                else:
+                    remaining.append(booking)
+            if not remaining:
+                return 0, 0
+            return self._write(remaining)
+        return len(bookings), sum(1 for booking in bookings if booking.room_id)
+
+    def _reject(self, line_number, row, errors):
+        if self.rejects_file is None:
+            self.rejects_file = self.rejects_path.open("w", encoding="utf-8")
+        self.rejects_file.write(json.dumps({"line": line_number, "errors": errors, "row": row}, default=str) + "\n")
@@ -0,0 +1,50 @@
+import time
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprice pending bookings at the current rates and rate plans with one set-based UPDATE, "
+        "after Booking.ROOM_TYPE_RATES or the rate plans change. Confirmed and cancelled bookings keep "
+        "their price. Use --dry-run with --diff to review the changes first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--room-type", nargs="+", choices=list(Booking.ROOM_TYPE_RATES), help="Only these room types."
+        )
+        parser.add_argument("--since", help="Only stays checking in on or after this day (YYYY-MM-DD).")
+        parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them.")
+        parser.add_argument("--diff", help="Write one CSV row per repriced booking, old and new price, to this file.")
+
+    def handle(self, *args, **options):
+        bookings = Booking.objects.all()
+        if options["room_type"]:
+            bookings = bookings.filter(room_type__in=options["room_type"])
+        if options["since"]:
+            try:
+                bookings = bookings.filter(check_in__gte=date.fromisoformat(options["since"]))
+            except ValueError as exc:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.") from exc
+
+        began = time.perf_counter()
+        if options["diff"]:
+            with Path(options["diff"]).open("w", newline="") as diff:
+                result = bookings.reprice(dry_run=options["dry_run"], diff=diff)
+        else:
+            result = bookings.reprice(dry_run=options["dry_run"])
+        elapsed = time.perf_counter() - began
+
+        for room_type, (count, revenue) in result.by_room_type.items():
+            self.stdout.write(f"{room_type:<10} {count:>9,} bookings  {revenue:>+15,} PKR")
+        verb = "Would reprice" if options["dry_run"] else "Repriced"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.bookings:,} pending bookings ({result.revenue:+,} PKR) in {elapsed:.1f}s."
+        ))
+        if options["diff"]:
+            self.stdout.write(f"Wrote the diff to {options['diff']}")
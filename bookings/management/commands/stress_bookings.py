@@ -0,0 +1,138 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from bookings import inventory
+from bookings.models import Booking
+from core import counters
+from core.models import Room
+
+STRESS_PREFIX = "ST"
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer Booking.save() from several threads against a small pool of rooms, "
+        "report bookings/sec and fail if any room night was sold twice. "
+        "Runs in a separate process on a freshly migrated scratch database, so existing data is untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--bookings", type=int, default=400, help="Bookings attempted in total.")
+        parser.add_argument("--rooms", type=int, default=40, help="Rooms competed for (all the same type).")
+        parser.add_argument("--room-type", default="single")
+        parser.add_argument("--max-days", type=int, default=3)
+        parser.add_argument("--worker", action="store_true", help="Internal: run against this (scratch) database.")
+
+    def handle(self, *args, **options):
+        if not options["worker"]:
+            self._run_worker(options)
+            return
+        rooms = Room.objects.bulk_create(
+            Room(number=f"{STRESS_PREFIX}{index:05d}", room_type=options["room_type"])
+            for index in range(options["rooms"])
+        )
+        room_ids = [room.pk for room in rooms]
+        booking_ids = []
+        counters.rebuild()
+        try:
+            elapsed, errors = self._run(options, booking_ids)
+            self._verify(options, booking_ids, elapsed, errors)
+        finally:
+            # Only what this run created, should --worker be pointed at a real database.
+            Booking.objects.filter(pk__in=booking_ids).delete()
+            Room.objects.filter(pk__in=room_ids).delete()
+            counters.rebuild()
+
+    def _run_worker(self, options):
+        """Run the stress test in a child process on a scratch database, as bench_views does."""
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "HOTELEASE_DB_NAME": str(Path(directory) / "stress.sqlite3")}
+            manage = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")]
+            subprocess.run([*manage, "migrate", "--noinput", "-v", "0"], env=env, check=True)
+            worker = subprocess.run(
+                [
+                    *manage, "stress_bookings", "--worker",
+                    "--threads", str(options["threads"]), "--bookings", str(options["bookings"]),
+                    "--rooms", str(options["rooms"]), "--room-type", options["room_type"],
+                    "--max-days", str(options["max_days"]),
+                ],
+                env=env, stdout=subprocess.PIPE, text=True,
+            )
+        self.stdout.write(worker.stdout, ending="")
+        if worker.returncode:
+            raise CommandError(f"The stress run failed with exit code {worker.returncode}.")
+
+    def _run(self, options, booking_ids):
+        start = timezone.localdate() + timedelta(days=1)
+        per_thread = options["bookings"] // options["threads"]
+        errors = []
+        barrier = threading.Barrier(options["threads"])
+
+        def worker(worker_id):
+            try:
+                barrier.wait()
+                for index in range(per_thread):
+                    booking = Booking(
+                        full_name=f"Stress Guest {worker_id}-{index}",
+                        cnic="4210112345671",
+                        address="Stress test",
+                        room_type=options["room_type"],
+                        check_in=start + timedelta(days=index % options["max_days"]),
+                        booking_days=1 + (worker_id + index) % options["max_days"],
+                    )
+                    booking.save()
+                    booking_ids.append(booking.pk)
+            except Exception as exc:  # reported after all threads finish
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(options["threads"])]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - began, errors
+
+    def _verify(self, options, booking_ids, elapsed, errors):
+        bookings = list(
+            Booking.objects.filter(pk__in=booking_ids).values_list(
+                "pk", "room_id", "check_in", "booking_days"
+            )
+        )
+        # Rebuild the sold nights from the bookings themselves rather than from
+        # RoomNight, so the check does not rely on the constraint under test.
+        sold = Counter(
+            (room_id, night)
+            for _, room_id, check_in, days in bookings
+            if room_id is not None
+            for night in inventory.stay_dates(check_in, days)
+        )
+        doubles = sum(1 for count in sold.values() if count > 1)
+        assigned = sum(1 for _, room_id, _, _ in bookings if room_id is not None)
+
+        self.stdout.write(
+            f"{len(bookings)} bookings from {options['threads']} threads in {elapsed:.2f}s "
+            f"({len(bookings) / elapsed:.0f} bookings/sec); {assigned} got a room, "
+            f"{len(sold)} room-nights sold, {doubles} double-assigned."
+        )
+        if errors:
+            raise CommandError(f"{len(errors)} worker(s) failed; first error: {errors[0]!r}")
+        if doubles:
+            raise CommandError(f"{doubles} room-nights were sold twice.")
+        self.stdout.write(self.style.SUCCESS("No double assignments."))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:45
+
+from datetime import timedelta
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_nights(apps, schema_editor):
+    """Existing bookings start on the day they were made and hold their room from then on."""
+    Booking = apps.get_model("bookings", "Booking")
+    RoomNight = apps.get_model("bookings", "RoomNight")
+    nights = []
+    for booking in Booking.objects.exclude(status="cancelled").exclude(room=None).iterator():
+        booking.check_in = booking.created_at.date()
+        booking.save(update_fields=["check_in"])
+        nights.extend(
+            RoomNight(
+                room_id=booking.room_id,
+                booking_id=booking.pk,
+                room_type=booking.room_type,
+                date=booking.check_in + timedelta(days=offset),
+            )
+            for offset in range(booking.booking_days)
+        )
+    RoomNight.objects.bulk_create(nights, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_alter_booking_booking_days_alter_booking_cnic_and_more'),
+        ('core', '0003_alter_room_room_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='check_in',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(max_length=20)),
+                ('date', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='bookings.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='core.room')),
+            ],
+            options={
+                'ordering': ['date', 'room'],
+                'indexes': [models.Index(fields=['room_type', 'date', 'room'], name='bookings_ro_room_ty_cd00cd_idx'), models.Index(fields=['date', 'room'], name='bookings_ro_date_1da1fa_idx')],
+                'constraints': [models.UniqueConstraint(fields=('room', 'date'), name='unique_room_night')],
+            },
+        ),
+        migrations.RunPython(backfill_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:10
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+
+METRICS = ("bookings", "nights_sold", "revenue", "airport_transfers", "cancellations")
+
+
+def build_rollups(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    DailyRoomTypeStats = apps.get_model("bookings", "DailyRoomTypeStats")
+    totals = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    states = Booking.objects.order_by().values_list(
+        "check_in", "room_type", "booking_days", "total_price", "airport_pick_drop", "status"
+    )
+    for check_in, room_type, days, total_price, airport, status in states.iterator(chunk_size=5000):
+        if status == "cancelled":
+            totals[(check_in, room_type)]["cancellations"] += 1
+            continue
+        arrival = totals[(check_in, room_type)]
+        arrival["bookings"] += 1
+        arrival["revenue"] += total_price
+        arrival["airport_transfers"] += int(airport)
+        for offset in range(days):
+            totals[(check_in + timedelta(days=offset), room_type)]["nights_sold"] += 1
+    DailyRoomTypeStats.objects.bulk_create(
+        (DailyRoomTypeStats(date=day, room_type=room_type, **metrics) for (day, room_type), metrics in totals.items()),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_room_nights'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRoomTypeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('room_type', models.CharField(choices=[('single', 'Single Room'), ('master', 'Master Room'), ('meeting', 'Meeting Room'), ('deluxe', 'Deluxe Room'), ('executive', 'Executive Room'), ('suite', 'Luxury Suite')], max_length=50)),
+                ('bookings', models.IntegerField(default=0)),
+                ('nights_sold', models.IntegerField(default=0)),
+                ('revenue', models.BigIntegerField(default=0)),
+                ('airport_transfers', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'daily room type stats',
+                'ordering': ['date', 'room_type'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'room_type'), name='unique_daily_room_type_stats')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:20
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_daily_room_type_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatePlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('season', 'Seasonal'), ('day_of_week', 'Day of week'), ('length_of_stay', 'Length of stay')], max_length=20)),
+                ('room_type', models.CharField(blank=True, choices=[('single', 'Single Room'), ('master', 'Master Room'), ('meeting', 'Meeting Room'), ('deluxe', 'Deluxe Room'), ('executive', 'Executive Room'), ('suite', 'Luxury Suite')], max_length=50)),
+                ('start_date', models.DateField(blank=True, help_text='First night covered', null=True)),
+                ('end_date', models.DateField(blank=True, help_text='Last night covered', null=True)),
+                ('weekdays', models.JSONField(blank=True, default=list, help_text='Nights covered, 0 = Monday to 6 = Sunday, e.g. [4, 5]')),
+                ('min_nights', models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('percent_change', models.SmallIntegerField(validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(500)])),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['kind', 'start_date', 'name'],
+            },
+        ),
+    ]
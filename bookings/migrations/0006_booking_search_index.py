@@ -0,0 +1,51 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# The SQL core.search.install() ran when this migration was written, frozen
+# here so later changes to that module don't change what this migration does.
+# Per table: the FTS5 index, its insert, delete and update triggers, and a
+# rebuild that indexes the existing rows.
+CREATE = {
+    "bookings_booking": [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS "bookings_booking_fts" USING fts5("booking_reference", "full_name", "email", "phone_number", content="bookings_booking", content_rowid=\'id\', tokenize=\'unicode61 remove_diacritics 2\', prefix=\'2 3\')',
+        'CREATE TRIGGER IF NOT EXISTS "bookings_booking_fts_ai" AFTER INSERT ON "bookings_booking" BEGIN INSERT INTO "bookings_booking_fts"(rowid, "booking_reference", "full_name", "email", "phone_number") VALUES (new.id, new."booking_reference", new."full_name", new."email", new."phone_number"); END',
+        'CREATE TRIGGER IF NOT EXISTS "bookings_booking_fts_ad" AFTER DELETE ON "bookings_booking" BEGIN INSERT INTO "bookings_booking_fts"("bookings_booking_fts", rowid, "booking_reference", "full_name", "email", "phone_number") VALUES (\'delete\', old.id, old."booking_reference", old."full_name", old."email", old."phone_number"); END',
+        'CREATE TRIGGER IF NOT EXISTS "bookings_booking_fts_au" AFTER UPDATE OF "booking_reference", "full_name", "email", "phone_number" ON "bookings_booking" BEGIN INSERT INTO "bookings_booking_fts"("bookings_booking_fts", rowid, "booking_reference", "full_name", "email", "phone_number") VALUES (\'delete\', old.id, old."booking_reference", old."full_name", old."email", old."phone_number"); INSERT INTO "bookings_booking_fts"(rowid, "booking_reference", "full_name", "email", "phone_number") VALUES (new.id, new."booking_reference", new."full_name", new."email", new."phone_number"); END',
+        'INSERT INTO "bookings_booking_fts"("bookings_booking_fts") VALUES (\'rebuild\')',
+    ],
+}
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statements in CREATE.values():
+            try:
+                cursor.execute(statements[0])
+            except OperationalError:
+                # No FTS5 in this SQLite build; admin searches keep using LIKE.
+                return
+            for statement in statements[1:]:
+                cursor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in CREATE:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f'DROP TRIGGER IF EXISTS "{table}_fts_{suffix}"')
+            cursor.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_rate_plans'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
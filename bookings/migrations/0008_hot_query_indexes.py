@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_changelist_indexes'),
+        ('core', '0011_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_bo_booking_8a7545_idx',
+        ),
+        migrations.AlterField(
+            model_name='roomnight',
+            name='room',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='core.room'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:19
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_hot_query_indexes'),
+        ('core', '0012_contact_message_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_reference', models.CharField(editable=False, max_length=12, unique=True)),
+                ('full_name', models.CharField(max_length=100)),
+                ('cnic', models.CharField(max_length=15, validators=[django.core.validators.RegexValidator('^[0-9\\-]{13,15}$', 'Enter a valid CNIC number.')])),
+                ('address', models.TextField()),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('room_type', models.CharField(choices=[('single', 'Single Room'), ('master', 'Master Room'), ('meeting', 'Meeting Room'), ('deluxe', 'Deluxe Room'), ('executive', 'Executive Room'), ('suite', 'Luxury Suite')], max_length=50)),
+                ('check_in', models.DateField(default=django.utils.timezone.localdate)),
+                ('booking_days', models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(7)])),
+                ('airport_pick_drop', models.BooleanField(default=False)),
+                ('total_price', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled')], default='pending', max_length=15)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_bookings', to='core.room')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
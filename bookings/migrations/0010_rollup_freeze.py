@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_booking_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupFreeze',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frozen_before', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-frozen_before'],
+            },
+        ),
+    ]
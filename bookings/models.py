@@ -1,11 +1,154 @@
 import uuid
+from datetime import timedelta
+from functools import partial
 
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Q, Subquery
+from django.utils import timezone
 
 
-class Booking(models.Model):
-	"""Guest booking capturing stay details and optional airport transfer."""
+class BookingQuerySet(models.QuerySet):
+	# Rows per INSERT statement in the bulk write paths.
+	BATCH_SIZE = 2000
+	ALLOCATION_ATTEMPTS = 3
+
+	def create_many(self, bookings):
+		"""Insert a batch of unsaved bookings with a fixed number of statements.
+
+		Rooms are allocated from one inventory read and prices come from the
+		in-memory price calendar. The bookings, their nights, the room flags and
+		the daily rollups are then each written with one statement per
+		``BATCH_SIZE`` rows, in a single transaction, however large the batch.
+		Bookings that already carry a room keep it. If a concurrent booking takes
+		one of the chosen nights first the batch is reallocated; the
+		``IntegrityError`` is re-raised after ``ALLOCATION_ATTEMPTS`` tries.
+
+		Unlike ``save()`` no model signals are sent: the cached page sections are
+		invalidated on commit, and confirmation emails are left to the caller.
+		"""
+		from core.cache import invalidate
+
+		from . import inventory, rollups
+
+		bookings = list(bookings)
+		if not bookings:
+			return bookings
+		chosen = {id(booking) for booking in bookings if booking.room_id}
+		unnamed = [booking for booking in bookings if not booking.booking_reference]
+		for booking, reference in zip(unnamed, self.model.generate_references(len(unnamed))):
+			booking.booking_reference = reference
+		for booking in bookings:
+			booking.total_price = booking.calculate_total()
+		for attempt in range(self.ALLOCATION_ATTEMPTS):
+			inventory.allocate_rooms(bookings)
+			try:
+				with transaction.atomic(using=self.db):
+					self.bulk_create(bookings, batch_size=self.BATCH_SIZE)
+					inventory.reserve_batch(bookings)
+					rollups.record_bookings(bookings)
+					transaction.on_commit(partial(invalidate, "stats", "availability"), using=self.db)
+				break
+			except IntegrityError:
+				for booking in bookings:
+					booking.pk = None
+					booking._state.adding = True
+					if id(booking) not in chosen:
+						booking.room = None
+				if attempt == self.ALLOCATION_ATTEMPTS - 1:
+					raise
+		for booking in bookings:
+			booking._rollup_state = rollups.state_of(booking)
+		return bookings
+
+	def cancel(self) -> int:
+		"""Cancel the bookings that aren't cancelled yet and release their nights.
+
+		One DELETE releases every night, one SELECT reads what the rollups and
+		room flags need and one UPDATE sets the status. Refreshing the rooms
+		freed tonight and the rollups takes a few statements more, however
+		many bookings are cancelled. Returns the number cancelled.
+		"""
+		from core.cache import invalidate
+
+		from . import inventory, rollups
+
+		targets = self.exclude(status="cancelled").order_by()
+		tonight = timezone.localdate()
+		with transaction.atomic(using=self.db):
+			# Write first: on SQLite the first write takes the write lock (see save()).
+			RoomNight.objects.filter(booking__in=targets.values("pk")).delete()
+			rows = list(targets.values_list("room_id", *rollups.STATE_FIELDS))
+			cancelled = targets.update(status="cancelled", updated_at=timezone.now())
+			freed = {
+				room_id
+				for room_id, check_in, _, days, *_ in rows
+				if room_id and check_in <= tonight < check_in + timedelta(days=days)
+			}
+			if freed:
+				inventory.sync_room_flags(freed)
+			rollups.record_changes((tuple(state), (*state[:-1], "cancelled")) for _, *state in rows)
+			transaction.on_commit(partial(invalidate, "stats", "availability"), using=self.db)
+		return cancelled
+
+	def reprice(self, dry_run: bool = False, diff=None):
+		"""Reprice the pending bookings at the current prices; see ``bookings.pricing.reprice``."""
+		from . import pricing
+
+		return pricing.reprice(self, dry_run=dry_run, diff=diff)
+
+	def confirm(self) -> int:
+		"""Confirm the pending and cancelled bookings, claiming rooms where needed.
+
+		Pending bookings that hold a room are confirmed with one UPDATE. The
+		others hold no nights: each keeps its room if that is still free, the
+		rest are allocated rooms as in ``create_many``, and all of their rows
+		and nights are then written a batch at a time. Bookings left without a
+		free room stay as they were. Returns the number confirmed.
+		"""
+		from core.cache import invalidate
+
+		from . import inventory, rollups
+
+		now = timezone.now()
+		with transaction.atomic(using=self.db):
+			confirmed = self.filter(status="pending", room__isnull=False).update(status="confirmed", updated_at=now)
+			unplaced = list(
+				self.filter(Q(status="cancelled") | Q(status="pending", room__isnull=True))
+				.only("room", *rollups.STATE_FIELDS)
+				.order_by("pk")
+			)
+			placed = []
+			for attempt in range(self.ALLOCATION_ATTEMPTS):
+				for booking in unplaced:
+					booking.status, booking.updated_at = "confirmed", now
+				inventory.drop_taken_rooms(unplaced)
+				inventory.allocate_rooms(unplaced)
+				placed = [booking for booking in unplaced if booking.room_id]
+				try:
+					with transaction.atomic(using=self.db):
+						inventory.reserve_batch(placed)
+						# Each booking's room is read back from its first night.
+						room = RoomNight.objects.filter(booking=models.OuterRef("pk")).order_by().values("room_id")[:1]
+						for start in range(0, len(placed), self.BATCH_SIZE):
+							self.model.objects.filter(
+								pk__in=[booking.pk for booking in placed[start:start + self.BATCH_SIZE]]
+							).update(room=Subquery(room), status="confirmed", updated_at=now)
+					break
+				except IntegrityError:
+					# A concurrent booking took one of the nights; look again.
+					if attempt == self.ALLOCATION_ATTEMPTS - 1:
+						raise
+			rollups.record_changes((booking._rollup_state, rollups.state_of(booking)) for booking in placed)
+			transaction.on_commit(partial(invalidate, "stats", "availability"), using=self.db)
+		for booking in placed:
+			booking._rollup_state = rollups.state_of(booking)
+		return confirmed + len(placed)
+
+
+class BookingRecord(models.Model):
+	"""The fields of a booking, shared by live bookings and the archive."""
 
 	ROOM_TYPE_CHOICES = [
 		("single", "Single Room"),
@@ -15,6 +158,7 @@ class Booking(models.Model):
 		("executive", "Executive Room"),
 		("suite", "Luxury Suite"),
 	]
+	# Rack rates per night; ``RatePlan`` rows adjust them (see ``bookings.pricing``).
 	ROOM_TYPE_RATES = {
 		"single": 5000,
 		"master": 9000,
@@ -24,6 +168,8 @@ class Booking(models.Model):
 		"suite": 15000,
 	}
 	AIRPORT_CHARGE = 7000
+	# Changing any of these reprices a booking; see ``bookings.pricing``.
+	PRICING_FIELDS = ("room_type", "check_in", "booking_days", "airport_pick_drop")
 	STATUS_CHOICES = [
 		("pending", "Pending"),
 		("confirmed", "Confirmed"),
@@ -47,6 +193,7 @@ class Booking(models.Model):
 		null=True,
 		blank=True,
 	)
+	check_in = models.DateField(default=timezone.localdate)
 	booking_days = models.PositiveSmallIntegerField(
 		default=1, validators=[MinValueValidator(1), MaxValueValidator(7)]
 	)
@@ -58,64 +205,322 @@ class Booking(models.Model):
 	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
-		ordering = ["-created_at"]
-		indexes = [
-			models.Index(fields=["booking_reference"]),
-		]
+		abstract = True
 
 	def __str__(self) -> str:
 		return f"{self.booking_reference} - {self.full_name}"
 
-	@classmethod
-	def generate_reference(cls) -> str:
-		return uuid.uuid4().hex[:12].upper()
-
 	@property
 	def base_rate(self) -> int:
-		if self.room and self.room.price:
-			return int(self.room.price)
 		return self.ROOM_TYPE_RATES.get(self.room_type, 0)
 
+	@property
+	def check_out(self):
+		return self.check_in + timedelta(days=self.booking_days)
+
 	@property
 	def airport_charge(self) -> int:
 		return self.AIRPORT_CHARGE if self.airport_pick_drop else 0
 
+	@property
+	def room_total(self) -> int:
+		return self.total_price - self.airport_charge
+
+
+class Booking(BookingRecord):
+	"""Guest booking capturing stay details and optional airport transfer."""
+
+	objects = BookingQuerySet.as_manager()
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			# booking_reference is unique, which already indexes it.
+			# Newest-first admin changelist, unfiltered and filtered by status or room type.
+			models.Index(fields=["created_at"], name="bookings_created_idx"),
+			models.Index(fields=["status", "created_at"], name="bookings_status_created_idx"),
+			models.Index(fields=["room_type", "created_at"], name="bookings_type_created_idx"),
+		]
+
+	@classmethod
+	def generate_reference(cls) -> str:
+		return cls.generate_references(1)[0]
+
+	@classmethod
+	def generate_references(cls, count: int) -> list:
+		"""Return ``count`` new random references, none used by a current or archived booking.
+
+		Archived bookings keep their reference on the confirmation page, so a
+		reused one would show a guest someone else's stay. Each round checks
+		``BATCH_SIZE`` references per query; collisions are simply redrawn.
+		"""
+		references = set()
+		while len(references) < count:
+			fresh = list({uuid.uuid4().hex[:12].upper() for _ in range(count - len(references))} - references)
+			taken = set()
+			for start in range(0, len(fresh), BookingQuerySet.BATCH_SIZE):
+				batch = fresh[start:start + BookingQuerySet.BATCH_SIZE]
+				archived = ArchivedBooking.objects.filter(booking_reference__in=batch).order_by().values_list(
+					"booking_reference", flat=True
+				)
+				taken.update(
+					Booking.objects.filter(booking_reference__in=batch)
+					.order_by()
+					.values_list("booking_reference", flat=True)
+					.union(archived)
+				)
+			references.update(reference for reference in fresh if reference not in taken)
+		return list(references)
+
 	def calculate_total(self) -> int:
-		return (self.base_rate * self.booking_days) + self.airport_charge
+		from . import pricing
+
+		return pricing.room_total(self.room_type, self.check_in, self.booking_days) + self.airport_charge
+
+	def clean(self):
+		super().clean()
+		if not self.room_id or self.status == "cancelled" or not self.check_in or not self.booking_days:
+			return
+		clashes = RoomNight.objects.filter(
+			room_id=self.room_id, date__gte=self.check_in, date__lt=self.check_out
+		).exclude(booking_id=self.pk)
+		if clashes.exists():
+			raise ValidationError({"room": "This room is already booked for some of the selected nights."})
 
 	def assign_room(self):
-		"""Pick the first available room matching the type if none selected."""
-		if self.room_id:
+		"""Pick a room of the requested type that is free for every night of the stay."""
+		if self.room_id or self.status == "cancelled":
 			return
-		from core.models import Room
+		from . import inventory
 
-		available_room = Room.objects.filter(room_type=self.room_type, is_available=True).order_by("number").first()
-		if available_room:
-			self.room = available_room
+		self.room_id = inventory.pick_room(self.room_type, self.check_in, self.check_out)
+		self._room_auto_assigned = self.room_id is not None
 
-	def update_room_availability(self):
-		from core.models import Room
+	def update_room_availability(self, is_new: bool = False, assign: bool = True):
+		from . import inventory
 
-		if not self.room_id:
-			return
-		if self.status == "cancelled":
-			Room.objects.filter(pk=self.room_id).update(is_available=True)
-		else:
-			Room.objects.filter(pk=self.room_id).update(is_available=False)
+		saved_room_id = self.room_id
+		if assign:
+			self.assign_room()
+		inventory.sync_booking_nights(self, is_new=is_new)
+		if self.room_id != saved_room_id:
+			Booking.objects.filter(pk=self.pk).update(room_id=self.room_id)
+
+	def _do_insert(self, manager, using, fields, returning_fields, raw):
+		if not isinstance(self.room_id, Subquery):
+			return super()._do_insert(manager, using, fields, returning_fields, raw)
+		# The room is chosen by a subquery in the INSERT itself; read it back
+		# with RETURNING rather than a second query.
+		room = self._meta.get_field("room")
+		results = super()._do_insert(manager, using, fields, [*returning_fields, room], raw)
+		*values, self.room_id = results[0]
+		self._room_auto_assigned = self.room_id is not None
+		return [tuple(values)]
+
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		instance = super().from_db(db, field_names, values)
+		# Remember what the rollups were last told about this booking, so saves
+		# can apply the difference without re-reading the row first.
+		from . import rollups
+
+		if all(field in field_names for field in rollups.STATE_FIELDS):
+			instance._rollup_state = rollups.state_of(instance)
+		return instance
 
 	def save(self, *args, **kwargs):
-		is_new = self.pk is None
+		from . import rollups
+
+		is_new = self._state.adding
 		if not self.booking_reference:
 			self.booking_reference = self.generate_reference()
-		self.assign_room()
-		self.total_price = self.calculate_total()
-		super().save(*args, **kwargs)
-		# Update availability outside the initial save to avoid race conditions if no room found
-		if is_new or "status" in (kwargs.get("update_fields") or []):
-			self.update_room_availability()
-		elif self.status != "cancelled":
-			self.update_room_availability()
+		previous = None
+		if not is_new:
+			previous = getattr(self, "_rollup_state", None)
+			if previous is None:
+				previous = Booking.objects.filter(pk=self.pk).values_list(*rollups.STATE_FIELDS).first()
+		# The price is fixed when the booking is made; later edits only reprice
+		# it if they change the stay itself.
+		before = dict(zip(rollups.STATE_FIELDS, previous)) if previous else None
+		if before is None or any(before[field] != getattr(self, field) for field in self.PRICING_FIELDS):
+			self.total_price = self.calculate_total()
+		using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+		claim = (
+			is_new
+			and not self.room_id
+			and self.status != "cancelled"
+			and connections[using].features.can_return_columns_from_insert
+		)
+		with transaction.atomic(using=using):
+			# Write the booking row before reading the inventory: on SQLite the
+			# first write takes the database write lock, so concurrent bookings
+			# queue behind each other instead of deadlocking on a lock upgrade.
+			# Where the backend can return columns from an INSERT, a new booking
+			# chooses its room inside that INSERT (see ``_do_insert``).
+			if claim:
+				from . import inventory
+
+				self.room_id = inventory.claim_subquery(self.room_type, self.check_in, self.check_out)
+			try:
+				super().save(*args, **kwargs)
+			finally:
+				if isinstance(self.room_id, Subquery):
+					self.room_id = None
+			self.update_room_availability(is_new=is_new, assign=not claim)
+			current = rollups.state_of(self)
+			rollups.record_change(previous, current)
+		self._rollup_state = current
 
 	def cancel(self):
+		from . import rollups
+
+		Booking.objects.filter(pk=self.pk).cancel()
 		self.status = "cancelled"
-		self.save(update_fields=["status", "updated_at"])
+		self._rollup_state = rollups.state_of(self)
+
+
+class ArchivedBooking(BookingRecord):
+	"""A booking moved out of ``Booking`` by ``archive_bookings``, with its original id.
+
+	Archived bookings hold no room nights and still count in the daily
+	rollups; the confirmation page falls back to them for old references.
+	"""
+
+	room = models.ForeignKey(
+		"core.Room",
+		on_delete=models.SET_NULL,
+		related_name="archived_bookings",
+		null=True,
+		blank=True,
+	)
+	archived_at = models.DateTimeField(default=timezone.now)
+
+	class Meta:
+		ordering = ["-created_at"]
+
+	def __str__(self) -> str:
+		return f"{self.booking_reference} - {self.full_name} (archived)"
+
+
+class RoomNight(models.Model):
+	"""One occupied night of a room; the (room, date) pairs form the nightly inventory."""
+
+	# No index of its own: unique_room_night leads with room.
+	room = models.ForeignKey("core.Room", on_delete=models.CASCADE, related_name="nights", db_index=False)
+	booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="nights")
+	room_type = models.CharField(max_length=20)
+	date = models.DateField()
+
+	class Meta:
+		ordering = ["date", "room"]
+		constraints = [
+			models.UniqueConstraint(fields=["room", "date"], name="unique_room_night"),
+		]
+		indexes = [
+			models.Index(fields=["room_type", "date", "room"]),
+			models.Index(fields=["date", "room"]),
+		]
+
+	def __str__(self) -> str:
+		return f"Room {self.room_id} on {self.date:%Y-%m-%d}"
+
+
+class DailyRoomTypeStats(models.Model):
+	"""Per-day, per-room-type booking totals for the staff dashboard.
+
+	Arrivals, revenue, airport transfers and cancellations count on the
+	check-in date; ``nights_sold`` counts on every night of the stay. Kept up to
+	date by ``bookings.rollups``; ``manage.py backfill_daily_stats`` rebuilds it.
+	"""
+
+	date = models.DateField()
+	room_type = models.CharField(max_length=50, choices=Booking.ROOM_TYPE_CHOICES)
+	bookings = models.IntegerField(default=0)
+	nights_sold = models.IntegerField(default=0)
+	revenue = models.BigIntegerField(default=0)
+	airport_transfers = models.IntegerField(default=0)
+	cancellations = models.IntegerField(default=0)
+
+	class Meta:
+		ordering = ["date", "room_type"]
+		verbose_name_plural = "daily room type stats"
+		constraints = [
+			models.UniqueConstraint(fields=["date", "room_type"], name="unique_daily_room_type_stats"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.date} {self.room_type}"
+
+
+class RollupFreeze(models.Model):
+	"""Rollup days before ``frozen_before`` can no longer be recomputed.
+
+	``archive_bookings --purge-after`` records one before deleting archived
+	bookings, and ``rollups.rebuild`` keeps the rows before the latest one as
+	they are.
+	"""
+
+	frozen_before = models.DateField()
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		ordering = ["-frozen_before"]
+
+	def __str__(self) -> str:
+		return f"Rollups frozen before {self.frozen_before}"
+
+
+class RatePlan(models.Model):
+	"""An adjustment to the rack rates in ``Booking.ROOM_TYPE_RATES``.
+
+	Seasonal and day-of-week plans change the price of every night they cover
+	(both filters may be combined); length-of-stay plans change the room total
+	of stays of at least ``min_nights``. ``percent_change`` is signed: 20 adds
+	20%, -10 takes 10% off. Leave ``room_type`` blank to cover every type.
+	"""
+
+	KIND_CHOICES = [
+		("season", "Seasonal"),
+		("day_of_week", "Day of week"),
+		("length_of_stay", "Length of stay"),
+	]
+	WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+	name = models.CharField(max_length=100)
+	kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+	room_type = models.CharField(max_length=50, choices=Booking.ROOM_TYPE_CHOICES, blank=True)
+	start_date = models.DateField(null=True, blank=True, help_text="First night covered")
+	end_date = models.DateField(null=True, blank=True, help_text="Last night covered")
+	weekdays = models.JSONField(
+		default=list, blank=True, help_text="Nights covered, 0 = Monday to 6 = Sunday, e.g. [4, 5]"
+	)
+	min_nights = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+	percent_change = models.SmallIntegerField(validators=[MinValueValidator(-90), MaxValueValidator(500)])
+	is_active = models.BooleanField(default=True)
+
+	class Meta:
+		ordering = ["kind", "start_date", "name"]
+
+	def __str__(self) -> str:
+		return f"{self.name} ({self.percent_change:+d}%)"
+
+	def clean(self):
+		super().clean()
+		if self.start_date and self.end_date and self.end_date < self.start_date:
+			raise ValidationError({"end_date": "The season must end on or after its first night."})
+		if self.kind == "season" and not (self.start_date and self.end_date):
+			raise ValidationError("Seasonal plans need a first and last night.")
+		if not isinstance(self.weekdays, list) or any(day not in range(7) for day in self.weekdays):
+			raise ValidationError({"weekdays": "List weekdays as numbers from 0 (Monday) to 6 (Sunday)."})
+		if self.kind == "day_of_week" and not self.weekdays:
+			raise ValidationError({"weekdays": "Choose at least one weekday."})
+		if self.kind == "length_of_stay" and self.min_nights < 2:
+			raise ValidationError({"min_nights": "Length-of-stay plans start at two nights."})
+
+	def covers(self, night) -> bool:
+		"""Whether this nightly plan applies to ``night``; ignores ``room_type``."""
+		if self.start_date and night < self.start_date:
+			return False
+		if self.end_date and night > self.end_date:
+			return False
+		return not self.weekdays or night.weekday() in self.weekdays
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import render_to_string
+
+from core.jobs import email_task
+from core.hotel import hotel_context
+
+from .models import Booking
+
+
+@email_task("send_booking_confirmation")
+def booking_confirmation(payload):
+    """Confirmation email for a new booking, with an HTML receipt attached."""
+    booking = Booking.objects.select_related("room").filter(booking_reference=payload["reference"]).first()
+    if booking is None or not booking.email:
+        return None
+    context = {
+        "booking": booking,
+        "hotel": hotel_context(),
+        "room_total": booking.room_total,
+    }
+    message = EmailMultiAlternatives(
+        subject=render_to_string("bookings/emails/confirmation_subject.txt", context).strip(),
+        body=render_to_string("bookings/emails/confirmation.txt", context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.email],
+    )
+    message.attach(
+        f"receipt-{booking.booking_reference}.html",
+        render_to_string("bookings/emails/receipt.html", context),
+        "text/html",
+    )
+    return message
@@ -0,0 +1,296 @@
+"""Room prices from the rack rates and the active ``RatePlan`` rows.
+
+Seasonal and day-of-week plans are folded into a per-night price calendar for
+every room type, precomputed for a window around today together with its
+prefix sums, so the room total of any stay inside the window is a single
+subtraction. Length-of-stay plans are precomputed as the percentage that
+applies to each stay length. Stays outside the window are priced night by
+night with the same rules.
+
+The calendar lives in process memory. Plan changes bump a version stamp in
+the cache once they commit, and every process rebuilds its calendar the next
+time it sees a new stamp (it checks at most once a second) or a new day.
+"""
+
+import csv
+import time
+import uuid
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import Booking, RatePlan
+
+CALENDAR_DAYS_BEHIND = 730
+CALENDAR_DAYS_AHEAD = 730
+# Longest stay ``quote_all`` prices; the booking form itself allows seven nights.
+MAX_QUOTE_NIGHTS = 30
+# "From" prices on the public pages are the lowest nightly price this far ahead.
+FROM_PRICE_DAYS = 30
+VERSION_KEY = "hotelease:pricing:version"
+# How long a process trusts its calendar before checking the version stamp again.
+VERSION_CHECK_SECONDS = 1.0
+# Rows per INSERT into the repricing table; keeps well under SQLite's variable limit.
+REPRICE_BATCH_SIZE = 500
+REPRICE_TABLE = "bookings_reprice"
+DIFF_COLUMNS = ("booking_reference", "room_type", "check_in", "booking_days", "airport_pick_drop", "old", "new")
+
+
+def rack_rate(room_type: str) -> int:
+    """The undiscounted nightly rate for ``room_type``."""
+    return Booking.ROOM_TYPE_RATES.get(room_type, 0)
+
+
+def _adjust(amount: int, percent: int) -> int:
+    return round(amount * (100 + percent) / 100)
+
+
+class PriceCalendar:
+    """Nightly prices per room type from ``start`` for ``len(calendar)`` nights."""
+
+    def __init__(self, today: date, version: str, plans: List[RatePlan]):
+        self.today = today
+        self.version = version
+        self.checked_at = 0.0
+        self.start = today - timedelta(days=CALENDAR_DAYS_BEHIND)
+        self.size = CALENDAR_DAYS_BEHIND + CALENDAR_DAYS_AHEAD
+        self.nightly_plans = [plan for plan in plans if plan.kind != "length_of_stay"]
+        stay_plans = [plan for plan in plans if plan.kind == "length_of_stay"]
+
+        self.prices: Dict[str, List[int]] = {}
+        self.prefix: Dict[str, List[int]] = {}
+        self.stay_percent: Dict[str, List[int]] = {}
+        for room_type, rate in Booking.ROOM_TYPE_RATES.items():
+            factors = [1.0] * self.size
+            for plan in self.nightly_plans:
+                if plan.room_type and plan.room_type != room_type:
+                    continue
+                multiplier = (100 + plan.percent_change) / 100
+                for index in self._plan_nights(plan):
+                    factors[index] *= multiplier
+            prices = [round(rate * factor) for factor in factors]
+            self.prices[room_type] = prices
+            self.prefix[room_type] = list(accumulate(prices, initial=0))
+            self.stay_percent[room_type] = [
+                _stay_percent(stay_plans, room_type, nights) for nights in range(MAX_QUOTE_NIGHTS + 1)
+            ]
+
+    def __len__(self):
+        return self.size
+
+    def _plan_nights(self, plan: RatePlan):
+        first = 0 if plan.start_date is None else max((plan.start_date - self.start).days, 0)
+        last = self.size - 1 if plan.end_date is None else min((plan.end_date - self.start).days, self.size - 1)
+        weekdays = set(plan.weekdays or range(7))
+        for index in range(first, last + 1):
+            if (self.start.weekday() + index) % 7 in weekdays:
+                yield index
+
+    def night_price(self, room_type: str, night: date) -> int:
+        index = (night - self.start).days
+        if room_type in self.prices and 0 <= index < self.size:
+            return self.prices[room_type][index]
+        factor = 1.0
+        for plan in self.nightly_plans:
+            if (not plan.room_type or plan.room_type == room_type) and plan.covers(night):
+                factor *= (100 + plan.percent_change) / 100
+        return round(rack_rate(room_type) * factor)
+
+    def room_total(self, room_type: str, check_in: date, nights: int) -> int:
+        """Price of ``nights`` nights from ``check_in`` before extras such as the airport transfer."""
+        if nights <= 0:
+            return 0
+        index = (check_in - self.start).days
+        if room_type in self.prefix and 0 <= index and index + nights <= self.size:
+            prefix = self.prefix[room_type]
+            total = prefix[index + nights] - prefix[index]
+        else:
+            total = sum(self.night_price(room_type, check_in + timedelta(days=offset)) for offset in range(nights))
+        return _adjust(total, self.percent_for_stay(room_type, nights))
+
+    def percent_for_stay(self, room_type: str, nights: int) -> int:
+        percents = self.stay_percent.get(room_type)
+        if not percents:
+            return 0
+        return percents[min(nights, MAX_QUOTE_NIGHTS)]
+
+
+def _stay_percent(plans: List[RatePlan], room_type: str, nights: int) -> int:
+    """The length-of-stay adjustment for ``nights``: the plan with the highest threshold reached wins."""
+    best = None
+    for plan in plans:
+        if plan.room_type and plan.room_type != room_type:
+            continue
+        if plan.min_nights <= nights and (best is None or plan.min_nights > best.min_nights):
+            best = plan
+    return best.percent_change if best else 0
+
+
+_calendar: Optional[PriceCalendar] = None
+
+
+def _version(current: Optional[str] = None) -> str:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # First use, or the key was culled or cleared. Re-publish the version
+        # this process already holds rather than a new one, so losing the key
+        # does not make every process rebuild; the first caller's value wins.
+        cache.add(VERSION_KEY, current or uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def calendar() -> PriceCalendar:
+    """The current price calendar, rebuilt after plan changes and at the start of each day."""
+    global _calendar
+    current = _calendar
+    now = time.monotonic()
+    if current is not None and now - current.checked_at < VERSION_CHECK_SECONDS:
+        return current
+    version = _version(current.version if current is not None else None)
+    today = timezone.localdate()
+    if current is None or current.version != version or current.today != today:
+        current = _calendar = PriceCalendar(today, version, list(RatePlan.objects.filter(is_active=True)))
+    current.checked_at = now
+    return current
+
+
+def invalidate():
+    """Make every process rebuild its calendar; call once plan changes have committed."""
+    global _calendar
+    _calendar = None
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def room_total(room_type: str, check_in: date, nights: int) -> int:
+    return calendar().room_total(room_type, check_in, nights)
+
+
+def stay_price(room_type: str, check_in: date, nights: int, airport: bool = False) -> int:
+    """What a booking with these details costs, airport transfer included."""
+    return room_total(room_type, check_in, nights) + (Booking.AIRPORT_CHARGE if airport else 0)
+
+
+def quote_all(check_in: date, max_nights: int = MAX_QUOTE_NIGHTS) -> Dict[str, List[int]]:
+    """Room totals for every room type and every stay of 1..``max_nights`` nights from ``check_in``.
+
+    Element ``n - 1`` of each list is the price of an ``n``-night stay.
+    """
+    prices = calendar()
+    index = (check_in - prices.start).days
+    quotes = {}
+    for room_type, prefix in prices.prefix.items():
+        if max_nights <= MAX_QUOTE_NIGHTS and 0 <= index and index + max_nights <= prices.size:
+            base = prefix[index]
+            window = zip(prefix[index + 1:index + max_nights + 1], prices.stay_percent[room_type][1:])
+            quotes[room_type] = [_adjust(end - base, percent) if percent else end - base for end, percent in window]
+        else:
+            quotes[room_type] = [prices.room_total(room_type, check_in, nights) for nights in range(1, max_nights + 1)]
+    return quotes
+
+
+def nightly_prices(room_type: str, start: date, nights: int) -> List[int]:
+    """The calendar's price for each of ``nights`` nights from ``start``."""
+    prices = calendar()
+    index = (start - prices.start).days
+    if room_type in prices.prices and 0 <= index and index + nights <= prices.size:
+        return prices.prices[room_type][index:index + nights]
+    return [prices.night_price(room_type, start + timedelta(days=offset)) for offset in range(nights)]
+
+
+def from_prices(days: int = FROM_PRICE_DAYS) -> Dict[str, int]:
+    """The lowest nightly price of each room type over the next ``days`` nights."""
+    prices = calendar()
+    return {room_type: min(nightly_prices(room_type, prices.today, days)) for room_type in prices.prices}
+
+
+class Repricing(NamedTuple):
+    bookings: int
+    revenue: int
+    # Room type -> (bookings, revenue change).
+    by_room_type: Dict[str, Tuple[int, int]]
+
+
+def reprice(bookings, dry_run: bool = False, diff: Optional[TextIO] = None) -> Repricing:
+    """Bring the pending bookings in ``bookings`` to the current prices.
+
+    Each distinct stay (room type, check-in, nights) among them is priced
+    once from the calendar into a temporary table. A single UPDATE then sets
+    every stale ``total_price`` from it, plus the airport charge, and the
+    revenue rollups take the difference in one batch. With ``dry_run``
+    nothing is written. ``diff`` receives one CSV row per booking whose price
+    changes, old and new price included.
+    """
+    db = bookings.db
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    pending = bookings.filter(status="pending").order_by()
+    prices = calendar()
+    date_field = Booking._meta.get_field("check_in")
+    with transaction.atomic(using=db), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {qn(REPRICE_TABLE)} (room_type varchar(50) NOT NULL, check_in date NOT NULL, "
+            f"booking_days integer NOT NULL, room_total integer NOT NULL, PRIMARY KEY (room_type, check_in, booking_days))"
+        )
+        try:
+            stays = [
+                (room_type, date_field.get_db_prep_value(check_in, connection), days,
+                 prices.room_total(room_type, check_in, days))
+                for room_type, check_in, days in pending.values_list("room_type", "check_in", "booking_days").distinct()
+            ]
+            for start in range(0, len(stays), REPRICE_BATCH_SIZE):
+                batch = stays[start:start + REPRICE_BATCH_SIZE]
+                cursor.execute(
+                    f"INSERT INTO {qn(REPRICE_TABLE)} VALUES {', '.join(['(%s, %s, %s, %s)'] * len(batch))}",
+                    [value for stay in batch for value in stay],
+                )
+            return _apply_prices(pending, qn, dry_run, diff)
+        finally:
+            cursor.execute(f"DROP TABLE {qn(REPRICE_TABLE)}")
+
+
+def _apply_prices(pending, qn, dry_run: bool, diff: Optional[TextIO]) -> Repricing:
+    from . import rollups
+
+    booking = qn(Booking._meta.db_table)
+    table = qn(REPRICE_TABLE)
+    new_total = RawSQL(
+        f"SELECT room_total FROM {table} WHERE {table}.room_type = {booking}.{qn('room_type')} "
+        f"AND {table}.check_in = {booking}.{qn('check_in')} AND {table}.booking_days = {booking}.{qn('booking_days')}",
+        [],
+        output_field=IntegerField(),
+    ) + Case(When(airport_pick_drop=True, then=Value(Booking.AIRPORT_CHARGE)), default=Value(0))
+    stale = pending.alias(new_total=new_total).exclude(total_price=F("new_total"))
+
+    changes = list(
+        stale.values_list("check_in", "room_type").annotate(
+            bookings=Count("pk"), revenue=Sum(F("new_total") - F("total_price"))
+        )
+    )
+    by_room_type = {}
+    for _, room_type, count, revenue in changes:
+        counted, total = by_room_type.get(room_type, (0, 0))
+        by_room_type[room_type] = (counted + count, total + revenue)
+    if diff is not None:
+        writer = csv.writer(diff)
+        writer.writerow(DIFF_COLUMNS)
+        writer.writerows(
+            stale.annotate(new=F("new_total"))
+            .order_by("check_in", "booking_reference")
+            .values_list(*DIFF_COLUMNS[:-2], "total_price", "new")
+            .iterator()
+        )
+    if not dry_run and changes:
+        stale.update(total_price=new_total, updated_at=timezone.now())
+        rollups.record_revenue({(check_in, room_type): revenue for check_in, room_type, _, revenue in changes})
+    return Repricing(
+        bookings=sum(count for count, _ in by_room_type.values()),
+        revenue=sum(revenue for _, revenue in by_room_type.values()),
+        by_room_type=dict(sorted(by_room_type.items())),
+    )
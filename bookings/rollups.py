@@ -0,0 +1,220 @@
+"""Daily booking rollups by ``(date, room_type)``.
+
+``DailyRoomTypeStats`` lets the dashboard chart a year of activity from a few
+hundred rows. Every booking contributes to the rows returned by
+``contributions``; saves apply the difference between a booking's old and new
+contributions, bulk paths apply a batch at once, and ``rebuild`` recomputes
+everything from ``Booking`` with the same function, so the three cannot
+disagree. Only days frozen by a purge of archived bookings are left out of a
+rebuild, because their bookings are gone.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F, Max, Sum
+
+from .models import ArchivedBooking, Booking, DailyRoomTypeStats, RollupFreeze
+
+METRICS = ("bookings", "nights_sold", "revenue", "airport_transfers", "cancellations")
+STATE_FIELDS = ("check_in", "room_type", "booking_days", "total_price", "airport_pick_drop", "status")
+# Stays never exceed this many nights (see Booking.booking_days).
+MAX_STAY = 7
+# Rows per INSERT ... ON CONFLICT statement; keeps well under SQLite's variable limit.
+UPSERT_BATCH_SIZE = 500
+
+Key = Tuple[date, str]
+
+
+def state_of(booking) -> Tuple:
+    """The fields of ``booking`` that feed the rollups, in ``STATE_FIELDS`` order."""
+    return tuple(getattr(booking, field) for field in STATE_FIELDS)
+
+
+def contributions(state, sign: int = 1, into=None, since: Optional[date] = None):
+    """Add one booking's contribution (times ``sign``) to ``into`` and return it.
+
+    ``into`` maps ``(date, room_type)`` to a dict of metric deltas.
+    """
+    into = into if into is not None else defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    if state is None:
+        return into
+    check_in, room_type, days, total_price, airport, status = state
+    if status == "cancelled":
+        if since is None or check_in >= since:
+            into[(check_in, room_type)]["cancellations"] += sign
+        return into
+    if since is None or check_in >= since:
+        arrival = into[(check_in, room_type)]
+        arrival["bookings"] += sign
+        arrival["revenue"] += sign * total_price
+        arrival["airport_transfers"] += sign * int(airport)
+    for offset in range(days):
+        night = check_in + timedelta(days=offset)
+        if since is None or night >= since:
+            into[(night, room_type)]["nights_sold"] += sign
+    return into
+
+
+def _apply(deltas: Dict[Key, Dict[str, int]]):
+    rows = [(key, changes) for key, changes in deltas.items() if any(changes.values())]
+    if not rows:
+        return
+    connection = connections[router.db_for_write(DailyRoomTypeStats)]
+    if connection.features.supports_update_conflicts_with_target:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            _upsert(connection, rows[start:start + UPSERT_BATCH_SIZE])
+        return
+    for (day, room_type), changes in rows:
+        changes = {metric: value for metric, value in changes.items() if value}
+        existing = DailyRoomTypeStats.objects.filter(date=day, room_type=room_type)
+        if existing.update(**{metric: F(metric) + value for metric, value in changes.items()}):
+            continue
+        try:
+            with transaction.atomic():
+                DailyRoomTypeStats.objects.create(date=day, room_type=room_type, **changes)
+        except IntegrityError:
+            # Another transaction created the row first; apply the delta to it.
+            existing.update(**{metric: F(metric) + value for metric, value in changes.items()})
+
+
+def _upsert(connection, rows):
+    """Add the deltas for many ``(date, room_type)`` rows in one INSERT ... ON CONFLICT statement."""
+    meta = DailyRoomTypeStats._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    columns = [qn(meta.get_field(name).column) for name in ("date", "room_type", *METRICS)]
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows))
+    increments = ", ".join(f"{column} = {table}.{column} + EXCLUDED.{column}" for column in columns[2:])
+    date_field = meta.get_field("date")
+    params = []
+    for (day, room_type), changes in rows:
+        params += [date_field.get_db_prep_value(day, connection), room_type, *(changes[metric] for metric in METRICS)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({columns[0]}, {columns[1]}) DO UPDATE SET {increments}",
+            params,
+        )
+
+
+def record_change(old_state, new_state):
+    """Move a booking's contribution from ``old_state`` to ``new_state`` (either may be ``None``)."""
+    if old_state == new_state:
+        return
+    deltas = contributions(old_state, sign=-1)
+    contributions(new_state, into=deltas)
+    _apply(deltas)
+
+
+def record_changes(changes: Iterable[Tuple]):
+    """Apply many ``(old_state, new_state)`` moves at once, for bulk status changes."""
+    deltas = None
+    for old_state, new_state in changes:
+        if old_state != new_state:
+            deltas = contributions(old_state, sign=-1, into=deltas)
+            contributions(new_state, into=deltas)
+    if deltas:
+        _apply(deltas)
+
+
+def record_revenue(changes: Dict[Key, int]):
+    """Add revenue changes per ``(arrival date, room_type)``, for repricing."""
+    deltas = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    for key, revenue in changes.items():
+        deltas[key]["revenue"] += revenue
+    _apply(deltas)
+
+
+def record_bookings(bookings: Iterable):
+    """Add a batch of newly inserted bookings in one pass, for bulk write paths."""
+    deltas = None
+    for booking in bookings:
+        deltas = contributions(state_of(booking), into=deltas)
+    if deltas:
+        _apply(deltas)
+
+
+def frozen_before() -> Optional[date]:
+    """The first day whose rollups can still be recomputed, if archived bookings were ever purged."""
+    return RollupFreeze.objects.aggregate(day=Max("frozen_before"))["day"]
+
+
+def freeze_before(purge_cutoff: date) -> date:
+    """Freeze the rollup days that bookings checking in before ``purge_cutoff`` contribute to."""
+    day = purge_cutoff + timedelta(days=MAX_STAY - 1)
+    current = frozen_before()
+    if current is None or current < day:
+        RollupFreeze.objects.create(frozen_before=day)
+        return day
+    return current
+
+
+def rebuild(since: Optional[date] = None, chunk_size: int = 5000) -> int:
+    """Recompute the rollups from ``Booking`` and the archive, optionally only for dates from ``since`` on.
+
+    Days before ``frozen_before()`` lost bookings to a purge, so they are
+    kept as they are and ``since`` never reaches back past them.
+
+    Bookings are streamed and folded in memory; the result has at most one
+    row per day and room type, so it stays small whatever the booking count.
+    """
+    frozen = frozen_before()
+    if frozen is not None and (since is None or since < frozen):
+        since = frozen
+    states = []
+    for model in (Booking, ArchivedBooking):
+        bookings = model.objects.order_by()
+        if since is not None:
+            bookings = bookings.filter(check_in__gt=since - timedelta(days=MAX_STAY))
+        states.append(bookings.values_list(*STATE_FIELDS).iterator(chunk_size=chunk_size))
+    totals = None
+    for state in chain(*states):
+        totals = contributions(state, into=totals, since=since)
+    rows = [
+        DailyRoomTypeStats(date=day, room_type=room_type, **metrics)
+        for (day, room_type), metrics in (totals or {}).items()
+        if any(metrics.values())
+    ]
+    with transaction.atomic():
+        existing = DailyRoomTypeStats.objects.all()
+        if since is not None:
+            existing = existing.filter(date__gte=since)
+        existing.delete()
+        DailyRoomTypeStats.objects.bulk_create(rows, batch_size=chunk_size)
+    return len(rows)
+
+
+def daily_totals(start: date, end: date):
+    """One dict per day from ``start`` to ``end`` inclusive, summed over room types; missing days are zero."""
+    rows = {
+        row["date"]: row
+        for row in DailyRoomTypeStats.objects.filter(date__gte=start, date__lte=end)
+        .order_by()
+        .values("date")
+        .annotate(**{metric: Sum(metric) for metric in METRICS})
+    }
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        days.append(rows.get(day) or {"date": day, **dict.fromkeys(METRICS, 0)})
+    return days
+
+
+def totals_by_type(start: date, end: date):
+    """Metric totals per room type over ``start``..``end`` inclusive."""
+    return list(
+        DailyRoomTypeStats.objects.filter(date__gte=start, date__lte=end)
+        .order_by("room_type")
+        .values("room_type")
+        .annotate(**{metric: Sum(metric) for metric in METRICS})
+    )
+
+
+def all_time_booking_count() -> int:
+    """Every booking ever taken, cancelled or not, without counting ``Booking`` rows."""
+    sums = DailyRoomTypeStats.objects.aggregate(bookings=Sum("bookings"), cancellations=Sum("cancellations"))
+    return (sums["bookings"] or 0) + (sums["cancellations"] or 0)
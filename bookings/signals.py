@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import pricing, rollups
+from .models import Booking, RatePlan
+
+
+@receiver(post_delete, sender=Booking)
+def update_rollups_on_booking_delete(sender, instance, **kwargs):
+    rollups.record_change(getattr(instance, "_rollup_state", None) or rollups.state_of(instance), None)
+
+
+@receiver(post_save, sender=RatePlan)
+@receiver(post_delete, sender=RatePlan)
+def rebuild_price_calendar(sender, **kwargs):
+    transaction.on_commit(pricing.invalidate)
@@ -1,3 +1,580 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import ArchivedContactMessage, ContactMessage, Room
+
+from . import async_views, pricing, rollups
+from .admin import BookingAdmin
+from .management.commands.import_bookings import Command as ImportCommand
+from .models import ArchivedBooking, Booking, DailyRoomTypeStats, RatePlan, RoomNight
+
+
+def make_booking(**overrides):
+    fields = {
+        "full_name": "Test Guest",
+        "cnic": "4210112345671",
+        "address": "Test address",
+        "room_type": "single",
+        "check_in": date(2030, 1, 10),
+        "booking_days": 3,
+    }
+    fields.update(overrides)
+    booking = Booking(**fields)
+    booking.save()
+    return booking
+
+
+class RoomAllocationTests(TestCase):
+    def setUp(self):
+        self.room_a = Room.objects.create(number="101", room_type="single")
+        self.room_b = Room.objects.create(number="102", room_type="single")
+
+    def test_overlapping_stays_get_different_rooms(self):
+        first = make_booking()
+        second = make_booking(check_in=date(2030, 1, 12))
+        self.assertIsNotNone(first.room_id)
+        self.assertIsNotNone(second.room_id)
+        self.assertNotEqual(first.room_id, second.room_id)
+        self.assertEqual(RoomNight.objects.filter(booking=first).count(), 3)
+
+    def test_back_to_back_stays_can_share_a_room(self):
+        make_booking(room=self.room_a)
+        follow_on = make_booking(check_in=date(2030, 1, 13), room=self.room_a)
+        self.assertEqual(follow_on.room_id, self.room_a.pk)
+
+    def test_no_room_left_leaves_booking_unassigned(self):
+        make_booking()
+        make_booking()
+        third = make_booking()
+        self.assertIsNone(third.room_id)
+        self.assertFalse(RoomNight.objects.filter(booking=third).exists())
+
+    def test_cancel_releases_nights(self):
+        booking = make_booking()
+        booking.cancel()
+        self.assertFalse(RoomNight.objects.filter(booking=booking).exists())
+
+    def test_explicit_room_clash_fails_validation(self):
+        make_booking(room=self.room_a)
+        clash = Booking(
+            full_name="Second Guest",
+            cnic="4210112345671",
+            address="Test address",
+            room_type="single",
+            room=self.room_a,
+            check_in=date(2030, 1, 11),
+            booking_days=1,
+        )
+        with self.assertRaises(ValidationError):
+            clash.full_clean()
+
+
+class BookingWritePathTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for number in range(101, 141):
+            Room.objects.create(number=str(number), room_type="single")
+        # Start from a fresh calendar: one left by an earlier test may skip
+        # its version check and rebuild inside the measured request.
+        pricing.invalidate()
+        pricing.calendar()
+        self.addCleanup(pricing.invalidate)
+
+    def test_booking_post_runs_a_fixed_number_of_queries(self):
+        self.client.get(reverse("bookings:availability_api"))
+        check_in = timezone.localdate() + timedelta(days=30)
+        post = {
+            "form_name": "booking", "full_name": "Guest", "cnic": "4210112345671", "address": "Lahore",
+            "room_type": "single", "check_in": check_in.isoformat(),
+        }
+        # The reference check, the view's and save()'s savepoints, the booking
+        # INSERT choosing the room, the nights INSERT in its own savepoint, the
+        # rollup upsert and the releases; independent of the stay length.
+        for nights in (1, 7):
+            with self.assertNumQueries(10):
+                response = self.client.post(reverse("bookings:booking_form"), {**post, "booking_days": nights})
+            self.assertEqual(response.status_code, 302)
+        booking = Booking.objects.get(booking_days=7)
+        self.assertIsNotNone(booking.room_id)
+        self.assertEqual(booking.nights.count(), 7)
+        self.assertEqual(booking.total_price, pricing.stay_price("single", check_in, 7))
+
+    def test_create_many_is_constant_in_batch_size(self):
+        def batch(size, start):
+            return [
+                Booking(full_name="Group", cnic="4210112345671", address="Lahore", room_type="single",
+                        check_in=start, booking_days=2)
+                for _ in range(size)
+            ]
+
+        with self.assertNumQueries(9):
+            Booking.objects.create_many(batch(2, date(2030, 1, 1)))
+        with self.assertNumQueries(9):
+            created = Booking.objects.create_many(batch(30, date(2030, 2, 1)))
+        self.assertEqual(len({booking.room_id for booking in created}), 30)
+        self.assertEqual(RoomNight.objects.count(), 64)
+        stats = DailyRoomTypeStats.objects.get(date=date(2030, 2, 1))
+        self.assertEqual((stats.bookings, stats.revenue), (30, sum(booking.total_price for booking in created)))
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for number in range(101, 131):
+            Room.objects.create(number=str(number), room_type="single")
+
+    def batch(self, size, start):
+        return Booking.objects.create_many(
+            Booking(full_name="Group", cnic="4210112345671", address="Lahore", room_type="single",
+                    check_in=start, booking_days=2)
+            for _ in range(size)
+        )
+
+    def test_cancel_and_confirm_are_constant_in_the_number_of_bookings(self):
+        small = self.batch(2, date(2030, 1, 1))
+        large = self.batch(25, date(2030, 2, 1))
+        for bookings in (small, large):
+            with self.assertNumQueries(6):
+                self.assertEqual(Booking.objects.filter(pk__in=[b.pk for b in bookings]).cancel(), len(bookings))
+        self.assertFalse(RoomNight.objects.exists())
+        self.assertEqual(DailyRoomTypeStats.objects.get(date=date(2030, 2, 1)).cancellations, 25)
+
+        for bookings in (small, large):
+            with self.assertNumQueries(11):
+                self.assertEqual(Booking.objects.filter(pk__in=[b.pk for b in bookings]).confirm(), len(bookings))
+        self.assertEqual(RoomNight.objects.count(), 54)
+        stats = DailyRoomTypeStats.objects.get(date=date(2030, 2, 1))
+        self.assertEqual((stats.bookings, stats.cancellations), (25, 0))
+
+    def test_confirm_keeps_free_rooms_and_skips_bookings_without_one(self):
+        kept, moved = self.batch(2, date(2030, 1, 1))
+        Booking.objects.filter(pk__in=[kept.pk, moved.pk]).cancel()
+        Booking.objects.create_many(
+            Booking(full_name="Walk-in", cnic="4210112345671", address="Lahore", room_type="single",
+                    room=room, check_in=date(2030, 1, 2), booking_days=1)
+            for room in Room.objects.exclude(pk=kept.room_id)
+        )
+
+        self.assertEqual(Booking.objects.filter(pk__in=[kept.pk, moved.pk]).confirm(), 1)
+        kept_after, moved_after = Booking.objects.get(pk=kept.pk), Booking.objects.get(pk=moved.pk)
+        self.assertEqual((kept_after.status, kept_after.room_id), ("confirmed", kept.room_id))
+        self.assertEqual(moved_after.status, "cancelled")
+
+    def test_admin_actions(self):
+        bookings = self.batch(3, date(2030, 1, 1))
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "password"))
+        url = reverse("admin:bookings_booking_changelist")
+        selected = [str(booking.pk) for booking in bookings[:2]]
+        self.client.post(url, {"action": "cancel_bookings", "_selected_action": selected})
+        self.assertEqual(Booking.objects.filter(status="cancelled").count(), 2)
+        response = self.client.post(url, {"action": "confirm_bookings", "_selected_action": selected}, follow=True)
+        self.assertContains(response, "2 booking(s) confirmed.")
+        self.assertEqual(RoomNight.objects.count(), 6)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        Room.objects.create(number="101", room_type="single")
+        today = timezone.localdate()
+        self.old = make_booking(check_in=today - timedelta(days=400), booking_days=2, status="confirmed")
+        self.cancelled = make_booking(check_in=today - timedelta(days=100), status="cancelled")
+        self.recent = make_booking(check_in=today - timedelta(days=30))
+        old_messages = [
+            ContactMessage.objects.create(name="Old", email="old@example.com", subject="Hi", message="x", handled=handled)
+            for handled in (True, False)
+        ]
+        ContactMessage.objects.filter(pk__in=[m.pk for m in old_messages]).update(
+            created_at=timezone.now() - timedelta(days=200)
+        )
+        ContactMessage.objects.create(name="New", email="new@example.com", subject="Hi", message="x", handled=True)
+
+    def test_old_rows_move_to_the_archive_and_stay_reachable(self):
+        rollups_before = list(DailyRoomTypeStats.objects.values_list("date", "room_type", *rollups.METRICS))
+        out = StringIO()
+        call_command("archive_bookings", older_than=90, chunk_size=1, stdout=out)
+        self.assertIn("Archived 2 bookings in 2 chunk(s)", out.getvalue())
+        self.assertIn("Archived 1 handled messages", out.getvalue())
+
+        self.assertEqual(list(Booking.objects.values_list("pk", flat=True)), [self.recent.pk])
+        self.assertEqual(sorted(ArchivedBooking.objects.values_list("pk", flat=True)), [self.old.pk, self.cancelled.pk])
+        self.assertFalse(RoomNight.objects.filter(booking_id=self.old.pk).exists())
+        self.assertEqual(ContactMessage.objects.count(), 2)
+        self.assertEqual(ArchivedContactMessage.objects.get().name, "Old")
+        self.assertEqual(
+            list(DailyRoomTypeStats.objects.values_list("date", "room_type", *rollups.METRICS)), rollups_before
+        )
+        call_command("backfill_daily_stats", stdout=StringIO())
+        self.assertEqual(
+            sorted(DailyRoomTypeStats.objects.values_list("date", "room_type", *rollups.METRICS)),
+            sorted(row for row in rollups_before if any(row[2:])),
+        )
+
+        url = reverse("bookings:booking_confirmation", args=[self.old.booking_reference])
+        self.assertContains(self.client.get(url), self.old.booking_reference)
+        request = AsyncRequestFactory().get(url)
+        request.auser = sync_to_async(AnonymousUser)
+        response = async_to_sync(async_views.booking_confirmation)(request, reference=self.old.booking_reference)
+        self.assertContains(response, "Room 101")
+
+        call_command("archive_bookings", older_than=90, purge_after=365, stdout=StringIO())
+        self.assertEqual(list(ArchivedBooking.objects.values_list("pk", flat=True)), [self.cancelled.pk])
+        self.assertEqual(ArchivedContactMessage.objects.count(), 1)
+
+        # The purged booking's days are frozen, so a rebuild keeps them.
+        self.assertEqual(rollups.frozen_before(), timezone.localdate() - timedelta(days=365 - rollups.MAX_STAY + 1))
+        call_command("backfill_daily_stats", stdout=StringIO())
+        self.assertEqual(
+            sorted(DailyRoomTypeStats.objects.values_list("date", "room_type", *rollups.METRICS)),
+            sorted(row for row in rollups_before if any(row[2:])),
+        )
+
+
+class ConcurrentAllocationTests(TransactionTestCase):
+    def test_concurrent_bookings_never_share_a_room_night(self):
+        out = StringIO()
+        call_command("stress_bookings", threads=4, bookings=40, rooms=5, stdout=out)
+        self.assertIn("0 double-assigned", out.getvalue())
+
+
+class ImportBookingsTests(TestCase):
+    def setUp(self):
+        Room.objects.create(number="101", room_type="single")
+        self.workdir = Path(tempfile.mkdtemp())
+
+    def test_valid_rows_are_allocated_and_invalid_rows_reported(self):
+        source = self.workdir / "export.jsonl"
+        rows = [
+            {"booking_reference": "LEGACY000001", "full_name": "Old Guest", "cnic": "4210112345671",
+             "address": "Lahore", "room_type": "single", "check_in": "2020-05-01", "booking_days": 2,
+             "airport_pick_drop": "yes", "status": "confirmed"},
+            {"full_name": "Overlap Guest", "cnic": "4210112345671", "address": "Lahore",
+             "room_type": "single", "check_in": "2020-05-02", "booking_days": 1},
+            {"full_name": "Bad Guest", "cnic": "nope", "address": "Lahore",
+             "room_type": "single", "check_in": "2020-05-01", "booking_days": 9},
+        ]
+        source.write_text("\n".join(json.dumps(row) for row in rows) + "\n{broken\n")
+
+        call_command("import_bookings", str(source), stdout=StringIO())
+
+        legacy = Booking.objects.get(booking_reference="LEGACY000001")
+        self.assertEqual(legacy.total_price, 5000 * 2 + Booking.AIRPORT_CHARGE)
+        self.assertIsNotNone(legacy.room_id)
+        self.assertIsNone(Booking.objects.get(full_name="Overlap Guest").room_id)
+        self.assertEqual(RoomNight.objects.count(), 2)
+        rejects = [json.loads(line) for line in (self.workdir / "export.jsonl.rejects.jsonl").read_text().splitlines()]
+        self.assertEqual([reject["line"] for reject in rejects], [3, 4])
+        self.assertIn("cnic", rejects[0]["errors"])
+
+    def test_dry_run_carries_claims_across_chunks(self):
+        source = self.workdir / "export.jsonl"
+        rows = [
+            {"booking_reference": reference, "full_name": "Guest", "cnic": "4210112345671", "address": "Lahore",
+             "room_type": "single", "check_in": "2030-05-01", "booking_days": 2}
+            for reference in ("DRYRUN000001", "DRYRUN000002", "DRYRUN000001")
+        ]
+        source.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        out = StringIO()
+
+        call_command("import_bookings", str(source), dry_run=True, chunk_size=1, stdout=out)
+
+        self.assertIn("Validated 2 bookings (1 with rooms)", out.getvalue())
+        self.assertFalse(Booking.objects.exists())
+        reject = json.loads((self.workdir / "export.jsonl.rejects.jsonl").read_text())
+        self.assertEqual((reject["line"], list(reject["errors"])), (3, ["booking_reference"]))
+
+    def test_references_taken_while_importing_are_rejected_not_reported_as_conflicts(self):
+        source = self.workdir / "export.jsonl"
+        rows = [
+            {"booking_reference": reference, "full_name": "Guest", "cnic": "4210112345671", "address": "Lahore",
+             "room_type": "single", "check_in": check_in, "booking_days": 1}
+            for reference, check_in in (("RACE00000001", "2030-05-01"), ("RACE00000002", "2030-05-02"))
+        ]
+        source.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        validate = ImportCommand._drop_duplicate_references
+
+        def validate_then_race(command, bookings):
+            unique = validate(command, bookings)
+            make_booking(booking_reference="RACE00000001", check_in=date(2030, 6, 1))
+            return unique
+
+        out = StringIO()
+        with mock.patch.object(ImportCommand, "_drop_duplicate_references", validate_then_race):
+            call_command("import_bookings", str(source), stdout=out)
+
+        self.assertIn("Imported 1 bookings", out.getvalue())
+        self.assertEqual(Booking.objects.get(check_in=date(2030, 5, 2)).booking_reference, "RACE00000002")
+        reject = json.loads((self.workdir / "export.jsonl.rejects.jsonl").read_text())
+        self.assertEqual((reject["line"], list(reject["errors"])), (1, ["booking_reference"]))
+
+    def test_references_of_archived_bookings_stay_taken(self):
+        make_booking(booking_reference="ARCHIVED0001", check_in=timezone.localdate() - timedelta(days=200))
+        call_command("archive_bookings", older_than=90, stdout=StringIO())
+        source = self.workdir / "export.jsonl"
+        source.write_text(json.dumps(
+            {"booking_reference": "archived0001", "full_name": "Returning Guest", "cnic": "4210112345671",
+             "address": "Lahore", "room_type": "single", "check_in": "2030-05-01", "booking_days": 1}
+        ) + "\n")
+
+        call_command("import_bookings", str(source), stdout=StringIO())
+
+        self.assertFalse(Booking.objects.exists())
+        reject = json.loads((self.workdir / "export.jsonl.rejects.jsonl").read_text())
+        self.assertIn("booking_reference", reject["errors"])
+        drawn = [mock.Mock(hex="archived0001"), mock.Mock(hex="fresh0000001")]
+        with mock.patch("bookings.models.uuid.uuid4", side_effect=drawn):
+            self.assertEqual(Booking.generate_reference(), "FRESH0000001")
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        Room.objects.create(number="101", room_type="single")
+
+    def snapshot(self):
+        return list(DailyRoomTypeStats.objects.values_list("date", "room_type", *rollups.METRICS))
+
+    def test_booking_writes_update_rollups_incrementally(self):
+        booking = make_booking(booking_days=2, airport_pick_drop=True)
+        arrival = DailyRoomTypeStats.objects.get(date=date(2030, 1, 10), room_type="single")
+        self.assertEqual((arrival.bookings, arrival.nights_sold, arrival.airport_transfers), (1, 1, 1))
+        self.assertEqual(arrival.revenue, 5000 * 2 + Booking.AIRPORT_CHARGE)
+        self.assertEqual(DailyRoomTypeStats.objects.get(date=date(2030, 1, 11)).nights_sold, 1)
+
+        Booking.objects.get(pk=booking.pk).cancel()
+        arrival.refresh_from_db()
+        self.assertEqual((arrival.bookings, arrival.nights_sold, arrival.revenue, arrival.cancellations), (0, 0, 0, 1))
+
+        Booking.objects.get(pk=booking.pk).delete()
+        arrival.refresh_from_db()
+        self.assertEqual(arrival.cancellations, 0)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        make_booking(booking_days=3)
+        moved = make_booking(check_in=date(2030, 1, 20))
+        moved.booking_days = 5
+        moved.save()
+        incremental = [row for row in self.snapshot() if any(row[2:])]
+        call_command("backfill_daily_stats", stdout=StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+
+class BookingApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Room.objects.create(number="101", room_type="single")
+        Room.objects.create(number="102", room_type="single")
+
+    def single(self, response):
+        return next(entry for entry in response.json()["room_types"] if entry["code"] == "single")
+
+    def test_availability_tracks_bookings_and_revalidates_with_etag(self):
+        url = reverse("bookings:availability_api")
+        first = self.client.get(url)
+        self.assertEqual(self.single(first)["available"], 2)
+        self.assertIn("max-age", first["Cache-Control"])
+        with self.assertNumQueries(0):
+            unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(unchanged.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(check_in=timezone.localdate(), booking_days=1)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(self.single(changed)["available"], 1)
+
+        dated = self.client.get(url, {"check_in": "2030-02-01", "check_out": "2030-02-03"})
+        self.assertEqual(self.single(dated)["available"], 2)
+        self.assertEqual(self.client.get(url, {"check_in": "2030-02-03", "check_out": "2030-02-01"}).status_code, 400)
+
+    def test_quote_matches_booking_total(self):
+        response = self.client.get(reverse("bookings:quote_api"), {"room_type": "suite", "nights": 3, "airport": "1"})
+        booking = Booking(room_type="suite", booking_days=3, airport_pick_drop=True)
+        self.assertEqual(response.json()["total"], booking.calculate_total())
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertEqual(
+            self.client.get(reverse("bookings:quote_api"), {"room_type": "suite", "nights": 9}).status_code, 400
+        )
+
+
+class PriceCalendarVersionTests(TestCase):
+    def test_losing_the_version_key_does_not_rebuild_the_calendar(self):
+        self.addCleanup(pricing.invalidate)
+        pricing.invalidate()
+        built = pricing.calendar()
+        cache.delete(pricing.VERSION_KEY)
+        built.checked_at = 0.0
+        with self.assertNumQueries(0):
+            self.assertIs(pricing.calendar(), built)
+        self.assertEqual(cache.get(pricing.VERSION_KEY), built.version)
+
+
+class PricingTests(TestCase):
+    def setUp(self):
+        self.addCleanup(pricing.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            # 2030-01-10 is a Thursday; the season covers Friday and Saturday.
+            RatePlan.objects.create(
+                name="Winter peak", kind="season", start_date=date(2030, 1, 11), end_date=date(2030, 1, 12),
+                percent_change=20,
+            )
+            RatePlan.objects.create(name="Weekend", kind="day_of_week", weekdays=[5, 6], percent_change=10)
+            RatePlan.objects.create(
+                name="Long stay", kind="length_of_stay", room_type="single", min_nights=3, percent_change=-10
+            )
+
+    def test_stay_price_combines_nightly_and_length_of_stay_plans(self):
+        nightly = pricing.nightly_prices("single", date(2030, 1, 10), 4)
+        self.assertEqual(nightly, [5000, 6000, 6600, 5500])
+        booking = make_booking(check_in=date(2030, 1, 10), booking_days=4, airport_pick_drop=True)
+        self.assertEqual(booking.total_price, round(sum(nightly) * 0.9) + Booking.AIRPORT_CHARGE)
+        self.assertEqual(pricing.room_total("deluxe", date(2030, 1, 10), 2), 8000 + 9600)
+
+    def test_quote_table_matches_per_stay_prices(self):
+        table = pricing.quote_all(date(2030, 1, 8))
+        for room_type, totals in table.items():
+            self.assertEqual(len(totals), pricing.MAX_QUOTE_NIGHTS)
+            for nights in (1, 3, 7, 30):
+                self.assertEqual(totals[nights - 1], pricing.room_total(room_type, date(2030, 1, 8), nights))
+        response = self.client.get(reverse("bookings:quote_table_api"), {"check_in": "2030-01-08", "nights": 7})
+        self.assertEqual(response.json()["room_rent"]["single"], table["single"][:7])
+
+    def test_booking_form_seeds_the_summary_with_calendar_prices(self):
+        response = self.client.get(reverse("bookings:booking_form"))
+        quotes = response.context["form_quotes"]
+        today = timezone.localdate()
+        self.assertEqual(quotes["check_in"], today.isoformat())
+        self.assertEqual(quotes["room_rent"]["single"][3], pricing.room_total("single", today, 4))
+        self.assertContains(response, 'id="room-quotes-data"')
+
+    def test_price_is_kept_until_the_stay_changes(self):
+        booking = make_booking(check_in=date(2030, 1, 10), booking_days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            RatePlan.objects.create(
+                name="Surge", kind="season", start_date=date(2030, 1, 1), end_date=date(2030, 1, 31), percent_change=50
+            )
+        booking.notes = "Late arrival"
+        booking.save()
+        self.assertEqual(booking.total_price, 5000)
+        booking.booking_days = 2
+        booking.save()
+        self.assertEqual(booking.total_price, 7500 + 9000)
+
+
+class RepricingTests(TestCase):
+    def setUp(self):
+        self.addCleanup(pricing.invalidate)
+        for number in range(101, 104):
+            Room.objects.create(number=str(number), room_type="single")
+        self.pending = make_booking(check_in=date(2030, 1, 10), booking_days=2, airport_pick_drop=True)
+        self.confirmed = make_booking(check_in=date(2030, 1, 10), booking_days=2, status="confirmed")
+        self.later = make_booking(check_in=date(2030, 3, 1), booking_days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            RatePlan.objects.create(
+                name="Surge", kind="season", start_date=date(2030, 1, 1), end_date=date(2030, 1, 31), percent_change=50
+            )
+
+    def test_dry_run_diff_then_one_update_for_stale_pending_bookings(self):
+        diff = StringIO()
+        preview = Booking.objects.reprice(dry_run=True, diff=diff)
+        self.assertEqual((preview.bookings, preview.revenue), (1, 5000))
+        rows = diff.getvalue().splitlines()
+        self.assertEqual(rows[1], f"{self.pending.booking_reference},single,2030-01-10,2,True,17000,22000")
+        self.assertEqual(len(rows), 2)
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.total_price, 17000)
+
+        out = StringIO()
+        call_command("reprice_bookings", stdout=out)
+        self.assertIn("Repriced 1 pending bookings (+5,000 PKR)", out.getvalue())
+        totals = dict(Booking.objects.values_list("pk", "total_price"))
+        self.assertEqual(totals, {self.pending.pk: 22000, self.confirmed.pk: 10000, self.later.pk: 5000})
+        self.assertEqual(DailyRoomTypeStats.objects.get(date=date(2030, 1, 10)).revenue, 32000)
+        self.assertEqual(Booking.objects.reprice().bookings, 0)
+
+    def test_admin_preview_downloads_the_diff(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "password"))
+        response = self.client.post(
+            reverse("admin:bookings_booking_changelist"),
+            {"action": "preview_repricing", "_selected_action": [self.pending.pk, self.later.pk]},
+        )
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(",17000,22000", response.content.decode())
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.total_price, 17000)
+
+
+class BookingSearchTests(TestCase):
+    def setUp(self):
+        Room.objects.create(number="101", room_type="single")
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+
+    def search(self, term):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:bookings_booking_changelist"), {"q": term})
+        sql = " ".join(query["sql"] for query in queries)
+        self.assertIn("MATCH", sql)
+        self.assertNotIn("LIKE", sql)
+        return [booking.pk for booking in response.context["cl"].result_list]
+
+    def test_admin_search_is_served_by_the_full_text_index(self):
+        guest = make_booking(full_name="Ayesha Khan", email="ayesha.khan@example.com", phone_number="03001234567")
+        make_booking(full_name="Bilal Ahmed", check_in=date(2030, 2, 1))
+
+        for term in ("ayes", "khan@example", "0300123", guest.booking_reference.lower(), '"ayesha khan"'):
+            self.assertEqual(self.search(term), [guest.pk], term)
+        self.assertEqual(self.search("ayesha bilal"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        booking = make_booking(full_name="Ayesha Khan")
+        booking.full_name = "Hina Malik"
+        booking.save()
+        self.assertEqual(self.search("ayesha"), [])
+        self.assertEqual(self.search("hina"), [booking.pk])
+
+        booking.delete()
+        self.assertEqual(self.search("hina"), [])
+
+
+class BookingChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Room.objects.create(number="101", room_type="single")
+        self.bookings = [make_booking(check_in=date(2030, 1, 1) + timedelta(days=5 * index)) for index in range(5)]
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+        self.url = reverse("admin:bookings_booking_changelist")
+
+    def page(self, number):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"p": number})
+        sql = [query["sql"] for query in queries if "bookings_booking" in query["sql"]]
+        return [booking.pk for booking in response.context["cl"].result_list], sql
+
+    def test_next_pages_seek_past_the_previous_page_and_counts_are_cached(self):
+        newest_first = [booking.pk for booking in reversed(self.bookings)]
+        with mock.patch.object(BookingAdmin, "list_per_page", 2):
+            first, first_sql = self.page(1)
+            second, second_sql = self.page(2)
+            third, _ = self.page(3)
+
+        self.assertEqual(first + second + third, newest_first)
+        self.assertEqual(sum("COUNT(" in sql for sql in first_sql), 1)
+        self.assertEqual(sum("COUNT(" in sql for sql in second_sql), 0)
+        self.assertFalse(any("OFFSET" in sql for sql in second_sql))
+        self.assertNotIn('"notes"', second_sql[-1])
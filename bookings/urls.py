@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "bookings"
 
+# See core/urls.py.
+public = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     path("", views.booking_create, name="booking_form"),
-    path("confirm/<str:reference>/", views.booking_confirmation, name="booking_confirmation"),
+    path("confirm/<str:reference>/", public.booking_confirmation, name="booking_confirmation"),
+    path("api/availability/", public.availability_api, name="availability_api"),
+    path("api/quote/", views.quote_api, name="quote_api"),
+    path("api/quotes/", views.quote_table_api, name="quote_table_api"),
 ]
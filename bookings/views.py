@@ -1,14 +1,33 @@
+from datetime import date
+
 from django.contrib import messages
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 
-from core.forms import ReviewForm
+from core import counters, jobs
+from core.cache import cached_section
+from core.forms import AvailabilityForm, ReviewForm
+from core.http import cacheable_json
 from core.models import Review
+from core.pagination import keyset_page
 
-from .forms import BookingForm
-from .models import Booking
+from . import inventory, pricing
+from .forms import BookingForm, QuoteForm, QuoteTableForm
+from .models import ArchivedBooking, Booking
 
 RATING_RANGE = range(1, 6)
+# Availability moves with every booking, so shared caches only hold it briefly;
+# quotes only change with the rate plans and can be kept longer.
+AVAILABILITY_MAX_AGE = 30
+AVAILABILITY_S_MAXAGE = 60
+QUOTE_MAX_AGE = 5 * 60
+QUOTE_S_MAXAGE = 60 * 60
+# Longest stay the booking form accepts (see Booking.booking_days).
+MAX_FORM_NIGHTS = 7
 
 
 def booking_create(request):
@@ -17,9 +36,12 @@ def booking_create(request):
     if request.method == "POST":
         form_name = request.POST.get("form_name")
         if form_name == "booking":
-            booking_form = BookingForm(request.POST)
+            booking_form = BookingForm(request.POST, room_types=_stocked_room_types())
             if booking_form.is_valid():
-                booking = booking_form.save()
+                with transaction.atomic():
+                    booking = booking_form.save()
+                    if booking.email:
+                        jobs.enqueue("send_booking_confirmation", {"reference": booking.booking_reference})
                 messages.success(request, "Booking confirmed! Our concierge will be in touch shortly.")
                 return redirect("bookings:booking_confirmation", reference=booking.booking_reference)
         elif form_name == "review":
@@ -29,12 +51,13 @@ def booking_create(request):
                 messages.success(request, "Thank you for sharing your experience with HotelEase.")
                 return redirect(f"{reverse('bookings:booking_form')}#guest-reviews")
 
-    reviews = Review.objects.order_by("-created_at")
+    reviews, next_cursor = keyset_page(Review.objects.all())
+    from_prices = pricing.from_prices()
     rate_cards = [
         {
             "code": value,
             "label": label,
-            "price": Booking.ROOM_TYPE_RATES.get(value, 0),
+            "price": from_prices.get(value, 0),
         }
         for value, label in Booking.ROOM_TYPE_CHOICES
     ]
@@ -42,8 +65,9 @@ def booking_create(request):
         "form": booking_form,
         "review_form": review_form,
         "reviews": reviews,
+        "next_cursor": next_cursor,
         "rating_range": RATING_RANGE,
-        "rate_map": Booking.ROOM_TYPE_RATES,
+        "form_quotes": _form_quotes(booking_form),
         "rate_cards": rate_cards,
         "airport_charge": Booking.AIRPORT_CHARGE,
     }
@@ -51,10 +75,109 @@ def booking_create(request):
 
 
 def booking_confirmation(request, reference):
-    booking = get_object_or_404(Booking.objects.select_related("room"), booking_reference=reference)
+    booking = Booking.objects.select_related("room").filter(booking_reference=reference).first()
+    if booking is None:
+        # Old references live in the archive (see archive_bookings).
+        booking = get_object_or_404(ArchivedBooking.objects.select_related("room"), booking_reference=reference)
     context = {
         "booking": booking,
-        "rate_map": Booking.ROOM_TYPE_RATES,
         "airport_charge": Booking.AIRPORT_CHARGE,
     }
     return render(request, "bookings/booking_confirmation.html", context)
+
+
+def _form_quotes(booking_form):
+    """Room rent per type and stay length for the form's check-in date, for the summary card.
+
+    The card shows these until the quote API answers, so its first figures
+    already match what the booking will be charged.
+    """
+    try:
+        check_in = date.fromisoformat(str(booking_form["check_in"].value()))
+    except ValueError:
+        check_in = timezone.localdate()
+    return {"check_in": check_in.isoformat(), "room_rent": pricing.quote_all(check_in, MAX_FORM_NIGHTS)}
+
+
+def _availability_payload(check_in, check_out, by_type):
+    labels = dict(Booking.ROOM_TYPE_CHOICES)
+    return {
+        "check_in": check_in.isoformat(),
+        "check_out": check_out.isoformat(),
+        "room_types": [
+            {
+                "code": code,
+                "label": labels.get(code, code.title()),
+                "rate": Booking.ROOM_TYPE_RATES.get(code, 0),
+                **by_type.get(code, {"total": 0, "booked": 0, "available": 0}),
+            }
+            for code in labels
+        ],
+    }
+
+
+def _tonight_availability():
+    check_in, check_out = inventory.tonight_range()
+    return _availability_payload(check_in, check_out, counters.availability_by_type())
+
+
+def _stocked_room_types():
+    """Room types with at least one room, from the cached availability section."""
+    availability = cached_section("availability", _tonight_availability)
+    return {entry["code"] for entry in availability["room_types"] if entry["total"]}
+
+
+@require_GET
+def availability_api(request):
+    """Rooms free per type, tonight by default or for ``check_in``/``check_out``."""
+    if "check_in" not in request.GET:
+        payload = cached_section("availability", _tonight_availability)
+    else:
+        form = AvailabilityForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        check_in, check_out = form.stay()
+        payload = _availability_payload(check_in, check_out, inventory.availability_by_type(check_in, check_out))
+    return cacheable_json(request, payload, AVAILABILITY_MAX_AGE, AVAILABILITY_S_MAXAGE)
+
+
+def quote(room_type: str, check_in, nights: int, airport: bool = False):
+    """Price a stay exactly as ``Booking.calculate_total`` will."""
+    room_rent = pricing.room_total(room_type, check_in, nights)
+    airport_charge = Booking.AIRPORT_CHARGE if airport else 0
+    return {
+        "room_type": room_type,
+        "check_in": check_in.isoformat(),
+        "nights": nights,
+        "airport_pick_drop": airport,
+        "nightly_rates": pricing.nightly_prices(room_type, check_in, nights),
+        "room_rent": room_rent,
+        "airport_charge": airport_charge,
+        "total": room_rent + airport_charge,
+    }
+
+
+@require_GET
+def quote_api(request):
+    """Price quote for ``room_type``, ``check_in``, ``nights`` and the optional ``airport`` transfer."""
+    form = QuoteForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    data = form.cleaned_data
+    payload = quote(data["room_type"], data["check_in"], data["nights"], data["airport"])
+    return cacheable_json(request, payload, QUOTE_MAX_AGE, QUOTE_S_MAXAGE)
+
+
+@require_GET
+def quote_table_api(request):
+    """Room rent for every room type and every stay of 1..``nights`` nights from ``check_in``."""
+    form = QuoteTableForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    check_in = form.cleaned_data["check_in"]
+    payload = {
+        "check_in": check_in.isoformat(),
+        "airport_charge": Booking.AIRPORT_CHARGE,
+        "room_rent": pricing.quote_all(check_in, form.cleaned_data["nights"]),
+    }
+    return cacheable_json(request, payload, QUOTE_MAX_AGE, QUOTE_S_MAXAGE)
@@ -1,10 +1,12 @@
 from django.contrib import admin
+from django.utils import timezone
 
-from .models import ContactMessage, Review, Room, Service
+from .models import ArchivedContactMessage, ContactMessage, Job, Review, Room, Service
+from .search import IndexedSearchAdmin
 
 
 @admin.register(Room)
-class RoomAdmin(admin.ModelAdmin):
+class RoomAdmin(IndexedSearchAdmin):
 	list_display = ("number", "room_type", "price", "is_available")
 	list_filter = ("room_type", "is_available")
 	search_fields = ("number", "description")
@@ -19,14 +21,41 @@ class ServiceAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(IndexedSearchAdmin):
 	list_display = ("name", "rating", "created_at")
 	list_filter = ("rating",)
 	search_fields = ("name", "comment")
 
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(IndexedSearchAdmin):
 	list_display = ("subject", "name", "email", "handled", "created_at")
 	list_filter = ("handled",)
 	search_fields = ("name", "email", "subject")
+
+
+@admin.register(ArchivedContactMessage)
+class ArchivedContactMessageAdmin(admin.ModelAdmin):
+	list_display = ("subject", "name", "email", "created_at", "archived_at")
+	search_fields = ("name", "email", "subject")
+
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+	list_display = ("name", "status", "attempts", "run_at", "finished_at", "created_at")
+	list_filter = ("status", "name")
+	readonly_fields = ("locked_by", "locked_at", "last_error", "created_at", "finished_at")
+	actions = ("retry_now",)
+
+	@admin.action(description="Retry selected jobs now")
+	def retry_now(self, request, queryset):
+		updated = queryset.exclude(status="running").update(
+			status="queued", run_at=timezone.now(), attempts=0, finished_at=None
+		)
+		self.message_user(request, f"{updated} job(s) queued to run again.")
@@ -0,0 +1,71 @@
+"""Moving old rows into archive tables in short transactions.
+
+An archive table has the same columns as its live table plus
+``archived_at``, and keeps each row's id. Rows move one chunk of ids at a
+time: the chunk's boundaries are read first, then one transaction copies
+the chunk with ``INSERT ... SELECT`` and deletes it from the live table.
+The copy is the transaction's first statement, so on SQLite it takes the
+write lock before anything is read, and the lock is held for one chunk
+only. Deletes go straight to the table, so ``post_delete`` receivers (such
+as the booking rollups) don't run; the full-text search triggers do.
+"""
+
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+from django.db import connections, transaction
+from django.db.models import DateTimeField, Value
+from django.utils import timezone
+
+
+def move(queryset, archive, chunk_size: int = 2000,
+         before_delete: Optional[Callable] = None) -> Iterator[Tuple[int, float]]:
+    """Move the rows of ``queryset`` into the ``archive`` model, yielding ``(rows, seconds)`` per chunk.
+
+    ``before_delete`` receives a queryset of the chunk's archived ids inside
+    the chunk's transaction, to clear rows that point at the live ones.
+    """
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+    fields = [field for field in archive._meta.concrete_fields if field.name != "archived_at"]
+    columns = ", ".join(qn(field.column) for field in [*fields, archive._meta.get_field("archived_at")])
+    live = queryset.model._meta
+    after = None
+    while True:
+        pending = queryset.order_by("pk")
+        if after is not None:
+            pending = pending.filter(pk__gt=after)
+        ids = list(pending.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        chunk = pending.filter(pk__lte=ids[-1]).order_by()
+        archived = archive.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]).order_by().values("pk")
+        select, params = (
+            chunk.annotate(archived_at=Value(timezone.now(), output_field=DateTimeField()))
+            .values_list(*(field.attname for field in fields), "archived_at")
+            .query.get_compiler(queryset.db).as_sql()
+        )
+        began = time.perf_counter()
+        with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {qn(archive._meta.db_table)} ({columns}) {select}", params)
+            moved = cursor.rowcount
+            if before_delete is not None:
+                before_delete(archived)
+            subquery, subquery_params = archived.query.get_compiler(queryset.db).as_sql()
+            cursor.execute(
+                f"DELETE FROM {qn(live.db_table)} WHERE {qn(live.pk.column)} IN ({subquery})", subquery_params
+            )
+        yield moved, time.perf_counter() - began
+        after = ids[-1]
+
+
+def purge(queryset, chunk_size: int = 2000) -> Iterator[Tuple[int, float]]:
+    """Delete the rows of ``queryset`` a chunk at a time, yielding ``(rows, seconds)`` per chunk."""
+    while True:
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        began = time.perf_counter()
+        with transaction.atomic(using=queryset.db):
+            deleted, _ = queryset.model._base_manager.using(queryset.db).filter(pk__in=ids).delete()
+        yield deleted, time.perf_counter() - began
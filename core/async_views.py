@@ -0,0 +1,129 @@
+"""Async versions of the public pages, routed when served through ASGI.
+
+Each view starts its independent lookups (cached sections, the price
+calendar, the signed-in user) together with ``asyncio.gather`` and uses the
+async ORM, so a worker keeps serving other requests while one waits on the
+cache or the database. The context and templates are the synchronous views';
+only how the data is fetched differs. Writes still run in synchronous code
+(through ``sync_to_async``) so they keep their transactions.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from bookings import inventory, pricing
+
+from . import counters, ratings, views
+from .cache import acached_section
+from .forms import AvailabilityForm, ContactForm
+from .hotel import hotel_context
+from .models import Review, Service
+from .pagination import akeyset_page
+
+
+async def arender(request, template_name, context, user=None):
+    """``render`` for async views.
+
+    Templates read ``user`` (the navbar), which would otherwise load the
+    session lazily, and synchronously, in the middle of rendering.
+    """
+    request.user = user if user is not None else await request.auser()
+    return render(request, template_name, context)
+
+
+async def _room_stats():
+    return await counters.atotals()
+
+
+async def _featured_services():
+    return [service async for service in Service.objects.filter(featured=True)[:6]] or views.DEFAULT_SERVICES
+
+
+async def _spotlight_reviews():
+    return [review async for review in Review.objects.all()[:3]]
+
+
+async def _contact_saved(form) -> bool:
+    def save():
+        if not form.is_valid():
+            return False
+        views._save_contact_message(form)
+        return True
+
+    return await sync_to_async(save)()
+
+
+async def home(request):
+    """HotelEase landing page with hero, highlights, and contact form."""
+    contact_form = ContactForm(request.POST or None)
+    if request.method == "POST" and await _contact_saved(contact_form):
+        messages.success(request, "Thank you for contacting HotelEase. Our team will reach out shortly.")
+        return redirect(f"{reverse('core:home')}#contact")
+
+    stats, services, reviews, from_prices, user = await asyncio.gather(
+        acached_section("stats", _room_stats),
+        acached_section("featured_services", _featured_services),
+        acached_section("spotlight_reviews", _spotlight_reviews),
+        sync_to_async(pricing.from_prices)(),
+        request.auser(),
+    )
+    context = views._home_context(stats, services, reviews, from_prices, contact_form)
+    return await arender(request, "core/home.html", context, user)
+
+
+async def rooms_view(request):
+    availability_form = AvailabilityForm(request.GET if "check_in" in request.GET else None)
+    check_in, check_out = availability_form.stay()
+    if availability_form.is_bound and availability_form.is_valid():
+        by_type = inventory.aavailability_by_type(check_in, check_out)
+    else:
+        by_type = counters.aavailability_by_type()
+
+    async def rooms():
+        return [room async for room in views._rooms_query(check_in, check_out)]
+
+    room_list, by_type, user = await asyncio.gather(rooms(), by_type, request.auser())
+    context = views._rooms_context(availability_form, room_list, by_type)
+    return await arender(request, "core/rooms.html", context, user)
+
+
+async def services_view(request):
+    async def services():
+        return [service async for service in Service.objects.all()]
+
+    services, user = await asyncio.gather(services(), request.auser())
+    return await arender(request, "core/services.html", views._services_context(services), user)
+
+
+async def reviews_view(request):
+    (reviews, next_cursor), summary, user = await asyncio.gather(
+        akeyset_page(Review.objects.all()), ratings.asummary(), request.auser()
+    )
+    context = views._reviews_context(reviews, next_cursor, summary)
+    return await arender(request, "core/reviews.html", context, user)
+
+
+@require_GET
+async def reviews_feed(request):
+    """JSON page of reviews for infinite scroll; pass ``cursor`` from the previous page."""
+    try:
+        reviews, next_cursor = await akeyset_page(
+            Review.objects.all(), request.GET.get("cursor"), views._feed_size(request)
+        )
+    except ValueError:
+        return JsonResponse(views.FEED_ERROR, status=400)
+    return views._feed_response(reviews, next_cursor)
+
+
+async def contact_view(request):
+    form = ContactForm(request.POST or None)
+    if request.method == "POST" and await _contact_saved(form):
+        messages.success(request, "Thanks for reaching out! We'll reply shortly.")
+        return redirect("core:contact")
+    return await arender(request, "core/contact.html", {"form": form, "hotel": hotel_context()})
@@ -0,0 +1,94 @@
+"""Section-level caching for the public pages.
+
+Views cache the *data* behind each page section rather than the rendered
+HTML, so per-request output such as the CSRF token and flash messages still
+renders normally. Model signals drop the affected keys once the writing
+transaction commits.
+
+Each section also keeps a longer-lived stale copy. After an invalidation the
+first request to miss takes a short lock and recomputes; concurrent requests
+that lose the lock are served the stale copy (or wait briefly for the winner)
+so a burst of traffic triggers a single recompute.
+"""
+
+import asyncio
+import time
+
+from django.core.cache import cache
+
+SECTION_TIMEOUT = 300
+STALE_TIMEOUT = 60 * 60 * 24
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+WAIT_ATTEMPTS = 20
+
+_MISSING = object()
+
+
+def _key(name: str) -> str:
+    return f"hotelease:section:{name}"
+
+
+def _stale_key(name: str) -> str:
+    return f"hotelease:section:{name}:stale"
+
+
+def _lock_key(name: str) -> str:
+    return f"hotelease:section:{name}:lock"
+
+
+def cached_section(name: str, builder, timeout: int = SECTION_TIMEOUT):
+    """Return the cached value for ``name``, building it at most once per miss."""
+    value = cache.get(_key(name), _MISSING)
+    if value is not _MISSING:
+        return value
+
+    if cache.add(_lock_key(name), True, LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(_key(name), value, timeout)
+            cache.set(_stale_key(name), value, STALE_TIMEOUT)
+        finally:
+            cache.delete(_lock_key(name))
+        return value
+
+    value = cache.get(_stale_key(name), _MISSING)
+    if value is not _MISSING:
+        return value
+    for _ in range(WAIT_ATTEMPTS):
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(_key(name), _MISSING)
+        if value is not _MISSING:
+            return value
+    return builder()
+
+
+async def acached_section(name: str, builder, timeout: int = SECTION_TIMEOUT):
+    """``cached_section`` for async views; ``builder`` is a coroutine function."""
+    value = await cache.aget(_key(name), _MISSING)
+    if value is not _MISSING:
+        return value
+
+    if await cache.aadd(_lock_key(name), True, LOCK_TIMEOUT):
+        try:
+            value = await builder()
+            await cache.aset(_key(name), value, timeout)
+            await cache.aset(_stale_key(name), value, STALE_TIMEOUT)
+        finally:
+            await cache.adelete(_lock_key(name))
+        return value
+
+    value = await cache.aget(_stale_key(name), _MISSING)
+    if value is not _MISSING:
+        return value
+    for _ in range(WAIT_ATTEMPTS):
+        await asyncio.sleep(WAIT_INTERVAL)
+        value = await cache.aget(_key(name), _MISSING)
+        if value is not _MISSING:
+            return value
+    return await builder()
+
+
+def invalidate(*names: str):
+    """Drop the fresh copies of the given sections, keeping the stale ones."""
+    cache.delete_many([_key(name) for name in names])
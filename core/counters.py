@@ -0,0 +1,101 @@
+"""Per-room-type occupancy counters.
+
+``RoomTypeCounter`` mirrors ``COUNT(*)`` over ``Room`` grouped by type and
+``is_available`` so the public pages can read hotel-wide stats from a handful
+of rows. Every code path that changes a room's type or flag adjusts the
+counters in the same transaction; ``manage.py reconcile_room_counters``
+rebuilds them from scratch if they ever drift.
+"""
+
+from typing import Dict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .cache import invalidate
+from .models import Room, RoomTypeCounter
+
+
+def adjust(room_type: str, total: int = 0, booked: int = 0):
+    """Apply deltas to one room type's counter row, creating it on first use."""
+    if not total and not booked:
+        return
+    updated = RoomTypeCounter.objects.filter(pk=room_type).update(
+        total=F("total") + total, booked=F("booked") + booked
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            RoomTypeCounter.objects.create(room_type=room_type, total=total, booked=booked)
+    except IntegrityError:
+        # Another transaction created the row first; apply the delta to it.
+        RoomTypeCounter.objects.filter(pk=room_type).update(
+            total=F("total") + total, booked=F("booked") + booked
+        )
+
+
+def record_room_change(old, new):
+    """Adjust counters for a room moving from ``old`` to ``new``.
+
+    Each state is a ``(room_type, is_available)`` pair, or ``None`` when the
+    room did not exist before (or no longer exists after) the change.
+    """
+    if old == new:
+        return
+    if old is not None:
+        adjust(old[0], total=-1, booked=0 if old[1] else -1)
+    if new is not None:
+        adjust(new[0], total=1, booked=0 if new[1] else 1)
+
+
+def rebuild() -> int:
+    """Recompute every counter row with a single GROUP BY over ``Room``."""
+    rows = (
+        Room.objects.order_by()
+        .values("room_type")
+        .annotate(total=Count("id"), booked=Count("id", filter=Q(is_available=False)))
+    )
+    with transaction.atomic():
+        RoomTypeCounter.objects.all().delete()
+        RoomTypeCounter.objects.bulk_create(
+            RoomTypeCounter(room_type=row["room_type"], total=row["total"], booked=row["booked"])
+            for row in rows
+        )
+        transaction.on_commit(lambda: invalidate("stats", "availability"))
+    return len(rows)
+
+
+def _totals(sums):
+    total, booked = sums["total"] or 0, sums["booked"] or 0
+    return total, max(total - booked, 0), booked
+
+
+def totals():
+    """Return hotel-wide (total, available, booked) room counts.
+
+    Summed over the per-type rows, one per ``Room.ROOM_TYPES`` entry, rather
+    than read from a hotel-wide row: such a row would make every room write
+    of every type update the same row, and the sum already reads only a
+    handful of rows.
+    """
+    return _totals(RoomTypeCounter.objects.aggregate(total=Sum("total"), booked=Sum("booked")))
+
+
+async def atotals():
+    """``totals`` for async views."""
+    return _totals(await RoomTypeCounter.objects.aaggregate(total=Sum("total"), booked=Sum("booked")))
+
+
+def _counts(counter) -> Dict[str, int]:
+    return {"total": counter.total, "booked": counter.booked, "available": counter.available}
+
+
+def availability_by_type() -> Dict[str, Dict[str, int]]:
+    """Tonight's counts per room type, shaped like ``inventory.availability_by_type``."""
+    return {counter.room_type: _counts(counter) for counter in RoomTypeCounter.objects.filter(total__gt=0)}
+
+
+async def aavailability_by_type() -> Dict[str, Dict[str, int]]:
+    """``availability_by_type`` for async views."""
+    return {counter.room_type: _counts(counter) async for counter in RoomTypeCounter.objects.filter(total__gt=0)}
@@ -1,5 +1,8 @@
 
+from datetime import timedelta
+
 from django import forms
+from django.utils import timezone
 
 from .models import ContactMessage, Review
 
@@ -42,3 +45,27 @@ class ReviewForm(StyledFormMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["rating"].choices = Review.RATING_CHOICES
+
+
+class AvailabilityForm(StyledFormMixin, forms.Form):
+    check_in = forms.DateField(widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"))
+    check_out = forms.DateField(widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        today = timezone.localdate()
+        self.initial.setdefault("check_in", today)
+        self.initial.setdefault("check_out", today + timedelta(days=1))
+
+    def clean(self):
+        cleaned = super().clean()
+        check_in, check_out = cleaned.get("check_in"), cleaned.get("check_out")
+        if check_in and check_out and check_out <= check_in:
+            raise forms.ValidationError("Check-out must be after check-in.")
+        return cleaned
+
+    def stay(self):
+        """Return the requested (check_in, check_out) pair, defaulting to tonight."""
+        if self.is_bound and self.is_valid():
+            return self.cleaned_data["check_in"], self.cleaned_data["check_out"]
+        return self.initial["check_in"], self.initial["check_out"]
@@ -0,0 +1,12 @@
+"""Hotel details shown on the public pages and in guest emails."""
+
+
+def hotel_context():
+    return {
+        "hotel_name": "HotelEase",
+        "check_in": "Anytime (Welcome 24/7)",
+        "check_out": "12 PM Fixed",
+        "phone": "0307-2034454",
+        "email": "mursaleenmalik286@gmail.com",
+        "address": "Punjab University Employees Housing Society, Phase 2, Block A",
+    }
@@ -0,0 +1,22 @@
+"""HTTP caching helpers for the read-only JSON endpoints.
+
+Responses carry a strong ETag derived from the exact body plus a public
+``Cache-Control`` header, so browsers and a reverse proxy can reuse them for
+``max-age``/``s-maxage`` seconds and revalidate cheaply afterwards: a matching
+``If-None-Match`` gets an empty 304 instead of the body.
+"""
+
+import hashlib
+
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+
+def cacheable_json(request, payload, max_age: int, s_maxage: int):
+    """Return ``payload`` as JSON with a strong ETag, or a 304 if the client already has it."""
+    response = JsonResponse(payload)
+    etag = quote_etag(hashlib.sha256(response.content).hexdigest()[:32])
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=max_age, s_maxage=s_maxage)
+    return get_conditional_response(request, etag=etag, response=response)
@@ -0,0 +1,170 @@
+"""Responsive renditions of gallery, room and review photos.
+
+Every source image is resized to the widths in ``renditions.WIDTHS`` (never upscaled)
+and encoded as WebP and JPEG. A rendition entry records the source, its size
+and the path of each encoded file:
+
+    {"source": "images/D Room.1.jpg", "width": 864, "height": 578,
+     "webp": [[160, "responsive/d-room1-….webp"], …], "jpeg": [[160, …], …]}
+
+Entries for the bundled ``static/images`` set live in a JSON manifest next to
+the files, written by ``manage.py build_image_renditions``. Entries for
+uploads live on the owning row (``Room.renditions``, ``Review.renditions``,
+keyed by field name) and are built by a background job queued when an image
+changes. The ``responsive_image`` template tag turns an entry into ``srcset``
+and ``sizes``; an image without a current entry is served as before.
+"""
+
+import json
+import os
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from django.templatetags.static import static
+
+from .jobs import enqueue, task
+from .renditions import FORMATS, STATIC_PREFIX, build_entry, render
+
+SOURCE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+MEDIA_PREFIX = "renditions"
+MANIFEST_NAME = "manifest.json"
+# Image fields that get renditions, per model.
+IMAGE_FIELDS = {
+    "core.room": ("main_image", "washroom_image", "balcony_image", "exterior_image"),
+    "core.review": ("photo",),
+}
+
+
+# Static gallery images -------------------------------------------------------
+
+
+def static_root() -> Path:
+    return Path(getattr(settings, "RESPONSIVE_IMAGE_ROOT", Path(settings.STATICFILES_DIRS[0]) / STATIC_PREFIX))
+
+
+def write_manifest(entries: Dict[str, dict]):
+    root = static_root()
+    temporary = root / f"{MANIFEST_NAME}.tmp"
+    temporary.write_text(json.dumps(entries, indent=1, sort_keys=True))
+    os.replace(temporary, root / MANIFEST_NAME)
+
+
+_manifest = {"version": None, "entries": {}}
+
+
+def static_manifest() -> Dict[str, dict]:
+    """The static manifest, re-read whenever the file changes on disk."""
+    path = static_root() / MANIFEST_NAME
+    try:
+        version = (path, path.stat().st_mtime_ns)
+    except OSError:
+        return {}
+    if _manifest["version"] != version:
+        _manifest["entries"] = json.loads(path.read_text())
+        _manifest["version"] = version
+    return _manifest["entries"]
+
+
+# Uploaded images -------------------------------------------------------------
+
+
+def stale_fields(instance) -> List[str]:
+    """Image fields of ``instance`` whose renditions are missing or belong to an older file."""
+    renditions = instance.renditions or {}
+    stale = []
+    for field in IMAGE_FIELDS.get(instance._meta.label_lower, ()):
+        value = getattr(instance, field)
+        current = renditions.get(field)
+        if (value and (current or {}).get("source") != value.name) or (not value and current):
+            stale.append(field)
+    return stale
+
+
+def queue_renditions(instance):
+    """Queue a rendition build if any of ``instance``'s images changed and none is waiting already."""
+    if stale_fields(instance):
+        enqueue("build_image_renditions", {"model": instance._meta.label_lower, "pk": instance.pk}, unique=True)
+
+
+def _save_upload(name: str, content: bytes):
+    default_storage.delete(name)
+    default_storage.save(name, ContentFile(content))
+
+
+def files(entry: Optional[dict]):
+    """Every rendition file name in ``entry``."""
+    return {name for extension, _, _ in FORMATS for _, name in (entry or {}).get(extension, ())}
+
+
+@task("build_image_renditions")
+def build_renditions(payload):
+    """Render every changed image field of one row and record the entries on it."""
+    model = apps.get_model(payload["model"])
+    instance = model.objects.filter(pk=payload["pk"]).first()
+    if instance is None:
+        return
+    renditions = dict(instance.renditions or {})
+    for field in stale_fields(instance):
+        previous = renditions.pop(field, None)
+        value = getattr(instance, field)
+        if value:
+            with value.open("rb") as handle:
+                data = handle.read()
+            directory = f"{MEDIA_PREFIX}/{PurePosixPath(value.name).parent}"
+            renditions[field] = build_entry(value.name, data, render(data), directory, _save_upload)
+        for name in files(previous) - files(renditions.get(field)):
+            default_storage.delete(name)
+    model.objects.filter(pk=instance.pk).update(renditions=renditions)
+    if model._meta.label_lower == "core.review":
+        from .cache import invalidate
+
+        invalidate("spotlight_reviews")
+
+
+# Lookups for templates and JSON ----------------------------------------------
+
+
+def entry_for(image) -> Optional[dict]:
+    """The current rendition entry for a static path or an uploaded ``FieldFile``, if any."""
+    if isinstance(image, FieldFile):
+        if not image:
+            return None
+        entry = (getattr(image.instance, "renditions", None) or {}).get(image.field.name)
+        return entry if entry and entry.get("source") == image.name else None
+    return static_manifest().get(str(image))
+
+
+def url_for(image, name: str) -> str:
+    """URL of a rendition file of ``image``."""
+    if isinstance(image, FieldFile):
+        return default_storage.url(name)
+    return static(name)
+
+
+def source_url(image) -> str:
+    if isinstance(image, FieldFile):
+        return image.url
+    return static(str(image))
+
+
+def srcset(image, entry: dict, extension: str) -> str:
+    return ", ".join(f"{url_for(image, name)} {width}w" for width, name in entry[extension])
+
+
+def rendition_name(entry: dict, extension: str, min_width: int) -> str:
+    """Name of the smallest rendition at least ``min_width`` wide, or of the largest."""
+    candidates = entry[extension]
+    return next((name for width, name in candidates if width >= min_width), candidates[-1][1])
+
+
+def best_url(image, min_width: int) -> str:
+    """URL of the smallest JPEG rendition at least ``min_width`` wide, or of the original."""
+    entry = entry_for(image)
+    if not entry:
+        return source_url(image)
+    return url_for(image, rendition_name(entry, "jpeg", min_width))
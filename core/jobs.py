@@ -0,0 +1,202 @@
+"""A small durable job queue backed by the ``Job`` table.
+
+Jobs are inserted in the caller's transaction, so a job exists exactly when
+the booking or message that caused it was committed, and nothing runs in the
+request itself. ``manage.py run_worker`` claims due jobs in batches, runs
+them, and retries failures with exponential backoff.
+
+Two kinds of task can be registered:
+
+* ``@task("name")`` functions take the payload and do the work themselves.
+* ``@email_task("name")`` functions take the payload and return an
+  ``EmailMessage`` (or ``None`` to skip). The worker sends every message of a
+  batch over a single SMTP connection.
+"""
+
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.core.mail import get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+# A job still marked running after this long belongs to a worker that died.
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+_tasks: Dict[str, Callable] = {}
+_email_tasks: Dict[str, Callable] = {}
+
+
+def task(name: str):
+    def register(func):
+        _tasks[name] = func
+        return func
+
+    return register
+
+
+def email_task(name: str):
+    def register(func):
+        _email_tasks[name] = func
+        return func
+
+    return register
+
+
+def is_registered(name: str) -> bool:
+    return name in _tasks or name in _email_tasks
+
+
+def enqueue(
+    name: str,
+    payload: Optional[dict] = None,
+    delay: Optional[timedelta] = None,
+    max_attempts: int = 5,
+    unique: bool = False,
+) -> Job:
+    """Queue ``name`` to run with ``payload`` as part of the current transaction.
+
+    With ``unique``, a job with the same name and payload that is still
+    waiting to run is returned instead of queueing another. Running jobs
+    don't count: they may have read their input before the caller's change.
+    """
+    if not is_registered(name):
+        raise KeyError(f"No job task registered as {name!r}.")
+    payload = payload or {}
+    if unique:
+        waiting = Job.objects.filter(name=name, payload=payload, status="queued").first()
+        if waiting is not None:
+            return waiting
+    run_at = timezone.now() + (delay or timedelta())
+    return Job.objects.create(name=name, payload=payload, run_at=run_at, max_attempts=max_attempts)
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retry number ``attempts``: exponential with jitter, capped."""
+    seconds = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def claim(batch_size: int = BATCH_SIZE) -> List[Job]:
+    """Atomically mark up to ``batch_size`` due jobs as running for this caller and return them.
+
+    The claim is a single UPDATE guarded by the same status conditions as the
+    selection, so two workers can never both win the same job.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = Q(status="queued", run_at__lte=now) | Q(status="running", locked_at__lt=now - LOCK_TIMEOUT)
+    candidates = Job.objects.filter(due).order_by("run_at", "id").values_list("pk", flat=True)[:batch_size]
+    claimed = Job.objects.filter(due, pk__in=list(candidates)).update(
+        status="running", locked_by=token, locked_at=now
+    )
+    if not claimed:
+        return []
+    return list(Job.objects.filter(locked_by=token, status="running"))
+
+
+def _finish(job: Job):
+    job.status = "done"
+    job.finished_at = timezone.now()
+    job.last_error = ""
+    job.save(update_fields=["status", "finished_at", "last_error"])
+
+
+def _fail(job: Job, error: BaseException):
+    job.attempts += 1
+    job.last_error = "".join(traceback.format_exception(error))[-4000:]
+    if job.attempts >= job.max_attempts:
+        job.status = "failed"
+        job.finished_at = timezone.now()
+        logger.error("Job %s failed permanently: %s", job, error)
+    else:
+        job.status = "queued"
+        job.run_at = timezone.now() + backoff(job.attempts)
+        logger.warning("Job %s failed (attempt %s), retrying at %s: %s", job, job.attempts, job.run_at, error)
+    job.save(update_fields=["attempts", "last_error", "status", "finished_at", "run_at"])
+
+
+def run_batch(jobs: List[Job]) -> Dict[str, int]:
+    """Run claimed jobs; returns counts of ``done`` and ``failed`` (including retried) jobs."""
+    results = {"done": 0, "failed": 0}
+    outgoing = []
+    for job in jobs:
+        try:
+            if job.name in _email_tasks:
+                message = _email_tasks[job.name](job.payload)
+                if message is not None:
+                    outgoing.append((job, message))
+                    continue
+            elif job.name in _tasks:
+                _tasks[job.name](job.payload)
+            else:
+                raise LookupError(f"No job task registered as {job.name!r}.")
+        except Exception as exc:
+            _fail(job, exc)
+            results["failed"] += 1
+            continue
+        _finish(job)
+        results["done"] += 1
+
+    if outgoing:
+        sent = _send_emails(outgoing)
+        results["done"] += sent
+        results["failed"] += len(outgoing) - sent
+    return results
+
+
+def _send_emails(outgoing) -> int:
+    """Send every message over one connection, failing only the jobs whose message failed."""
+    sent = 0
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as exc:
+        for job, _ in outgoing:
+            _fail(job, exc)
+        return 0
+    try:
+        for job, message in outgoing:
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as exc:
+                _fail(job, exc)
+                continue
+            _finish(job)
+            sent += 1
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            logger.warning("Could not close the mail connection cleanly.", exc_info=True)
+    return sent
+
+
+def run_due(batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """Claim and run due jobs until none are left; used by ``run_worker --once``."""
+    totals = {"done": 0, "failed": 0}
+    while True:
+        jobs = claim(batch_size)
+        if not jobs:
+            return totals
+        for key, count in run_batch(jobs).items():
+            totals[key] += count
+
+
+def purge(older_than: timedelta) -> int:
+    """Delete finished jobs older than ``older_than``; failed jobs are kept for inspection."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = Job.objects.filter(status="done", finished_at__lt=cutoff).delete()
+    return deleted
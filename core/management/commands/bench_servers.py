@@ -0,0 +1,162 @@
+import asyncio
+import importlib.util
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_OUTPUT = "benchmarks/servers.json"
+DEFAULT_PATHS = ["/", "/rooms/", "/reviews/", "/reviews/feed/", "/booking/api/availability/"]
+STARTUP_SECONDS = 30
+
+
+def percentile(samples, share):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+async def fetch(host, port, path):
+    """One GET over a fresh connection; returns the status code."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def load(host, port, paths, concurrency, total):
+    """``total`` requests from ``concurrency`` clients cycling through ``paths``."""
+    latencies, errors = [], 0
+    issued = 0
+
+    async def client():
+        nonlocal issued, errors
+        while issued < total:
+            path = paths[issued % len(paths)]
+            issued += 1
+            began = time.perf_counter()
+            try:
+                status = await fetch(host, port, path)
+            except OSError:
+                errors += 1
+                continue
+            if status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - began
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the public pages under WSGI (gunicorn, threaded workers, synchronous views) and ASGI "
+        "(uvicorn, async views) at increasing concurrency against the current database, and report "
+        "requests/sec and p50/p95/p99 latency. Both servers run the same number of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+        parser.add_argument("--concurrency", nargs="+", type=int, default=[10, 50, 200])
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per concurrency level.")
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes per server.")
+        parser.add_argument("--threads", type=int, default=8, help="Threads per gunicorn worker.")
+        parser.add_argument("--servers", nargs="+", choices=("wsgi", "asgi"), default=["wsgi", "asgi"])
+        parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+
+    def handle(self, *args, **options):
+        missing = [name for name in ("gunicorn", "uvicorn") if importlib.util.find_spec(name) is None]
+        if missing:
+            raise CommandError(f"Install {' and '.join(missing)} to run the load test (pip install {' '.join(missing)}).")
+
+        results = {}
+        for server in options["servers"]:
+            port = self._free_port()
+            with self._serve(server, port, options):
+                asyncio.run(load("127.0.0.1", port, options["paths"], 4, 4 * len(options["paths"])))
+                results[server] = {}
+                for concurrency in options["concurrency"]:
+                    stats = asyncio.run(
+                        load("127.0.0.1", port, options["paths"], concurrency, options["requests"])
+                    )
+                    results[server][str(concurrency)] = stats
+                    self.stdout.write(
+                        f"{server:<5} c={concurrency:<4} {stats['rps']:>7,.0f} req/s  p50 {stats['p50_ms']:7.1f} ms  "
+                        f"p95 {stats['p95_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  errors {stats['errors']}"
+                    )
+
+        output = Path(settings.BASE_DIR) / options["output"]
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({"options": {
+            key: options[key] for key in ("paths", "requests", "workers", "threads")
+        }, "results": results}, indent=2) + "\n")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            return probe.getsockname()[1]
+
+    def _serve(self, server, port, options):
+        if server == "wsgi":
+            command = [
+                sys.executable, "-m", "gunicorn", "hotel_management.wsgi:application",
+                "--bind", f"127.0.0.1:{port}", "--workers", str(options["workers"]),
+                "--threads", str(options["threads"]), "--log-level", "warning",
+            ]
+        else:
+            command = [
+                sys.executable, "-m", "uvicorn", "hotel_management.asgi:application",
+                "--host", "127.0.0.1", "--port", str(port), "--workers", str(options["workers"]),
+                "--log-level", "warning", "--no-access-log",
+            ]
+        return _Server(command, port, cwd=settings.BASE_DIR)
+
+
+class _Server:
+    def __init__(self, command, port, cwd):
+        self.command, self.port, self.cwd = command, port, cwd
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, cwd=self.cwd, env=os.environ.copy())
+        deadline = time.monotonic() + STARTUP_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.5).close()
+                return self
+            except OSError:
+                if self.process.poll() is not None:
+                    break
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f"{' '.join(self.command[:4])} did not start.")
+
+    def __exit__(self, *exc_info):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
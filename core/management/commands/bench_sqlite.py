@@ -0,0 +1,186 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from django.utils import timezone
+
+from bookings import inventory
+from bookings.models import Booking
+from core import counters
+from core.models import Room
+
+ROOM_TYPES = [code for code, _ in Booking.ROOM_TYPE_CHOICES]
+
+
+def percentile(samples, share):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare read and write throughput of the SQLite profiles in settings.SQLITE_PROFILES. Each profile "
+        "gets a freshly migrated scratch database and a separate process running reader and writer threads "
+        "for a fixed time; every operation is treated as one request, so connections are closed or reused "
+        "as the profile's CONN_MAX_AGE says. Reports operations/sec, p95 latency and 'database is locked' errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", nargs="+", default=list(settings.SQLITE_PROFILES))
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=10.0)
+        parser.add_argument("--rooms", type=int, default=300)
+        parser.add_argument("--worker", action="store_true", help="Internal: run one profile in this process.")
+
+    def handle(self, *args, **options):
+        if options["worker"]:
+            self.stdout.write(json.dumps(self._run(options)))
+            return
+        unknown = set(options["profiles"]) - set(settings.SQLITE_PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(sorted(unknown))}")
+
+        results = {}
+        for profile in options["profiles"]:
+            with tempfile.TemporaryDirectory() as directory:
+                env = {
+                    **os.environ,
+                    "HOTELEASE_DB_PROFILE": profile,
+                    "HOTELEASE_DB_NAME": str(Path(directory) / "bench.sqlite3"),
+                }
+                manage = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")]
+                subprocess.run([*manage, "migrate", "--noinput", "-v", "0"], env=env, check=True)
+                worker = subprocess.run(
+                    [
+                        *manage, "bench_sqlite", "--worker",
+                        "--readers", str(options["readers"]), "--writers", str(options["writers"]),
+                        "--seconds", str(options["seconds"]), "--rooms", str(options["rooms"]),
+                    ],
+                    env=env, check=True, capture_output=True, text=True,
+                )
+                results[profile] = json.loads(worker.stdout.strip().splitlines()[-1])
+            self._report(profile, results[profile])
+
+        if "default" in results and len(results) > 1:
+            base = results["default"]
+            for profile, result in results.items():
+                if profile == "default":
+                    continue
+                self.stdout.write(self.style.SUCCESS(
+                    f"{profile} vs default: reads x{self._ratio(result['reads'], base['reads'])}, "
+                    f"writes x{self._ratio(result['writes'], base['writes'])}, "
+                    f"locked errors {base['locked']} -> {result['locked']}."
+                ))
+
+    @staticmethod
+    def _ratio(value, base):
+        return f"{value['per_second'] / base['per_second']:.2f}" if base["per_second"] else "inf"
+
+    def _report(self, profile, result):
+        self.stdout.write(f"{profile}: {result['pragmas']}")
+        for kind in ("reads", "writes"):
+            stats = result[kind]
+            self.stdout.write(
+                f"  {kind:<6} {stats['count']:>7,} ops  {stats['per_second']:>8,.0f}/s  "
+                f"p50 {stats['p50_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms"
+            )
+        self.stdout.write(f"  'database is locked' errors: {result['locked']}, other errors: {result['errors']}")
+
+    # Worker process -----------------------------------------------------------
+
+    def _run(self, options):
+        Room.objects.bulk_create(
+            Room(number=f"B{index:05d}", room_type=ROOM_TYPES[index % len(ROOM_TYPES)])
+            for index in range(options["rooms"])
+        )
+        counters.rebuild()
+        today = timezone.localdate()
+        references = []
+        latencies = {"reads": [], "writes": []}
+        failures = {"locked": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + options["seconds"]
+        barrier = threading.Barrier(options["readers"] + options["writers"])
+
+        def read(rng):
+            check_in = today + timedelta(days=rng.randrange(60))
+            inventory.availability_by_type(check_in, check_in + timedelta(days=2))
+            counters.totals()
+            if references:
+                Booking.objects.filter(booking_reference=rng.choice(references)).select_related("room").first()
+
+        def write(rng):
+            booking = Booking(
+                full_name="Bench Guest",
+                cnic="4210112345671",
+                address="Benchmark",
+                room_type=rng.choice(ROOM_TYPES),
+                check_in=today + timedelta(days=rng.randrange(365)),
+                booking_days=rng.randint(1, 3),
+            )
+            booking.save()
+            references.append(booking.booking_reference)
+
+        def worker(kind, operation, seed):
+            rng = random.Random(seed)
+            samples = []
+            barrier.wait()
+            while time.perf_counter() < stop:
+                # Each operation stands in for one request: Django runs this
+                # at the start and end of every request.
+                close_old_connections()
+                began = time.perf_counter()
+                try:
+                    operation(rng)
+                    samples.append(time.perf_counter() - began)
+                except OperationalError as exc:
+                    with lock:
+                        failures["locked" if "locked" in str(exc) else "errors"] += 1
+                close_old_connections()
+            connection.close()
+            with lock:
+                latencies[kind].extend(samples)
+
+        threads = [
+            threading.Thread(target=worker, args=("reads", read, index)) for index in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=("writes", write, 1000 + index)) for index in range(options["writers"])
+        ]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size"):
+                cursor.execute(f"PRAGMA {pragma}")
+                pragmas[pragma] = cursor.fetchone()[0]
+        return {
+            "pragmas": pragmas,
+            **{
+                kind: {
+                    "count": len(samples),
+                    "per_second": len(samples) / elapsed,
+                    "p50_ms": percentile(samples, 0.5) * 1000,
+                    "p95_ms": percentile(samples, 0.95) * 1000,
+                }
+                for kind, samples in latencies.items()
+            },
+            **failures,
+        }
@@ -0,0 +1,257 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking
+from core.models import Room
+
+# Dataset sizes passed to ``seed_hotelease``; "tiny" keeps the test suite fast.
+SCALES = {
+    "tiny": {"rooms": 12, "bookings": 60, "reviews": 30, "messages": 10},
+    "small": {"rooms": 100, "bookings": 2_000, "reviews": 500, "messages": 200},
+    "medium": {"rooms": 1_000, "bookings": 50_000, "reviews": 10_000, "messages": 2_000},
+    "large": {"rooms": 5_000, "bookings": 500_000, "reviews": 100_000, "messages": 20_000},
+}
+DEFAULT_OUTPUT = "benchmarks/views.json"
+DEFAULT_BASELINE = "benchmarks/views_baseline.json"
+# Latency must grow by both the relative tolerance and this many milliseconds
+# before it counts as a regression, so sub-millisecond noise is ignored.
+LATENCY_FLOOR_MS = 2.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the public and staff views against synthetic datasets of several sizes, "
+        "recording p50/p95 latency, SQL query count and peak Python memory per endpoint, "
+        "and compare the results with a stored baseline. Each dataset is seeded into a freshly migrated "
+        "scratch database served by a separate process, so writes commit as they would in production "
+        "and existing data is untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+        parser.add_argument("--samples", type=int, default=30, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests before sampling.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+        parser.add_argument("--save-baseline", action="store_true", help="Also store these results as the baseline.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25, help="Allowed relative p50 growth before flagging (0.25 = 25%%)."
+        )
+        parser.add_argument("--worker", action="store_true", help="Internal: run one scale in this process.")
+
+    def handle(self, *args, **options):
+        if options["samples"] < 1:
+            raise CommandError("--samples must be at least 1.")
+        if options["worker"]:
+            # Measure with production-like settings: DEBUG query logging alone
+            # adds noticeable overhead to every query.
+            with override_settings(DEBUG=False, EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+                self.stdout.write(json.dumps(self._run_scale(options["scales"][0], options)))
+            return
+        results = {
+            "generated_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "samples": options["samples"],
+            "scales": {},
+        }
+        for scale in options["scales"]:
+            self.stdout.write(f"Scale {scale}: {SCALES[scale]}")
+            results["scales"][scale] = self._run_worker(scale, options)
+            for label, measured in results["scales"][scale]["endpoints"].items():
+                self.stdout.write(
+                    f"  {label:<26} p50 {measured['p50_ms']:>8.2f} ms  "
+                    f"p95 {measured['p95_ms']:>8.2f} ms  "
+                    f"{measured['queries']:>3} queries  "
+                    f"{measured['peak_kb']:>8,} KiB"
+                )
+
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2) + "\n")
+        self.stdout.write(f"Results written to {output}")
+
+        baseline_path = Path(options["baseline"])
+        regressions = []
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            regressions = self._compare(results, baseline, options["tolerance"])
+        else:
+            self.stdout.write(f"No baseline at {baseline_path}; pass --save-baseline to create one.")
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+            self.stdout.write(f"Baseline saved to {baseline_path}")
+        elif regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}.")
+
+    def _run_worker(self, scale, options):
+        """Seed and measure ``scale`` in a child process on a scratch database, as bench_sqlite does.
+
+        Every request commits, so the ``on_commit`` cache invalidations fire
+        and the timings include them; a rolled-back transaction would hide both.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "HOTELEASE_DB_NAME": str(Path(directory) / "bench.sqlite3")}
+            manage = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")]
+            subprocess.run([*manage, "migrate", "--noinput", "-v", "0"], env=env, check=True)
+            worker = subprocess.run(
+                [
+                    *manage, "bench_views", "--worker", "--scales", scale,
+                    "--samples", str(options["samples"]), "--warmup", str(options["warmup"]),
+                    "--seed", str(options["seed"]),
+                ],
+                env=env, check=True, stdout=subprocess.PIPE, text=True,
+            )
+        return json.loads(worker.stdout.strip().splitlines()[-1])
+
+    def _run_scale(self, scale, options):
+        began = time.perf_counter()
+        call_command("seed_hotelease", seed=options["seed"], stdout=StringIO(), **SCALES[scale])
+        seeded_in = time.perf_counter() - began
+
+        staff = get_user_model().objects.create_user("bench-staff", password="bench", is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        measured = {}
+        for label, method, url, data in self._endpoints():
+            # Start every endpoint from a cold cache, then let the warm-up
+            # requests fill it, as a long-running server would.
+            cache.clear()
+            measured[label] = self._measure(client, method, url, data, options)
+        cache.clear()
+        return {"dataset": SCALES[scale], "seeded_in_s": round(seeded_in, 2), "endpoints": measured}
+
+    def _endpoints(self):
+        room_type = Room.objects.values_list("room_type", flat=True).order_by("number").first() or "single"
+        reference = Booking.objects.order_by("-id").values_list("booking_reference", flat=True).first()
+        check_in = timezone.localdate() + timedelta(days=30)
+        counter = iter(range(10 ** 9))
+
+        def booking_post():
+            # A fresh guest per request so every POST does the full allocation path.
+            return {
+                "form_name": "booking",
+                "full_name": f"Bench Guest {next(counter)}",
+                "cnic": "4210112345671",
+                "address": "Benchmark Street",
+                "room_type": room_type,
+                "check_in": check_in.isoformat(),
+                "booking_days": 2,
+            }
+
+        endpoints = [
+            ("home", "get", reverse("core:home"), None),
+            ("rooms_view", "get", reverse("core:rooms"), None),
+            (
+                "rooms_view (dated)",
+                "get",
+                reverse("core:rooms") + f"?check_in={check_in}&check_out={check_in + timedelta(days=3)}",
+                None,
+            ),
+            ("services_view", "get", reverse("core:services"), None),
+            ("reviews_view", "get", reverse("core:reviews"), None),
+            ("dashboard", "get", reverse("core:dashboard"), None),
+            ("booking_create GET", "get", reverse("bookings:booking_form"), None),
+            ("booking_create POST", "post", reverse("bookings:booking_form"), booking_post),
+        ]
+        if reference:
+            endpoints.append((
+                "booking_confirmation",
+                "get",
+                reverse("bookings:booking_confirmation", args=[reference]),
+                None,
+            ))
+        return endpoints
+
+    def _request(self, client, method, url, data):
+        response = getattr(client, method)(url, data() if data else None)
+        if response.status_code not in (200, 302):
+            raise CommandError(f"{method.upper()} {url} returned {response.status_code}.")
+        return response
+
+    def _measure(self, client, method, url, data, options):
+        for _ in range(options["warmup"]):
+            self._request(client, method, url, data)
+
+        timings = []
+        for _ in range(options["samples"]):
+            began = time.perf_counter()
+            self._request(client, method, url, data)
+            timings.append((time.perf_counter() - began) * 1000)
+
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            self._request(client, method, url, data)
+        # Count now: the next request's request_started signal clears the log.
+        queries = len(captured)
+
+        # tracemalloc slows allocation down considerably, so peak memory gets
+        # its own request instead of skewing the timed samples.
+        tracemalloc.start()
+        try:
+            self._request(client, method, url, data)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            "queries": queries,
+            "peak_kb": peak // 1024,
+        }
+
+    def _compare(self, results, baseline, tolerance):
+        regressions = []
+        for scale, current in results["scales"].items():
+            previous = baseline.get("scales", {}).get(scale)
+            if not previous:
+                continue
+            for label, now in current["endpoints"].items():
+                before = previous["endpoints"].get(label)
+                if not before:
+                    continue
+                if now["queries"] > before["queries"]:
+                    regressions.append(f"{scale}/{label}: {before['queries']} -> {now['queries']} queries")
+                # The tail is noisier than the median, so it gets twice the slack.
+                for metric, slack in (("p50_ms", tolerance), ("p95_ms", tolerance * 2)):
+                    allowed = max(before[metric] * (1 + slack), before[metric] + LATENCY_FLOOR_MS)
+                    if now[metric] > allowed:
+                        regressions.append(
+                            f"{scale}/{label}: {metric[:3]} {before[metric]:.2f} -> {now[metric]:.2f} ms"
+                        )
+        if regressions:
+            self.stdout.write(self.style.ERROR("Regressions against baseline:"))
+            for line in regressions:
+                self.stdout.write(f"  {line}")
+        else:
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+        return regressions
@@ -0,0 +1,95 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core import images, renditions
+from core.models import Review, Room
+
+# Viewport width used for the mobile byte count in the summary.
+MOBILE_WIDTH = 480
+
+
+class Command(BaseCommand):
+    help = (
+        "Build resized WebP and JPEG renditions of the bundled static/images set with a process pool "
+        "and record them in the manifest read by the responsive_image template tag. With --uploads, "
+        "also queue rendition jobs for room and review photos uploaded before renditions existed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes to use.")
+        parser.add_argument("--force", action="store_true", help="Rebuild images whose renditions are current.")
+        parser.add_argument("--uploads", action="store_true", help="Queue jobs for uploads missing renditions.")
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes must be at least 1.")
+        source_dir = Path(settings.STATICFILES_DIRS[0]) / "images"
+        output = images.static_root()
+        output.mkdir(parents=True, exist_ok=True)
+
+        previous = images.static_manifest()
+        sources = sorted(
+            path for path in source_dir.iterdir() if path.is_file() and path.suffix.lower() in images.SOURCE_SUFFIXES
+        )
+        entries, jobs = {}, []
+        for path in sources:
+            name = f"images/{path.name}"
+            digest = hashlib.sha1(path.read_bytes()).hexdigest()[:10]
+            entry = previous.get(name)
+            if not options["force"] and entry and entry.get("digest") == digest and self._complete(entry, output):
+                entries[name] = entry
+            else:
+                jobs.append((str(path), name, str(output)))
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=min(options["processes"], len(jobs))) as pool:
+                for entry in pool.map(renditions.build_static, jobs):
+                    entries[entry["source"]] = entry
+        images.write_manifest(entries)
+        removed = self._remove_orphans(entries, output)
+
+        original = sum(path.stat().st_size for path in sources)
+        mobile = sum(self._mobile_bytes(entry, output) for entry in entries.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {len(jobs)} of {len(sources)} images ({len(sources) - len(jobs)} already current, "
+            f"{removed} stale files removed). A {MOBILE_WIDTH}px-wide screen now loads "
+            f"{mobile / 1024:,.0f} KB of WebP instead of {original / 1024:,.0f} KB of originals."
+        ))
+
+        if options["uploads"]:
+            queued = 0
+            for model in (Room, Review):
+                with_images = Q()
+                for field in images.IMAGE_FIELDS[model._meta.label_lower]:
+                    with_images |= ~Q(**{field: ""}) & Q(**{f"{field}__isnull": False})
+                for instance in model.objects.filter(with_images).iterator():
+                    if images.stale_fields(instance):
+                        images.queue_renditions(instance)
+                        queued += 1
+            self.stdout.write(f"Queued rendition jobs for {queued} rows with uploaded images; run_worker builds them.")
+
+    @staticmethod
+    def _complete(entry, output):
+        return all((output / Path(name).name).exists() for name in images.files(entry))
+
+    @staticmethod
+    def _remove_orphans(entries, output):
+        keep = {Path(name).name for entry in entries.values() for name in images.files(entry)}
+        removed = 0
+        for path in output.iterdir():
+            if path.name != images.MANIFEST_NAME and path.name not in keep:
+                path.unlink()
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _mobile_bytes(entry, output):
+        widths = entry["webp"]
+        _, name = next(((width, name) for width, name in widths if width >= MOBILE_WIDTH), widths[-1])
+        return (output / Path(name).name).stat().st_size
@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from hotel_management.staticfiles import COMPRESSIBLE_EXTENSIONS
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the deployable static tree: image renditions, then collectstatic into STATIC_ROOT with "
+        "content-hashed names, gzip and brotli variants and staticfiles.json. Restart the web server "
+        "afterwards so StaticFilesMiddleware indexes the new files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skip-images", action="store_true", help="Do not rebuild image renditions first.")
+        parser.add_argument("--clear", action="store_true", help="Empty STATIC_ROOT before collecting.")
+
+    def handle(self, *args, **options):
+        verbosity = options["verbosity"]
+        if not options["skip_images"]:
+            call_command("build_image_renditions", verbosity=verbosity, stdout=self.stdout, stderr=self.stderr)
+        call_command(
+            "collectstatic", interactive=False, clear=options["clear"], verbosity=max(verbosity - 1, 0),
+            stdout=self.stdout, stderr=self.stderr,
+        )
+
+        root = Path(settings.STATIC_ROOT)
+        paths = json.loads((root / ManifestStaticFilesStorage.manifest_name).read_text())["paths"]
+        totals = {"raw": 0, "gzip": 0, "br": 0}
+        for hashed in paths.values():
+            path = root / hashed
+            if path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            size = path.stat().st_size
+            totals["raw"] += size
+            for encoding, suffix in (("gzip", ".gz"), ("br", ".br")):
+                variant = path.with_name(path.name + suffix)
+                totals[encoding] += variant.stat().st_size if variant.exists() else size
+        self.stdout.write(self.style.SUCCESS(
+            f"Collected {len(paths)} fingerprinted files into {root}. Text assets: "
+            f"{totals['raw'] / 1024:,.1f} KB raw, {totals['gzip'] / 1024:,.1f} KB gzip, "
+            f"{totals['br'] / 1024:,.1f} KB brotli."
+        ))
@@ -0,0 +1,390 @@
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, migrations, models
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .bench_views import SCALES
+
+PLANNED_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+# Predicates and sort keys on a table's columns, qualified by table name or alias.
+PREDICATE = r'(?P<alias>"\w+"|\b[UT]\d+)\."(?P<column>\w+)"\s*(?P<op><=|>=|<|>|=|IN\b|IS\b|BETWEEN\b)\s*(?P<value>\S+)'
+SORT_KEY = r'(?P<alias>"\w+"|\b[UT]\d+)\."(?P<column>\w+)"\s*(?:ASC|DESC)'
+# A boolean column tested on its own: WHERE "t"."flag" / WHERE NOT "t"."flag".
+FLAG = (
+    r'(?:\bWHERE|\bAND|\bOR|(?<!\w)\()\s*(?P<negated>NOT\s+)?(?P<alias>"\w+"|\b[UT]\d+)\."(?P<column>\w+)"'
+    r'\s*(?=AND\b|OR\b|\)|ORDER\b|GROUP\b|LIMIT\b|$)'
+)
+ALIAS = r'"(?P<table>\w+)" (?P<alias>[UT]\d+)\b'
+
+
+def shape(sql: str) -> str:
+    """``sql`` with its literals replaced, so repeats of one query collapse together."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    return re.sub(r"(?<![\w\"])-?\d+(?:\.\d+)?(?![\w\"])", "?", sql)
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every public page and admin changelist, search and change page, capture the SQL they "
+        "run and EXPLAIN QUERY PLAN each distinct query. Reports full table scans and temporary B-tree "
+        "sorts with the pages that caused them, proposes composite or partial indexes for them, and "
+        "lists indexes made redundant by another index. By default the pages run in a separate process "
+        "against a seeded, freshly migrated scratch database; --no-seed reads the current database "
+        "instead, without holding a transaction open. SQLite only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=list(SCALES), default="small", help="Dataset to seed first.")
+        parser.add_argument("--no-seed", action="store_true", help="Use the data already in the database.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--min-rows", type=int, default=1000,
+            help="Only report scans and sorts of tables with at least this many rows.",
+        )
+        parser.add_argument(
+            "--write-migrations", action="store_true",
+            help="Write an AddIndex migration per app for the proposed indexes.",
+        )
+        parser.add_argument("--worker", action="store_true", help="Internal: seed this (scratch) database and report.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("index_report reads SQLite's EXPLAIN QUERY PLAN; run it against a SQLite database.")
+        if not options["no_seed"] and not options["worker"]:
+            self._run_worker(options)
+            return
+        if options["worker"]:
+            call_command("seed_hotelease", seed=options["seed"], stdout=StringIO(), **SCALES[options["scale"]])
+        with override_settings(DEBUG=False):
+            statements = self._capture()
+            findings = [
+                finding for sql, pages in statements.items()
+                if (finding := self._explain(sql, pages, options["min_rows"]))
+            ]
+            redundant = self._redundant_indexes()
+        cache.clear()
+
+        proposals = self._report(findings, redundant)
+        if options["write_migrations"] and proposals:
+            self._write_migrations(proposals)
+
+    def _run_worker(self, options):
+        """Seed and report in a child process on a scratch database, as bench_sqlite does."""
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "HOTELEASE_DB_NAME": str(Path(directory) / "index_report.sqlite3")}
+            manage = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")]
+            subprocess.run([*manage, "migrate", "--noinput", "-v", "0"], env=env, check=True)
+            worker = subprocess.run(
+                [
+                    *manage, "index_report", "--worker", "--scale", options["scale"],
+                    "--seed", str(options["seed"]), "--min-rows", str(options["min_rows"]),
+                    *(["--write-migrations"] if options["write_migrations"] else []),
+                ],
+                env=env, check=True, stdout=subprocess.PIPE, text=True,
+            )
+        self.stdout.write(worker.stdout, ending="")
+
+    # Capturing ---------------------------------------------------------------
+
+    def _pages(self):
+        check_in = timezone.localdate() + timedelta(days=30)
+        pages = [
+            reverse("core:home"),
+            reverse("core:rooms"),
+            reverse("core:rooms") + f"?check_in={check_in}&check_out={check_in + timedelta(days=3)}",
+            reverse("core:services"),
+            reverse("core:reviews"),
+            reverse("core:reviews_feed"),
+            reverse("core:contact"),
+            reverse("core:dashboard"),
+            reverse("bookings:booking_form"),
+            reverse("bookings:availability_api"),
+            reverse("bookings:availability_api") + f"?check_in={check_in}&check_out={check_in + timedelta(days=3)}",
+        ]
+        reference = apps.get_model("bookings", "Booking").objects.values_list("booking_reference", flat=True).first()
+        if reference:
+            pages.append(reverse("bookings:booking_confirmation", args=[reference]))
+
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            changelist = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+            pages.append(changelist)
+            if model_admin.search_fields:
+                pages.append(f"{changelist}?q=a")
+            for name in model_admin.list_filter:
+                if not isinstance(name, str):
+                    continue
+                value = model._default_manager.values_list(name, flat=True).order_by(name).first()
+                if value is not None:
+                    pages.append(f"{changelist}?{name}__exact={int(value) if isinstance(value, bool) else value}")
+            pk = model._default_manager.values_list("pk", flat=True).first()
+            if pk is not None:
+                pages.append(reverse(f"admin:{opts.app_label}_{opts.model_name}_change", args=[pk]))
+        return pages
+
+    def _capture(self):
+        """Distinct SELECT/UPDATE/DELETE statements (one example each) and the pages that ran them."""
+        # Each write commits on its own: an open transaction would keep SQLite's
+        # write lock for the whole run. The user and its session go afterwards.
+        staff = get_user_model().objects.create_superuser("index-report", "index-report@example.com", "report")
+        client = Client()
+        client.force_login(staff)
+        statements, seen = {}, {}
+        try:
+            for page in self._pages():
+                cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    client.get(page)
+                for query in captured:
+                    sql = query["sql"]
+                    if not sql.lstrip().upper().startswith(PLANNED_STATEMENTS):
+                        continue
+                    key = shape(sql)
+                    example = seen.setdefault(key, sql)
+                    statements.setdefault(example, set()).add(page)
+        finally:
+            client.logout()
+            staff.delete()
+        return statements
+
+    # Planning ----------------------------------------------------------------
+
+    def _explain(self, sql, pages, min_rows):
+        aliases = {match["alias"]: match["table"] for match in re.finditer(ALIAS, sql)}
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            steps = cursor.fetchall()
+            plan = [detail for _, _, _, detail in steps]
+            # Tables read by the outer query, in loop order.
+            outer = [
+                aliases.get(match[1], match[1]) for _, parent, _, detail in steps
+                if parent == 0 and (match := re.match(r"(?:SCAN|SEARCH) (\w+)", detail))
+            ]
+            scans = [
+                aliases.get(match[1], match[1]) for detail in plan
+                if (match := re.match(r"SCAN (\w+)$", detail)) and not match[1].endswith("_fts")
+            ]
+            sorts = [detail for detail in plan if detail.startswith("USE TEMP B-TREE")]
+            # Rows reach a temporary sort in the order of the outermost loop's table.
+            sorted_table = outer[0] if sorts and outer else None
+            rows = {}
+            for table in set(scans) | ({sorted_table} if sorted_table else set()):
+                cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+                rows[table] = cursor.fetchone()[0]
+        scans = [table for table in scans if rows[table] >= min_rows]
+        sorts = sorts if sorted_table and rows[sorted_table] >= min_rows else []
+        if not scans and not sorts:
+            return None
+        return {
+            "sql": sql, "pages": sorted(pages), "plan": plan, "rows": rows,
+            "scans": scans, "sorts": sorts, "sorted_table": sorted_table,
+        }
+
+    def _columns(self, sql, table):
+        """Equality, range and sort columns, and constant flag tests, that ``sql`` applies to ``table``."""
+        aliases = {f'"{table}"'} | {match["alias"] for match in re.finditer(ALIAS, sql) if match["table"] == table}
+        where = sql.split(" ORDER BY ")[0]
+        equality, ranges, flags = [], [], {}
+        for match in re.finditer(PREDICATE, where):
+            value = match["value"].rstrip(")")
+            if match["alias"] not in aliases or value.startswith('"') or re.match(r"[UT]\d+\.", value):
+                continue  # another table's column, or a join condition
+            column, op = match["column"], match["op"]
+            if op in ("=", "IS") and value in ("0", "1", "NULL"):
+                flags.setdefault(column, value)
+            elif op in ("=", "IN", "IS"):
+                equality.append(column)
+            else:
+                ranges.append(column)
+        for match in re.finditer(FLAG, where):
+            if match["alias"] in aliases:
+                flags.setdefault(match["column"], "0" if match["negated"] else "1")
+        order = []
+        if " ORDER BY " in sql:
+            order = [
+                match["column"] for match in re.finditer(SORT_KEY, sql.rsplit(" ORDER BY ", 1)[1])
+                if match["alias"] in aliases
+            ]
+        unique = lambda columns: list(dict.fromkeys(columns))  # noqa: E731
+        return unique(equality), unique(ranges), unique(order), flags
+
+    def _propose(self, finding):
+        """An ``(app_label, model, fields, condition)`` index for each table scanned or sorted."""
+        models_by_table = {model._meta.db_table: model for model in apps.get_models()}
+        tables = list(finding["scans"])
+        if finding["sorts"] and finding["sorted_table"] not in tables:
+            tables.append(finding["sorted_table"])
+        for table in tables:
+            model = models_by_table.get(table)
+            if model is None or not self._is_local(model):
+                continue
+            equality, ranges, order, flags = self._columns(finding["sql"], table)
+            by_column = {field.column: field for field in model._meta.concrete_fields if not field.primary_key}
+            leading = [column for column in equality if column in by_column]
+            # Only sort keys that are all plain columns can come from an index.
+            trailing = ranges[:1] or order
+            trailing = [column for column in trailing if column in by_column and column not in leading]
+            # A constant test of a boolean (handled = 0, is_available = 1) becomes
+            # the condition of a partial index when other columns carry the
+            # index; other constants, like IS NULL, lead it.
+            condition = {}
+            for column, value in flags.items():
+                field = by_column.get(column)
+                if field is None:
+                    continue
+                if isinstance(field, models.BooleanField) and value != "NULL" and (leading or trailing):
+                    condition[field.name] = value == "1"
+                elif column not in leading:
+                    leading.insert(0, column)
+            columns = (leading + trailing)[:3]
+            if not columns or self._covered(table, columns):
+                continue
+            fields = tuple(by_column[column].name for column in columns)
+            yield model._meta.app_label, model, fields, tuple(sorted(condition.items()))
+
+    @staticmethod
+    def _is_local(model):
+        return Path(model._meta.app_config.path).is_relative_to(Path(settings.BASE_DIR))
+
+    def _indexes(self, table):
+        """``(name, columns, unique, partial)`` for each index on ``table``."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA index_list({connection.ops.quote_name(table)})")
+            listed = cursor.fetchall()
+            indexes = []
+            for _, name, unique, _, partial in listed:
+                cursor.execute(f"PRAGMA index_info({connection.ops.quote_name(name)})")
+                columns = tuple(row[2] for row in cursor.fetchall())
+                indexes.append((name, columns, bool(unique), bool(partial)))
+        return indexes
+
+    def _covered(self, table, columns):
+        """Whether an index already leads with ``columns`` (the planner passed it over)."""
+        return any(existing[: len(columns)] == tuple(columns) for _, existing, _, _ in self._indexes(table))
+
+    def _redundant_indexes(self):
+        """Non-unique indexes whose columns lead another index on the same table."""
+        redundant = []
+        for model in apps.get_models():
+            if not self._is_local(model):
+                continue
+            table = model._meta.db_table
+            indexes = self._indexes(table)
+            for name, columns, unique, partial in indexes:
+                if unique or partial or not columns:
+                    continue
+                for other, other_columns, _, other_partial in indexes:
+                    if other != name and not other_partial and other_columns[: len(columns)] == columns:
+                        redundant.append((model, name, columns, other))
+                        break
+        return redundant
+
+    # Output ------------------------------------------------------------------
+
+    def _report(self, findings, redundant):
+        proposals = defaultdict(list)
+        for finding in findings:
+            problems = [f"full scan of {table} ({finding['rows'][table]:,} rows)" for table in finding["scans"]] + [
+                f"{sort.lower()} on {finding['sorted_table']}" for sort in finding["sorts"]
+            ]
+            self.stdout.write(self.style.WARNING(f"{'; '.join(problems)}"))
+            self.stdout.write(f"  pages: {', '.join(finding['pages'][:4])}{' …' if len(finding['pages']) > 4 else ''}")
+            self.stdout.write(f"  sql:   {finding['sql'][:300]}{'…' if len(finding['sql']) > 300 else ''}")
+            for line in finding["plan"]:
+                self.stdout.write(f"  plan:  {line}")
+            for app_label, model, fields, condition in self._propose(finding):
+                proposal = (model, fields, condition)
+                if proposal not in proposals[app_label]:
+                    proposals[app_label].append(proposal)
+
+        if not findings:
+            self.stdout.write(self.style.SUCCESS("No full scans or temporary sorts in the captured queries."))
+        proposals = {
+            app_label: kept for app_label, entries in proposals.items()
+            if (kept := [entry for entry in entries if not self._subsumed(entry, entries)])
+        }
+        for model, name, columns, other in redundant:
+            self.stdout.write(self.style.WARNING(
+                f"Redundant index {name} on {model._meta.label} ({', '.join(columns)}): {other} already leads with it."
+            ))
+        if proposals:
+            self.stdout.write("\nProposed indexes (add them to each model's Meta.indexes):")
+            for app_label, entries in proposals.items():
+                for model, fields, condition in entries:
+                    self.stdout.write(f"  {model._meta.label}: {self._declaration(model, fields, condition)}")
+        return proposals
+
+    @staticmethod
+    def _subsumed(entry, entries):
+        """Whether another proposal serves every query ``entry`` would.
+
+        That is one leading with the same columns under the same condition,
+        or, for an index on a lone flag, a partial index filtered on it.
+        """
+        model, fields, condition = entry
+        for other in entries:
+            other_model, other_fields, other_condition = other
+            if other is entry or other_model is not model:
+                continue
+            if other_condition == condition and len(other_fields) > len(fields) and other_fields[: len(fields)] == fields:
+                return True
+            if len(fields) == 1 and not condition and fields[0] in dict(other_condition):
+                return True
+        return False
+
+    @staticmethod
+    def _index(model, fields, condition):
+        base = "_".join([model._meta.db_table, *fields, *(field for field, _ in condition)])
+        name = f"{base}_idx"
+        if len(name) > 30:
+            digest = hashlib.md5(f"{base}|{condition}".encode()).hexdigest()[:6]
+            name = f"{base[:19]}_{digest}_idx"
+        return models.Index(
+            fields=list(fields), name=name, condition=models.Q(**dict(condition)) if condition else None
+        )
+
+    def _declaration(self, model, fields, condition):
+        index = self._index(model, fields, condition)
+        extra = f", condition=Q({', '.join(f'{field}={value}' for field, value in condition)})" if condition else ""
+        return f'models.Index(fields={list(fields)!r}, name="{index.name}"{extra})'
+
+    def _write_migrations(self, proposals):
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        for app_label, entries in proposals.items():
+            leaves = loader.graph.leaf_nodes(app_label)
+            if not leaves:
+                continue
+            number = int(leaves[0][1].split("_", 1)[0]) + 1
+            migration = migrations.Migration(f"{number:04d}_index_report", app_label)
+            migration.dependencies = leaves
+            migration.operations = [
+                migrations.AddIndex(model._meta.model_name, self._index(model, fields, condition))
+                for model, fields, condition in entries
+            ]
+            writer = MigrationWriter(migration)
+            path = Path(writer.path)
+            path.write_text(writer.as_string())
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {path}. Add the indexes above to Meta.indexes too, or makemigrations will remove them."
+            ))
@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Reinstall the admin's full-text search indexes and their triggers, then re-index every row. Run it "
+        "after a migration rebuilds an indexed table (SQLite drops the table's triggers) or after loading "
+        "rows with the triggers disabled."
+    )
+
+    def handle(self, *args, **options):
+        for label, fields in search.INDEXED_FIELDS.items():
+            model = apps.get_model(label)
+            connection = connections[router.db_for_write(model)]
+            columns = [model._meta.get_field(name).column for name in fields]
+            search.uninstall(connection, model._meta.db_table)
+            if not search.install(connection, model._meta.db_table, columns):
+                self.stdout.write(self.style.WARNING(
+                    f"{label}: full-text search needs SQLite with FTS5; the admin uses LIKE searches."
+                ))
+                continue
+            self.stdout.write(f"{label}: indexed {model._default_manager.using(connection.alias).count():,} rows.")
+        self.stdout.write(self.style.SUCCESS("Search indexes rebuilt."))
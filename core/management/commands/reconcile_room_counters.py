@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from bookings import inventory
+from core import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll Room.is_available over to tonight's occupancy and rebuild the per-type "
+        "room counters with a single GROUP BY. Schedule it daily, shortly after midnight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--counters-only",
+            action="store_true",
+            help="Rebuild the counters from the current flags without recomputing them.",
+        )
+
+    def handle(self, *args, **options):
+        if options["counters_only"]:
+            types = counters.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {types} room types."))
+            return
+        rooms = inventory.sync_room_flags()
+        total, available, booked = counters.totals()
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {rooms} rooms: {total} total, {available} available, {booked} booked."
+        ))
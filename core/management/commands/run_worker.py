@@ -0,0 +1,55 @@
+import multiprocessing
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import jobs
+from core.worker import WorkerPool, work
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (confirmation emails, staff alerts) from the database queue. "
+        "Starts a pool of worker processes that poll for due jobs until stopped with Ctrl+C or SIGTERM, "
+        "restarting any that exit on their own; exits with an error if a worker keeps failing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2, help="Worker processes to run.")
+        parser.add_argument("--batch-size", type=int, default=jobs.BATCH_SIZE, help="Jobs claimed per round.")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Run every due job in this process, then exit.")
+        parser.add_argument("--keep-days", type=int, default=7, help="Delete finished jobs older than this.")
+        parser.add_argument(
+            "--start-method", choices=multiprocessing.get_all_start_methods(),
+            help="How worker processes are started (default: the platform's).",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--processes and --batch-size must be at least 1.")
+        purged = jobs.purge(timedelta(days=options["keep_days"]))
+        if purged:
+            self.stdout.write(f"Purged {purged:,} finished jobs.")
+
+        if options["once"]:
+            totals = jobs.run_due(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{totals['done']} jobs done, {totals['failed']} failed."))
+            return
+
+        # Children must not share the parent's database connection.
+        connections.close_all()
+        pool = WorkerPool(
+            options["processes"], work, (options["batch_size"], options["poll"]),
+            context=multiprocessing.get_context(options["start_method"]),
+        )
+        pool.start()
+        self.stdout.write(f"Started {options['processes']} worker processes (pids {', '.join(map(str, pool.pids))}).")
+        signal.signal(signal.SIGTERM, pool.stop)
+        signal.signal(signal.SIGINT, pool.stop)
+        failures = pool.run()
+        if failures:
+            raise CommandError("Workers failed: " + ", ".join(f"{name} (exit code {code})" for name, code in failures))
+        self.stdout.write("Workers stopped.")
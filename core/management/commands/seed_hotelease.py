@@ -1,11 +1,81 @@
-from django.core.management.base import BaseCommand
+import heapq
+import random
+import time
+from datetime import datetime, time as clock, timedelta
+from itertools import islice
 
-from bookings.models import Booking
-from core.models import Review, Room, Service
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from bookings import inventory, pricing, rollups
+from bookings.models import Booking, RoomNight
+from core import ratings
+from core.cache import invalidate
+from core.models import ContactMessage, Review, Room, Service
+
+# Relative weights used by the scale generator.
+ROOM_TYPE_WEIGHTS = {"single": 35, "master": 20, "deluxe": 20, "executive": 12, "suite": 8, "meeting": 5}
+STAY_LENGTH_WEIGHTS = [30, 25, 18, 12, 7, 4, 4]  # 1..7 nights
+RATING_WEIGHTS = [4, 6, 12, 33, 45]  # 1..5 stars
+CANCELLATION_RATE = 0.12
+AIRPORT_TRANSFER_RATE = 0.25
+HISTORY_DAYS = 540
+LOOKAHEAD_DAYS = 180
+
+FIRST_NAMES = ["Amina", "Daniel", "Sophia", "Bilal", "Fatima", "Omar", "Hira", "James", "Sara", "Usman", "Layla", "Ali"]
+LAST_INITIALS = "ABCDEFGHIKLMNQRSTWZ"
+CITIES = ["Karachi, PK", "Lahore, PK", "Islamabad, PK", "Dubai, UAE", "London, UK", "Doha, QA", "Riyadh, KSA"]
+REVIEW_COMMENTS = {
+    1: "The stay fell well short of what was promised.",
+    2: "Room was fine but service was slow throughout our visit.",
+    3: "A comfortable stay, though check-in took longer than expected.",
+    4: "Spacious rooms and attentive staff. Would stay again.",
+    5: "Every detail felt thoughtful and premium. Truly unforgettable!",
+}
+MESSAGE_SUBJECTS = ["Room enquiry", "Event booking", "Airport transfer", "Invoice request", "Feedback"]
+
+BOOKING_COLUMNS = (
+    "id", "booking_reference", "full_name", "cnic", "address", "email", "phone_number", "room_type", "room",
+    "check_in", "booking_days", "airport_pick_drop", "total_price", "status", "notes", "created_at", "updated_at",
+)
+NIGHT_COLUMNS = ("room", "booking", "room_type", "date")
+REVIEW_COLUMNS = ("name", "photo", "rating", "comment", "created_at", "location", "renditions")
+MESSAGE_COLUMNS = ("name", "email", "subject", "message", "created_at", "handled")
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _insert_sql(model, field_names) -> str:
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(name).column) for name in field_names)
+    placeholders = ", ".join(["%s"] * len(field_names))
+    return f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
 
 
 class Command(BaseCommand):
-    help = "Seed the database with demo data for the HotelEase project."
+    help = (
+        "Seed the database with demo data for the HotelEase project. "
+        "Pass --rooms/--bookings/--reviews/--messages to add a production-sized synthetic dataset on top."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=0, help="Synthetic rooms to add.")
+        parser.add_argument("--bookings", type=int, default=0, help="Synthetic bookings to add.")
+        parser.add_argument("--reviews", type=int, default=0, help="Synthetic reviews to add.")
+        parser.add_argument("--messages", type=int, default=0, help="Synthetic contact messages to add.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for repeatable datasets.")
+        parser.add_argument("--batch-size", type=int, default=10000)
 
     def handle(self, *args, **options):
         rooms_created = self._create_rooms()
@@ -21,12 +91,204 @@ class Command(BaseCommand):
             f"{bookings_created} booking."
         ))
 
+        if any(options[name] for name in ("rooms", "bookings", "reviews", "messages")):
+            self._seed_scale(options)
+
+    def _seed_scale(self, options):
+        """Add synthetic data in batches.
+
+        Rows are generated lazily as plain tuples and written with one
+        ``executemany`` per batch; building model instances and running them
+        through ``bulk_create`` costs several times more than the inserts
+        themselves at this volume. Signals do not fire, so the room flags,
+        counters, daily rollups and rating summary are rebuilt once at the end.
+        """
+        if any(options[name] < 0 for name in ("rooms", "bookings", "reviews", "messages")):
+            raise CommandError("Sizes must be zero or positive.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.today = timezone.localdate()
+        self.now = timezone.now()
+        self.midnight = datetime.combine(self.today, clock())
+        if settings.USE_TZ:
+            self.midnight = timezone.make_aware(self.midnight)
+        self.adapt_datetime = connection.ops.adapt_datetimefield_value
+
+        steps = [
+            ("rooms", self._scale_rooms),
+            ("bookings", self._scale_bookings),
+            ("reviews", self._scale_reviews),
+            ("messages", self._scale_messages),
+        ]
+        for name, step in steps:
+            if not options[name]:
+                continue
+            began = time.perf_counter()
+            summary = step(options[name])
+            self.stdout.write(f"  {summary} in {time.perf_counter() - began:.1f}s")
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Booking, RoomNight, Review, ContactMessage]):
+                cursor.execute(sql)
+        if options["rooms"] or options["bookings"]:
+            inventory.sync_room_flags()
+        if options["bookings"]:
+            rollups.rebuild()
+        if options["reviews"]:
+            ratings.rebuild()
+        invalidate("stats", "availability", "featured_services", "spotlight_reviews")
+        self.stdout.write(self.style.SUCCESS("Scale seeding complete."))
+
+    def _insert(self, model, field_names, rows) -> int:
+        sql = _insert_sql(model, field_names)
+        written = 0
+        with connection.cursor() as cursor:
+            for batch in _batches(rows, self.batch_size):
+                with transaction.atomic():
+                    cursor.executemany(sql, batch)
+                written += len(batch)
+        return written
+
+    def _past_moment(self, days_back):
+        """A timestamp ``days_back`` days ago at a random time of day, never in the future."""
+        moment = self.midnight + timedelta(days=-days_back, seconds=self.rng.randrange(86400))
+        return self.adapt_datetime(min(moment, self.now))
+
+    def _scale_rooms(self, count):
+        types = list(ROOM_TYPE_WEIGHTS)
+        weights = list(ROOM_TYPE_WEIGHTS.values())
+        labels = dict(Room.ROOM_TYPES)
+        offset = Room.objects.count()
+        rng = self.rng
+
+        def rooms():
+            for index in range(offset, offset + count):
+                room_type = rng.choices(types, weights)[0]
+                # Forty rooms a floor, starting at floor 10 to stay clear of the demo rooms.
+                floor = 10 + index // 40
+                yield Room(
+                    number=f"{floor}{index % 40 + 1:02d}",
+                    room_type=room_type,
+                    description=f"{labels[room_type]} on floor {floor}.",
+                )
+
+        for batch in _batches(rooms(), self.batch_size):
+            Room.objects.bulk_create(batch, ignore_conflicts=True)
+        return f"{count:,} rooms"
+
+    def _scale_bookings(self, count):
+        """Generate bookings in check-in order and allocate rooms from per-type heaps.
+
+        Each heap holds ``(free_from, room_id)`` so a stay goes to the
+        room that has been free longest. Only the heaps live in memory, and a
+        room's stays are assigned in date order, so no two stays can overlap;
+        rooms that already have nights booked become free after their last one.
+        """
+        rng = self.rng
+        adapt_date = connection.ops.adapt_datefield_value
+        types = list(ROOM_TYPE_WEIGHTS)
+        weights = list(ROOM_TYPE_WEIGHTS.values())
+        prices = pricing.calendar()
+        start = self.today - timedelta(days=HISTORY_DAYS)
+        span = HISTORY_DAYS + LOOKAHEAD_DAYS
+        busy_until = dict(
+            RoomNight.objects.order_by().values("room_id").annotate(last=Max("date")).values_list("room_id", "last")
+        )
+        heaps = {room_type: [] for room_type in types}
+        for pk, room_type in Room.objects.values_list("pk", "room_type").iterator():
+            last = busy_until.get(pk)
+            free_from = last + timedelta(days=1) if last else start
+            heaps.setdefault(room_type, []).append((free_from, pk))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        first_id = (Booking.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        prefix = f"{rng.getrandbits(20):05X}"
+
+        def bookings():
+            for index in range(count):
+                room_type = rng.choices(types, weights)[0]
+                days = rng.choices(range(1, 8), STAY_LENGTH_WEIGHTS)[0]
+                check_in = start + timedelta(days=index * span // count)
+                check_out = check_in + timedelta(days=days)
+                cancelled = rng.random() < CANCELLATION_RATE
+                room_id = None
+                heap = heaps[room_type]
+                if not cancelled and heap and heap[0][0] <= check_in:
+                    _, room_id = heap[0]
+                    heapq.heapreplace(heap, (check_out, room_id))
+                if cancelled:
+                    status = "cancelled"
+                elif check_out <= self.today or rng.random() < 0.6:
+                    status = "confirmed"
+                else:
+                    status = "pending"
+                airport = rng.random() < AIRPORT_TRANSFER_RATE
+                total = prices.room_total(room_type, check_in, days) + (Booking.AIRPORT_CHARGE if airport else 0)
+                created_at = self._past_moment(max((self.today - check_in).days, 0) + rng.randint(0, 90))
+                first = rng.choice(FIRST_NAMES)
+                pk = first_id + index
+                yield (
+                    pk, f"{prefix}{pk:07X}", f"{first} {rng.choice(LAST_INITIALS)}.",
+                    f"42101{rng.randrange(10 ** 8):08d}", rng.choice(CITIES), f"{first.lower()}{pk}@example.com",
+                    "", room_type, room_id, adapt_date(check_in), days, airport,
+                    total, status, "", created_at, created_at,
+                ), room_id and [
+                    (room_id, pk, room_type, adapt_date(check_in + timedelta(days=night)))
+                    for night in range(days)
+                ]
+
+        booking_sql = _insert_sql(Booking, BOOKING_COLUMNS)
+        night_sql = _insert_sql(RoomNight, NIGHT_COLUMNS)
+        created = assigned = 0
+        with connection.cursor() as cursor:
+            for batch in _batches(bookings(), self.batch_size):
+                nights = [night for _, stay in batch if stay for night in stay]
+                with transaction.atomic():
+                    cursor.executemany(booking_sql, [row for row, _ in batch])
+                    cursor.executemany(night_sql, nights)
+                created += len(batch)
+                assigned += sum(1 for _, stay in batch if stay)
+                self.stdout.write(f"  {created:,} bookings", ending="\r")
+        return f"{created:,} bookings ({assigned:,} with rooms)"
+
+    def _scale_reviews(self, count):
+        rng = self.rng
+
+        def reviews():
+            for _ in range(count):
+                rating = rng.choices(range(1, 6), RATING_WEIGHTS)[0]
+                yield (
+                    f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_INITIALS)}.", "", rating,
+                    REVIEW_COMMENTS[rating], self._past_moment(rng.randrange(HISTORY_DAYS)),
+                    rng.choice(CITIES + [""]), "{}",
+                )
+
+        return f"{self._insert(Review, REVIEW_COLUMNS, reviews()):,} reviews"
+
+    def _scale_messages(self, count):
+        rng = self.rng
+
+        def messages():
+            for index in range(count):
+                days_back = rng.randrange(HISTORY_DAYS)
+                first = rng.choice(FIRST_NAMES)
+                yield (
+                    first, f"{first.lower()}.{index}@example.com", rng.choice(MESSAGE_SUBJECTS),
+                    "Could you share more details about availability and rates?", self._past_moment(days_back),
+                    # Older messages have almost always been dealt with.
+                    days_back > 14 and rng.random() < 0.95,
+                )
+
+        return f"{self._insert(ContactMessage, MESSAGE_COLUMNS, messages()):,} contact messages"
+
     def _create_rooms(self) -> int:
         room_specs = [
             {
                 "number": "101",
                 "room_type": "single",
-                "price": 5000,
                 "description": "Calming standard room with city view, indulgent bedding, and writing desk.",
                 "amenities": [
                     "Complimentary breakfast",
@@ -38,7 +300,6 @@ class Command(BaseCommand):
             {
                 "number": "201",
                 "room_type": "master",
-                "price": 9000,
                 "description": "Elegant master bedroom with lounge seating and curated minibar selection.",
                 "amenities": [
                     "Private balcony",
@@ -50,7 +311,6 @@ class Command(BaseCommand):
             {
                 "number": "301",
                 "room_type": "meeting",
-                "price": 10000,
                 "description": "Boardroom-style meeting suite with integrated conferencing technology.",
                 "amenities": [
                     "16-seat board table",
@@ -62,7 +322,6 @@ class Command(BaseCommand):
             {
                 "number": "401",
                 "room_type": "deluxe",
-                "price": 8000,
                 "description": "Spacious deluxe room featuring statement lighting and custom furnishings.",
                 "amenities": [
                     "Lounge seating",
@@ -74,7 +333,6 @@ class Command(BaseCommand):
             {
                 "number": "402",
                 "room_type": "executive",
-                "price": 12000,
                 "description": "Executive skyline room with private workspace and club lounge access.",
                 "amenities": [
                     "Panoramic skyline view",
@@ -86,7 +344,6 @@ class Command(BaseCommand):
             {
                 "number": "501",
                 "room_type": "suite",
-                "price": 15000,
                 "description": "Signature suite with private living room, bespoke art, and curated amenities.",
                 "amenities": [
                     "Private living room",
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:49
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_counters(apps, schema_editor):
+    Room = apps.get_model("core", "Room")
+    RoomTypeCounter = apps.get_model("core", "RoomTypeCounter")
+    rows = (
+        Room.objects.order_by()
+        .values("room_type")
+        .annotate(total=Count("id"), booked=Count("id", filter=Q(is_available=False)))
+    )
+    RoomTypeCounter.objects.bulk_create(
+        RoomTypeCounter(room_type=row["room_type"], total=row["total"], booked=row["booked"])
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_room_room_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomTypeCounter',
+            fields=[
+                ('room_type', models.CharField(choices=[('single', 'Single Room'), ('master', 'Master Room'), ('meeting', 'Meeting Room'), ('deluxe', 'Deluxe Room'), ('executive', 'Executive Room'), ('suite', 'Luxury Suite')], max_length=20, primary_key=True, serialize=False)),
+                ('total', models.IntegerField(default=0)),
+                ('booked', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['room_type'],
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:51
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_summary(apps, schema_editor):
+    Review = apps.get_model("core", "Review")
+    ReviewSummary = apps.get_model("core", "ReviewSummary")
+    totals = Review.objects.aggregate(
+        review_count=Count("id"),
+        rating_sum=Sum("rating"),
+        **{f"stars_{stars}": Count("id", filter=Q(rating=stars)) for stars in range(1, 6)},
+    )
+    totals["rating_sum"] = totals["rating_sum"] or 0
+    ReviewSummary.objects.create(property_code="hotelease", **totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_review_recent_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSummary',
+            fields=[
+                ('property_code', models.CharField(default='hotelease', max_length=30, primary_key=True, serialize=False)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('stars_1', models.IntegerField(default=0)),
+                ('stars_2', models.IntegerField(default=0)),
+                ('stars_3', models.IntegerField(default=0)),
+                ('stars_4', models.IntegerField(default=0)),
+                ('stars_5', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'review summaries',
+            },
+        ),
+        migrations.RunPython(build_summary, migrations.RunPython.noop),
+    ]
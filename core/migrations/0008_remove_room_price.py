@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:20
+
+from django.db import migrations
+
+# Booking.ROOM_TYPE_RATES when Room.price was retired; frozen here so later
+# rate changes don't change what this migration accepts.
+ROOM_TYPE_RATES = {
+    "single": 5000,
+    "master": 9000,
+    "meeting": 10000,
+    "deluxe": 8000,
+    "executive": 12000,
+    "suite": 15000,
+}
+
+
+def check_room_prices(apps, schema_editor):
+    """Refuse to drop prices that differ from the room type's rate; they would be lost."""
+    Room = apps.get_model("core", "Room")
+    mismatched = [
+        f"room {number} ({room_type}): {price} instead of {ROOM_TYPE_RATES.get(room_type)}"
+        for number, room_type, price in Room.objects.using(schema_editor.connection.alias)
+        .order_by("number")
+        .values_list("number", "room_type", "price")
+        if price != ROOM_TYPE_RATES.get(room_type)
+    ]
+    if mismatched:
+        raise RuntimeError(
+            "Room prices now come from Booking.ROOM_TYPE_RATES and the rate plans, but these rooms "
+            "have their own price, which removing Room.price would discard:\n  "
+            + "\n  ".join(mismatched)
+            + "\nAdd rate plans (or change the rates) to keep those prices, set each room's price to "
+            "its type's rate, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_job_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_room_prices, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='room',
+            name='price',
+        ),
+    ]
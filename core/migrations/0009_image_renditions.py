@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_remove_room_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized copies of the photo'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized copies of each image, by field'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# The SQL core.search.install() ran when this migration was written, frozen
+# here so later changes to that module don't change what this migration does.
+# Per table: the FTS5 index, its insert, delete and update triggers, and a
+# rebuild that indexes the existing rows.
+CREATE = {
+    "core_room": [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS "core_room_fts" USING fts5("number", "description", content="core_room", content_rowid=\'id\', tokenize=\'unicode61 remove_diacritics 2\', prefix=\'2 3\')',
+        'CREATE TRIGGER IF NOT EXISTS "core_room_fts_ai" AFTER INSERT ON "core_room" BEGIN INSERT INTO "core_room_fts"(rowid, "number", "description") VALUES (new.id, new."number", new."description"); END',
+        'CREATE TRIGGER IF NOT EXISTS "core_room_fts_ad" AFTER DELETE ON "core_room" BEGIN INSERT INTO "core_room_fts"("core_room_fts", rowid, "number", "description") VALUES (\'delete\', old.id, old."number", old."description"); END',
+        'CREATE TRIGGER IF NOT EXISTS "core_room_fts_au" AFTER UPDATE OF "number", "description" ON "core_room" BEGIN INSERT INTO "core_room_fts"("core_room_fts", rowid, "number", "description") VALUES (\'delete\', old.id, old."number", old."description"); INSERT INTO "core_room_fts"(rowid, "number", "description") VALUES (new.id, new."number", new."description"); END',
+        'INSERT INTO "core_room_fts"("core_room_fts") VALUES (\'rebuild\')',
+    ],
+    "core_review": [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS "core_review_fts" USING fts5("name", "comment", content="core_review", content_rowid=\'id\', tokenize=\'unicode61 remove_diacritics 2\', prefix=\'2 3\')',
+        'CREATE TRIGGER IF NOT EXISTS "core_review_fts_ai" AFTER INSERT ON "core_review" BEGIN INSERT INTO "core_review_fts"(rowid, "name", "comment") VALUES (new.id, new."name", new."comment"); END',
+        'CREATE TRIGGER IF NOT EXISTS "core_review_fts_ad" AFTER DELETE ON "core_review" BEGIN INSERT INTO "core_review_fts"("core_review_fts", rowid, "name", "comment") VALUES (\'delete\', old.id, old."name", old."comment"); END',
+        'CREATE TRIGGER IF NOT EXISTS "core_review_fts_au" AFTER UPDATE OF "name", "comment" ON "core_review" BEGIN INSERT INTO "core_review_fts"("core_review_fts", rowid, "name", "comment") VALUES (\'delete\', old.id, old."name", old."comment"); INSERT INTO "core_review_fts"(rowid, "name", "comment") VALUES (new.id, new."name", new."comment"); END',
+        'INSERT INTO "core_review_fts"("core_review_fts") VALUES (\'rebuild\')',
+    ],
+    "core_contactmessage": [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS "core_contactmessage_fts" USING fts5("name", "email", "subject", content="core_contactmessage", content_rowid=\'id\', tokenize=\'unicode61 remove_diacritics 2\', prefix=\'2 3\')',
+        'CREATE TRIGGER IF NOT EXISTS "core_contactmessage_fts_ai" AFTER INSERT ON "core_contactmessage" BEGIN INSERT INTO "core_contactmessage_fts"(rowid, "name", "email", "subject") VALUES (new.id, new."name", new."email", new."subject"); END',
+        'CREATE TRIGGER IF NOT EXISTS "core_contactmessage_fts_ad" AFTER DELETE ON "core_contactmessage" BEGIN INSERT INTO "core_contactmessage_fts"("core_contactmessage_fts", rowid, "name", "email", "subject") VALUES (\'delete\', old.id, old."name", old."email", old."subject"); END',
+        'CREATE TRIGGER IF NOT EXISTS "core_contactmessage_fts_au" AFTER UPDATE OF "name", "email", "subject" ON "core_contactmessage" BEGIN INSERT INTO "core_contactmessage_fts"("core_contactmessage_fts", rowid, "name", "email", "subject") VALUES (\'delete\', old.id, old."name", old."email", old."subject"); INSERT INTO "core_contactmessage_fts"(rowid, "name", "email", "subject") VALUES (new.id, new."name", new."email", new."subject"); END',
+        'INSERT INTO "core_contactmessage_fts"("core_contactmessage_fts") VALUES (\'rebuild\')',
+    ],
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statements in CREATE.values():
+            try:
+                cursor.execute(statements[0])
+            except OperationalError:
+                # No FTS5 in this SQLite build; admin searches keep using LIKE.
+                return
+            for statement in statements[1:]:
+                cursor.execute(statement)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in CREATE:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f'DROP TRIGGER IF EXISTS "{table}_fts_{suffix}"')
+            cursor.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_contact_message_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='room',
+            name='core_room_available_idx',
+        ),
+    ]
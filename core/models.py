@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Room(models.Model):
@@ -15,7 +16,6 @@ class Room(models.Model):
 
 	number = models.CharField(max_length=10, unique=True)
 	room_type = models.CharField(max_length=20, choices=ROOM_TYPES, default="single")
-	price = models.PositiveIntegerField(help_text="Per night room rate in PKR", default=5000)
 	description = models.TextField(blank=True)
 	main_image = models.ImageField(upload_to="rooms/", blank=True, null=True)
 	washroom_image = models.ImageField(upload_to="rooms/", blank=True, null=True)
@@ -23,9 +23,14 @@ class Room(models.Model):
 	exterior_image = models.ImageField(upload_to="rooms/", blank=True, null=True)
 	is_available = models.BooleanField(default=True)
 	amenities = models.JSONField(default=list, blank=True, help_text="List of amenity strings")
+	renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies of each image, by field")
 
 	class Meta:
 		ordering = ["number"]
+		indexes = [
+			# The rooms page lists by type then number; availability counts group by type.
+			models.Index(fields=["room_type", "number"], name="core_room_type_number_idx"),
+		]
 
 	def __str__(self) -> str:
 		return f"Room {self.number}"
@@ -38,6 +43,31 @@ class Room(models.Model):
 	def room_type_label(self) -> str:
 		return dict(self.ROOM_TYPES).get(self.room_type, self.room_type.title())
 
+	@property
+	def price(self) -> int:
+		"""Rack rate per night in PKR; every room of a type shares its type's rates."""
+		from bookings.pricing import rack_rate
+
+		return rack_rate(self.room_type)
+
+
+class RoomTypeCounter(models.Model):
+	"""Running room totals per type, maintained alongside ``Room.is_available``."""
+
+	room_type = models.CharField(max_length=20, choices=Room.ROOM_TYPES, primary_key=True)
+	total = models.IntegerField(default=0)
+	booked = models.IntegerField(default=0)
+
+	class Meta:
+		ordering = ["room_type"]
+
+	def __str__(self) -> str:
+		return f"{self.room_type}: {self.booked}/{self.total} booked"
+
+	@property
+	def available(self) -> int:
+		return max(self.total - self.booked, 0)
+
 
 class Service(models.Model):
 	"""Hotel amenity or service offered to guests."""
@@ -66,20 +96,63 @@ class Review(models.Model):
 
 	name = models.CharField(max_length=120)
 	photo = models.ImageField(upload_to="reviews/", blank=True, null=True)
+	renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized copies of the photo")
 	rating = models.PositiveSmallIntegerField(choices=RATING_CHOICES, default=5)
 	comment = models.TextField()
 	created_at = models.DateTimeField(auto_now_add=True)
 	location = models.CharField(max_length=120, blank=True)
 
 	class Meta:
-		ordering = ["-created_at"]
+		ordering = ["-created_at", "-id"]
+		indexes = [
+			# Backs keyset pagination over (created_at, id), newest first.
+			models.Index(fields=["-created_at", "-id"], name="core_review_recent_idx"),
+			models.Index(fields=["rating", "created_at"], name="core_review_rating_idx"),
+		]
 
 	def __str__(self) -> str:
 		return f"Review by {self.name}"
 
 
-class ContactMessage(models.Model):
-	"""Stores contact/feedback messages from website."""
+class ReviewSummary(models.Model):
+	"""Running rating totals and 1–5 star histogram for a property's reviews."""
+
+	DEFAULT_PROPERTY = "hotelease"
+
+	property_code = models.CharField(max_length=30, primary_key=True, default=DEFAULT_PROPERTY)
+	review_count = models.IntegerField(default=0)
+	rating_sum = models.IntegerField(default=0)
+	stars_1 = models.IntegerField(default=0)
+	stars_2 = models.IntegerField(default=0)
+	stars_3 = models.IntegerField(default=0)
+	stars_4 = models.IntegerField(default=0)
+	stars_5 = models.IntegerField(default=0)
+
+	class Meta:
+		verbose_name_plural = "review summaries"
+
+	def __str__(self) -> str:
+		return f"{self.property_code}: {self.average:.1f} from {self.review_count} reviews"
+
+	@property
+	def average(self) -> float:
+		return self.rating_sum / self.review_count if self.review_count else 0
+
+	@property
+	def histogram(self):
+		"""Rows of star, count and share of reviews, five stars first."""
+		return [
+			{
+				"stars": stars,
+				"count": getattr(self, f"stars_{stars}"),
+				"percent": round(100 * getattr(self, f"stars_{stars}") / self.review_count) if self.review_count else 0,
+			}
+			for stars in range(5, 0, -1)
+		]
+
+
+class ContactMessageRecord(models.Model):
+	"""The fields of a contact message, shared by the inbox and the archive."""
 
 	name = models.CharField(max_length=150)
 	email = models.EmailField()
@@ -89,7 +162,61 @@ class ContactMessage(models.Model):
 	handled = models.BooleanField(default=False)
 
 	class Meta:
-		ordering = ["-created_at"]
+		abstract = True
 
 	def __str__(self) -> str:
 		return f"Message from {self.name}"
+
+
+class ContactMessage(ContactMessageRecord):
+	"""Stores contact/feedback messages from website."""
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["created_at"], name="core_contact_recent_idx"),
+			# The unhandled inbox, newest first.
+			models.Index(fields=["created_at"], condition=models.Q(handled=False), name="core_contact_inbox_idx"),
+		]
+
+
+class ArchivedContactMessage(ContactMessageRecord):
+	"""A handled message moved out of the inbox by ``archive_bookings``, with its original id."""
+
+	archived_at = models.DateTimeField(default=timezone.now)
+
+	class Meta:
+		ordering = ["-created_at"]
+
+
+class Job(models.Model):
+	"""A unit of background work, run by ``manage.py run_worker`` (see ``core.jobs``)."""
+
+	STATUS_CHOICES = [
+		("queued", "Queued"),
+		("running", "Running"),
+		("done", "Done"),
+		("failed", "Failed"),
+	]
+
+	name = models.CharField(max_length=100)
+	payload = models.JSONField(default=dict, blank=True)
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+	attempts = models.PositiveSmallIntegerField(default=0)
+	max_attempts = models.PositiveSmallIntegerField(default=5)
+	run_at = models.DateTimeField(default=timezone.now)
+	locked_by = models.CharField(max_length=64, blank=True)
+	locked_at = models.DateTimeField(blank=True, null=True)
+	last_error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	finished_at = models.DateTimeField(blank=True, null=True)
+
+	class Meta:
+		ordering = ["run_at", "id"]
+		indexes = [
+			models.Index(fields=["status", "run_at"], name="core_job_due_idx"),
+			models.Index(fields=["locked_by"], name="core_job_lock_idx"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .jobs import email_task
+from .models import ContactMessage
+
+
+@email_task("notify_staff_of_contact_message")
+def contact_message_alert(payload):
+    """Alert the front desk about a new contact form message."""
+    recipients = settings.STAFF_NOTIFICATION_EMAILS
+    message = ContactMessage.objects.filter(pk=payload["id"]).first()
+    if message is None or not recipients:
+        return None
+    body = render_to_string(
+        "core/emails/contact_alert.txt",
+        {"message": message, "admin_url": reverse("admin:core_contactmessage_changelist")},
+    )
+    return EmailMessage(
+        subject=f"[HotelEase] {message.subject}",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=recipients,
+        reply_to=[message.email],
+    )
@@ -0,0 +1,145 @@
+"""Keyset (cursor) pagination over ``(created_at, id)``.
+
+Each page is an index range scan that starts where the previous page ended,
+so fetching page 500 costs the same as page 1. The cursor is an opaque,
+URL-safe token built from the last row of the previous page.
+
+``LargeTablePaginator`` brings the same idea to numbered admin changelists.
+"""
+
+import base64
+import hashlib
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+REVIEW_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 50
+# How long admin changelists reuse a count and the sort key ending each page.
+ADMIN_CACHE_TIMEOUT = 60
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Return the ``(created_at, id)`` pair in ``cursor``; raise ``ValueError`` if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def _page_query(queryset, cursor: Optional[str], size: int):
+    queryset = queryset.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return queryset[: size + 1]
+
+
+def _split(rows: List, size: int) -> Tuple[List, Optional[str]]:
+    if len(rows) <= size:
+        return rows, None
+    last = rows[size - 1]
+    return rows[:size], encode_cursor(last.created_at, last.pk)
+
+
+def keyset_page(queryset, cursor: Optional[str] = None, size: int = REVIEW_PAGE_SIZE) -> Tuple[List, Optional[str]]:
+    """Return one page of newest-first rows and the cursor for the next page (or ``None``)."""
+    return _split(list(_page_query(queryset, cursor, size)), size)
+
+
+async def akeyset_page(queryset, cursor: Optional[str] = None, size: int = REVIEW_PAGE_SIZE):
+    """``keyset_page`` for async views."""
+    return _split([row async for row in _page_query(queryset, cursor, size)], size)
+
+
+class LargeTablePaginator(Paginator):
+    """Admin changelist paginator for tables too big to count or offset per request.
+
+    Counts are cached per query for ``ADMIN_CACHE_TIMEOUT`` seconds, so a
+    new row can take that long to show in the total. Each page also caches
+    the sort key of its last row. The next page then seeks past that key
+    through the ordering's index instead of scanning ``OFFSET`` rows. Pages
+    reached any other way, such as jumping ahead or sorting by relevance,
+    use ``OFFSET``.
+    """
+
+    @cached_property
+    def _cache_key(self) -> Optional[str]:
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        digest = hashlib.sha1(f"{self.object_list.db}|{sql}|{params!r}".encode()).hexdigest()
+        return f"hotelease:admin:{digest}"
+
+    @cached_property
+    def count(self) -> int:
+        key = self._cache_key and f"{self._cache_key}:count"
+        value = cache.get(key) if key else None
+        if value is None:
+            value = self.object_list.count()
+            if key:
+                cache.set(key, value, ADMIN_CACHE_TIMEOUT)
+        return value
+
+    @cached_property
+    def _sort_fields(self):
+        """``(field, descending)`` pairs for a total order on columns, or ``None``."""
+        opts = self.object_list.model._meta
+        fields = []
+        for item in self.object_list.query.order_by:
+            if not isinstance(item, str):
+                return None
+            name = item.removeprefix("-")
+            try:
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.null or field.is_relation:
+                return None
+            fields.append((field, item.startswith("-")))
+        return fields if fields and fields[-1][0].unique else None
+
+    def _after(self, key) -> Q:
+        """Rows that sort after ``key`` in the queryset's ordering.
+
+        The leading bound on the first column lets the database range-scan
+        its index; the alternatives only refine rows inside that range.
+        """
+        first, descending = self._sort_fields[0]
+        condition = Q()
+        for index, (field, descending_field) in enumerate(self._sort_fields):
+            step = Q(**{f"{field.attname}__{'lt' if descending_field else 'gt'}": key[index]})
+            for (previous, _), value in zip(self._sort_fields[:index], key):
+                step &= Q(**{previous.attname: value})
+            condition |= step
+        return Q(**{f"{first.attname}__{'lte' if descending else 'gte'}": key[0]}) & condition
+
+    def page(self, number):
+        number = self.validate_number(number)
+        seekable = self._sort_fields is not None and self._cache_key is not None
+        previous = cache.get(f"{self._cache_key}:page:{number - 1}") if seekable and number > 1 else None
+        if previous is not None and not self.orphans:
+            rows = list(self.object_list.filter(self._after(previous))[: self.per_page])
+        else:
+            bottom = (number - 1) * self.per_page
+            top = bottom + self.per_page
+            if top + self.orphans >= self.count:
+                top = self.count
+            rows = list(self.object_list[bottom:top])
+        if seekable and rows:
+            key = tuple(getattr(rows[-1], field.attname) for field, _ in self._sort_fields)
+            cache.set(f"{self._cache_key}:page:{number}", key, ADMIN_CACHE_TIMEOUT)
+        return self._get_page(rows, number, self)
@@ -0,0 +1,67 @@
+"""Incrementally maintained review aggregates.
+
+``ReviewSummary`` keeps the count, rating sum and star histogram so the
+reviews page never aggregates over the ``Review`` table. Review signals call
+``record_change`` inside the writing transaction; ``rebuild`` recomputes the
+row from scratch after bulk loads.
+"""
+
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Review, ReviewSummary
+
+
+def _deltas(rating: int, sign: int):
+    return {
+        "review_count": F("review_count") + sign,
+        "rating_sum": F("rating_sum") + sign * rating,
+        f"stars_{rating}": F(f"stars_{rating}") + sign,
+    }
+
+
+def _apply(changes, property_code: str = ReviewSummary.DEFAULT_PROPERTY):
+    """Apply F() deltas to the summary row, creating it on first use."""
+    if ReviewSummary.objects.filter(pk=property_code).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            ReviewSummary.objects.create(property_code=property_code)
+    except IntegrityError:
+        # Another transaction created the row first.
+        pass
+    ReviewSummary.objects.filter(pk=property_code).update(**changes)
+
+
+def record_change(old_rating: Optional[int], new_rating: Optional[int]):
+    """Move one review from ``old_rating`` to ``new_rating``; ``None`` means absent."""
+    if old_rating == new_rating:
+        return
+    if old_rating is not None:
+        _apply(_deltas(old_rating, -1))
+    if new_rating is not None:
+        _apply(_deltas(new_rating, 1))
+
+
+def rebuild(property_code: str = ReviewSummary.DEFAULT_PROPERTY) -> ReviewSummary:
+    """Recompute the summary with one aggregate query over ``Review``."""
+    totals = Review.objects.aggregate(
+        review_count=Count("id"),
+        rating_sum=Sum("rating"),
+        **{f"stars_{stars}": Count("id", filter=Q(rating=stars)) for stars in range(1, 6)},
+    )
+    totals["rating_sum"] = totals["rating_sum"] or 0
+    summary, _ = ReviewSummary.objects.update_or_create(property_code=property_code, defaults=totals)
+    return summary
+
+
+def summary(property_code: str = ReviewSummary.DEFAULT_PROPERTY) -> ReviewSummary:
+    """Return the summary row, or an empty one if nothing has been recorded yet."""
+    return ReviewSummary.objects.filter(pk=property_code).first() or ReviewSummary(property_code=property_code)
+
+
+async def asummary(property_code: str = ReviewSummary.DEFAULT_PROPERTY) -> ReviewSummary:
+    """``summary`` for async views."""
+    return await ReviewSummary.objects.filter(pk=property_code).afirst() or ReviewSummary(property_code=property_code)
@@ -0,0 +1,81 @@
+"""Resizing and encoding images into renditions.
+
+Nothing here imports settings-dependent Django modules or models, so
+``build_static`` can run in a process pool started with ``spawn`` (the
+default on macOS and Windows) without setting Django up in every worker.
+``core.images`` decides which images need renditions and where entries are
+kept.
+"""
+
+import hashlib
+from io import BytesIO
+from pathlib import Path, PurePosixPath
+from typing import List, Tuple
+
+from django.utils.text import slugify
+
+WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+# (extension, Pillow format, save options); browsers pick the first format they support.
+FORMATS = (
+    ("webp", "WEBP", {"quality": 78, "method": 4}),
+    ("jpeg", "JPEG", {"quality": 80, "optimize": True, "progressive": True}),
+)
+STATIC_PREFIX = "responsive"
+
+Rendered = Tuple[int, int, List[Tuple[str, int, bytes]]]
+
+
+def render(data: bytes, widths=WIDTHS) -> Rendered:
+    """Resize and encode one image; returns its size and ``(extension, width, bytes)`` per rendition."""
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(data)) as source:
+        largest = min(source.width, max(widths))
+        if source.format == "JPEG":
+            # Let the decoder skip detail the largest rendition cannot show.
+            source.draft("RGB", (largest, round(source.height * largest / source.width)))
+        image = ImageOps.exif_transpose(source)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+    width, height = image.size
+    targets = sorted({target for target in widths if target < width} | {min(width, max(widths))}, reverse=True)
+    renditions = []
+    for target in targets:
+        size = (target, max(1, round(height * target / width)))
+        if image.size != size:
+            # Each step resizes the previous, larger rendition, which is cheaper than the source.
+            image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        for extension, image_format, options in FORMATS:
+            buffer = BytesIO()
+            image.save(buffer, image_format, **options)
+            renditions.append((extension, target, buffer.getvalue()))
+    return width, height, sorted(renditions, key=lambda rendition: (rendition[0], rendition[1]))
+
+
+def build_entry(source: str, data: bytes, rendered: Rendered, directory: str, save) -> dict:
+    """Name and store each rendition with ``save(name, bytes)`` and return the entry."""
+    width, height, renditions = rendered
+    stem = slugify(PurePosixPath(source).stem) or "image"
+    digest = hashlib.sha1(data).hexdigest()[:10]
+    entry = {"source": source, "digest": digest, "width": width, "height": height}
+    for extension, _, _ in FORMATS:
+        entry[extension] = []
+    for extension, target, content in renditions:
+        name = f"{directory}/{stem}-{digest}-{target}.{extension}"
+        save(name, content)
+        entry[extension].append([target, name])
+    return entry
+
+
+def build_static(job: Tuple[str, str, str]) -> dict:
+    """Build renditions for one static image; ``job`` is ``(path, static name, output dir)``.
+
+    Used as a process pool task by ``manage.py build_image_renditions``.
+    """
+    path, source, output = job
+    data = Path(path).read_bytes()
+
+    def save(name, content):
+        Path(output, PurePosixPath(name).name).write_bytes(content)
+
+    return build_entry(source, data, render(data), STATIC_PREFIX, save)
@@ -0,0 +1,216 @@
+"""Full-text search for the admin, backed by SQLite FTS5.
+
+Each table in ``INDEXED_FIELDS`` has an external-content FTS5 table,
+``<table>_fts``, that indexes its search fields. Insert, update and delete
+triggers keep it in step, so writes need no extra statements. Admin
+searches become one index lookup instead of a ``LIKE '%term%'`` scan of
+every search field. Every term matches as a word prefix, case- and
+accent-insensitively, and selective searches are ranked by relevance
+(bm25).
+
+On other backends, on SQLite builds without FTS5, and whenever a table's
+triggers are missing, the admin falls back to Django's usual ``icontains``
+search. For example, SQLite drops a table's triggers when a migration has
+to rebuild that table. ``manage.py rebuild_search_index`` reinstalls the
+triggers and re-indexes the rows.
+"""
+
+from typing import Iterable
+
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db import OperationalError, connections
+from django.db.models.expressions import RawSQL
+from django.utils.text import smart_split, unescape_string_literal
+
+# Model label -> fields in its full-text index, matching the admin's search_fields.
+INDEXED_FIELDS = {
+    "bookings.Booking": ("booking_reference", "full_name", "email", "phone_number"),
+    "core.Room": ("number", "description"),
+    "core.Review": ("name", "comment"),
+    "core.ContactMessage": ("name", "email", "subject"),
+}
+# Ranking runs the match once per hit, so only searches this selective are ranked.
+RANKED_RESULTS_LIMIT = 200
+RANK = "search_rank"
+
+TRIGGERS = ("ai", "ad", "au")
+
+
+def index_name(table: str) -> str:
+    return f"{table}_fts"
+
+
+def install(connection, table: str, columns: Iterable[str]) -> bool:
+    """Create the index and triggers for ``table`` if missing, then re-index it.
+
+    Returns ``False``, changing nothing, unless the connection is SQLite with
+    FTS5 compiled in.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    quote = connection.ops.quote_name
+    fts = index_name(table)
+    names = ", ".join(quote(column) for column in columns)
+    new = ", ".join(f"new.{quote(column)}" for column in columns)
+    old = ", ".join(f"old.{quote(column)}" for column in columns)
+    delete = f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {quote(fts)}(rowid, {names}) VALUES (new.id, {new});"
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {quote(fts)} USING fts5({names}, "
+                f"content={quote(table)}, content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError:
+            # No FTS5 in this SQLite build; searches keep using LIKE.
+            return False
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {quote(fts + '_ai')} AFTER INSERT ON {quote(table)} BEGIN {insert} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {quote(fts + '_ad')} AFTER DELETE ON {quote(table)} BEGIN {delete} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {quote(fts + '_au')} AFTER UPDATE OF {names} ON {quote(table)} "
+            f"BEGIN {delete} {insert} END"
+        )
+        cursor.execute(f"INSERT INTO {quote(fts)}({quote(fts)}) VALUES ('rebuild')")
+    return True
+
+
+def uninstall(connection, table: str):
+    if connection.vendor != "sqlite":
+        return
+    quote = connection.ops.quote_name
+    fts = index_name(table)
+    with connection.cursor() as cursor:
+        for suffix in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {quote(f'{fts}_{suffix}')}")
+        cursor.execute(f"DROP TABLE IF EXISTS {quote(fts)}")
+
+
+def open_indexes_before_first_transaction(connection):
+    """Run ``open_indexes`` when ``connection`` starts its first transaction.
+
+    Connections that only read, like most requests, never pay for it, and
+    ``IMMEDIATE`` or ``EXCLUSIVE`` transactions take the write lock before
+    reading anything, so they don't need it at all. Called for each new
+    connection; it costs no queries by itself.
+    """
+    if connection.vendor != "sqlite" or connection.transaction_mode in ("IMMEDIATE", "EXCLUSIVE"):
+        return
+    begin = type(connection)._start_transaction_under_autocommit
+
+    def start_transaction():
+        del connection._start_transaction_under_autocommit
+        open_indexes(connection)
+        begin(connection)
+
+    connection._start_transaction_under_autocommit = start_transaction
+
+
+def open_indexes(connection):
+    """Load the connection's full-text indexes before a transaction needs them.
+
+    FTS5 reads an index's configuration the first time a connection compiles
+    a statement touching it, trigger bodies included. Inside a deferred
+    transaction that read takes a shared lock ahead of the write, and SQLite
+    refuses the upgrade while another connection commits ("database is
+    locked"). Compiling one empty query over the indexes, outside the
+    transaction, avoids that.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE %s",
+            ["CREATE VIRTUAL TABLE % USING fts5(%"],
+        )
+        tables = [connection.ops.quote_name(name) for name, in cursor.fetchall()]
+        if tables:
+            cursor.execute(f"SELECT 1 FROM {', '.join(tables)} LIMIT 0")
+
+
+def is_available(model, using: str) -> bool:
+    """Whether ``model``'s index exists and its triggers are keeping it current."""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or model._meta.label not in INDEXED_FIELDS:
+        return False
+    fts = index_name(model._meta.db_table)
+    expected = [fts, *(f"{fts}_{suffix}" for suffix in TRIGGERS)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(expected))})",
+            expected,
+        )
+        return cursor.fetchone()[0] == len(expected)
+
+
+def match_expression(search_term: str) -> str:
+    """FTS5 query for an admin search box entry: every term, each as a word prefix.
+
+    Terms split like Django's admin search, so quoted phrases stay together.
+    Punctuation separates words on both sides of the match, which lets
+    references, e-mail addresses and phone numbers match however they were
+    typed.
+    """
+    terms = []
+    for bit in smart_split(search_term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        if any(character.isalnum() for character in bit):
+            terms.append('"%s"*' % bit.replace('"', '""'))
+    return " ".join(terms)
+
+
+def search(queryset, search_term: str):
+    """Filter ``queryset`` to full-text matches for ``search_term``.
+
+    Selective searches are annotated with ``search_rank`` (bm25, lower is
+    more relevant). Returns ``None`` when the index can't serve the search.
+    """
+    expression = match_expression(search_term)
+    if not expression or not is_available(queryset.model, queryset.db):
+        return None
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    table = queryset.model._meta.db_table
+    fts = quote(index_name(table))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM (SELECT rowid FROM {fts} WHERE {fts} MATCH %s LIMIT %s)",
+            [expression, RANKED_RESULTS_LIMIT + 1],
+        )
+        ranked = cursor.fetchone()[0] <= RANKED_RESULTS_LIMIT
+    queryset = queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [expression]))
+    if ranked:
+        queryset = queryset.annotate(**{RANK: RawSQL(
+            f"SELECT rank FROM {fts} WHERE {fts} MATCH %s AND rowid = {quote(table)}.{quote('id')}",
+            [expression],
+        )})
+    return queryset
+
+
+class RankedChangeList(ChangeList):
+    """Orders ranked search results by relevance unless a column sort was chosen."""
+
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        if ORDER_VAR in self.params or RANK not in queryset.query.annotations:
+            return ordering
+        return [RANK, *ordering]
+
+
+class IndexedSearchAdmin(admin.ModelAdmin):
+    """Serves the changelist search box from the model's full-text index."""
+
+    def get_changelist(self, request, **kwargs):
+        return RankedChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        results = search(queryset, search_term) if search_term else None
+        if results is not None:
+            return results, False
+        return super().get_search_results(request, queryset, search_term)
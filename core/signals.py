@@ -0,0 +1,84 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+
+from . import counters, images, ratings, search
+from .cache import invalidate
+from .models import Review, Room, Service
+
+# Cached sections that depend on each model.
+SECTION_DEPENDENCIES = {
+    Room: ("stats", "availability"),
+    Booking: ("stats", "availability"),
+    Service: ("featured_services",),
+    Review: ("spotlight_reviews",),
+}
+
+
+@receiver(pre_save, sender=Room)
+def remember_room_state(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._counter_state = None
+        return
+    instance._counter_state = Room.objects.filter(pk=instance.pk).values_list("room_type", "is_available").first()
+
+
+@receiver(post_save, sender=Room)
+def update_counters_on_room_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    counters.record_room_change(
+        getattr(instance, "_counter_state", None), (instance.room_type, instance.is_available)
+    )
+
+
+@receiver(post_delete, sender=Room)
+def update_counters_on_room_delete(sender, instance, **kwargs):
+    counters.record_room_change((instance.room_type, instance.is_available), None)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._summary_rating = None
+        return
+    instance._summary_rating = Review.objects.filter(pk=instance.pk).values_list("rating", flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def update_summary_on_review_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ratings.record_change(getattr(instance, "_summary_rating", None), instance.rating)
+
+
+@receiver(post_delete, sender=Review)
+def update_summary_on_review_delete(sender, instance, **kwargs):
+    ratings.record_change(instance.rating, None)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=Review)
+def queue_image_renditions(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.queue_renditions(instance)
+
+
+@receiver(connection_created)
+def open_search_indexes(sender, connection, **kwargs):
+    search.open_indexes_before_first_transaction(connection)
+
+
+def invalidate_sections(sender, **kwargs):
+    # Wait for the commit so a concurrent request cannot re-cache the old data.
+    transaction.on_commit(partial(invalidate, *SECTION_DEPENDENCIES[sender]))
+
+
+for model in SECTION_DEPENDENCIES:
+    post_save.connect(invalidate_sections, sender=model, dispatch_uid=f"invalidate_sections_save_{model.__name__}")
+    post_delete.connect(invalidate_sections, sender=model, dispatch_uid=f"invalidate_sections_delete_{model.__name__}")
@@ -0,0 +1,71 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core import images
+
+register = template.Library()
+
+
+def _attributes(attrs):
+    return format_html_join("", ' {}="{}"', ((name.replace("_", "-"), value) for name, value in attrs.items()))
+
+
+@register.simple_tag
+def responsive_image(image, sizes="100vw", alt="", loading="lazy", **attrs):
+    """Render ``image`` (a static path or an uploaded file) as a ``<picture>`` with WebP and JPEG ``srcset``.
+
+    Extra keyword arguments such as ``class`` become attributes of the
+    ``<img>``, with underscores turned into dashes. Images without current
+    renditions render as a plain ``<img>``.
+    """
+    entry = images.entry_for(image)
+    if not entry:
+        return format_html(
+            '<img src="{}" alt="{}" loading="{}" decoding="async"{}>',
+            images.source_url(image),
+            alt,
+            loading,
+            _attributes(attrs),
+        )
+    width, height = attrs.pop("width", entry["width"]), attrs.pop("height", entry["height"])
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="{}" decoding="async"{}>'
+        "</picture>",
+        images.srcset(image, entry, "webp"),
+        sizes,
+        images.url_for(image, entry["jpeg"][-1][1]),
+        images.srcset(image, entry, "jpeg"),
+        sizes,
+        width,
+        height,
+        alt,
+        loading,
+        _attributes(attrs),
+    )
+
+
+@register.simple_tag
+def image_set(image, width=1920):
+    """CSS ``background-image`` value for ``image`` shown ``width`` CSS pixels wide.
+
+    Offers 1x and 2x candidates in WebP and JPEG, each the smallest rendition
+    wide enough for that density, so the browser picks by screen density and
+    format support.
+    """
+    entry = images.entry_for(image)
+    if not entry:
+        return format_html("url('{}')", images.source_url(image))
+    candidates = []
+    for extension in ("webp", "jpeg"):
+        names = []
+        for density in (1, 2):
+            name = images.rendition_name(entry, extension, width * density)
+            # A source too small for 2x already serves its largest rendition at 1x.
+            if name not in names:
+                names.append(name)
+                candidates.append((images.url_for(image, name), density, extension))
+    return format_html(
+        "image-set({})",
+        format_html_join(", ", "url('{}') {}x type('image/{}')", candidates),
+    )
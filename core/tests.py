@@ -1,3 +1,571 @@
-from django.test import TestCase
+import importlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.db.models import Count
+from django.http import Http404
+from django.template import Context, Template
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+from PIL import Image
+
+from bookings import async_views as booking_async_views
+from bookings import urls as bookings_urls
+from bookings.models import Booking, RoomNight
+from hotel_management import urls as project_urls
+
+from . import async_views, counters, jobs, ratings, renditions, search
+from . import urls as core_urls
+from .cache import _key, _lock_key, cached_section, invalidate
+from .pagination import keyset_page
+from .worker import WorkerPool
+from .forms import ReviewForm
+from .models import ContactMessage, Job, Review, ReviewSummary, Room, RoomTypeCounter
+
+
+class RoomTypeCounterTests(TestCase):
+    def counter(self, room_type):
+        return RoomTypeCounter.objects.get(pk=room_type)
+
+    def test_room_admin_saves_adjust_counters(self):
+        room = Room.objects.create(number="101", room_type="single")
+        self.assertEqual((self.counter("single").total, self.counter("single").booked), (1, 0))
+
+        room.room_type = "deluxe"
+        room.is_available = False
+        room.save()
+        self.assertEqual(self.counter("single").total, 0)
+        self.assertEqual((self.counter("deluxe").total, self.counter("deluxe").booked), (1, 1))
+
+        room.delete()
+        self.assertEqual((self.counter("deluxe").total, self.counter("deluxe").booked), (0, 0))
+
+    def test_bookings_for_tonight_move_rooms_between_available_and_booked(self):
+        Room.objects.create(number="101", room_type="single")
+        Room.objects.create(number="102", room_type="single")
+        booking = Booking(
+            full_name="Test Guest",
+            cnic="4210112345671",
+            address="Test address",
+            room_type="single",
+            check_in=timezone.localdate(),
+        )
+        booking.save()
+        self.assertEqual(counters.totals(), (2, 1, 1))
+
+        Booking(
+            full_name="Future Guest",
+            cnic="4210112345671",
+            address="Test address",
+            room_type="single",
+            check_in=timezone.localdate() + timedelta(days=5),
+        ).save()
+        self.assertEqual(counters.totals(), (2, 1, 1))
+
+        booking.cancel()
+        self.assertEqual(counters.totals(), (2, 2, 0))
+
+    def test_rebuild_matches_incremental_counts(self):
+        Room.objects.create(number="101", room_type="single")
+        Room.objects.create(number="201", room_type="master", is_available=False)
+        before = counters.availability_by_type()
+        RoomTypeCounter.objects.update(total=0, booked=0)
+        counters.rebuild()
+        self.assertEqual(counters.availability_by_type(), before)
+
+
+class SearchIndexTests(TestCase):
+    def test_matches_are_ranked_by_relevance(self):
+        passing = Review.objects.create(name="Sara", comment="Clean rooms; the pool was fine.")
+        keen = Review.objects.create(name="Usman", comment="Pool, pool and more pool. Loved the pool.")
+        Review.objects.create(name="Hina", comment="Great breakfast.")
+
+        results = search.search(Review.objects.all(), "pool")
+        self.assertEqual(list(results.order_by(search.RANK)), [keen, passing])
+
+    def test_indexes_are_opened_before_the_first_transaction_only(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        handler = ConnectionHandler({
+            "default": {},
+            "scratch": {"ENGINE": "django.db.backends.sqlite3", "NAME": str(Path(directory) / "scratch.sqlite3")},
+        })
+        scratch = handler["scratch"]
+        self.addCleanup(scratch.close)
+        with scratch.cursor() as cursor:
+            cursor.execute('CREATE TABLE "notes" ("id" integer PRIMARY KEY, "body" text)')
+        self.assertTrue(search.install(scratch, "notes", ["body"]))
+        scratch.close()
+
+        with CaptureQueriesContext(scratch) as captured:
+            with scratch.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        self.assertEqual(len(captured), 1)
+        with CaptureQueriesContext(scratch) as captured:
+            for _ in range(2):
+                scratch.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+                scratch.commit()
+                scratch.set_autocommit(True)
+        opened = [query["sql"] for query in captured if "sqlite_master" in query["sql"]]
+        self.assertEqual(len(opened), 1)
+
+    def test_admin_falls_back_to_like_search_without_triggers(self):
+        room = Room.objects.create(number="101", description="Sea view with a balcony")
+        self.assertEqual(list(search.search(Room.objects.all(), "balc")), [room])
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER "core_room_fts_au"')
+        self.assertIsNone(search.search(Room.objects.all(), "balc"))
+
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "password"))
+        response = self.client.get(reverse("admin:core_room_changelist"), {"q": "view"})
+        self.assertEqual(list(response.context["cl"].result_list), [room])
+
+
+class LandingPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_repeat_visits_skip_the_database_but_keep_csrf(self):
+        self.client.get(reverse("core:home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("core:home"))
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+    def test_new_review_invalidates_spotlight_after_commit(self):
+        self.client.get(reverse("core:home"))
+        self.assertIsNotNone(cache.get(_key("spotlight_reviews")))
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(name="Fresh Guest", comment="Lovely stay", rating=5)
+        self.assertIsNone(cache.get(_key("spotlight_reviews")))
+        self.assertIsNotNone(cache.get(_key("featured_services")))
+
+    def test_lock_loser_is_served_the_stale_copy(self):
+        cached_section("demo", lambda: "old")
+        invalidate("demo")
+        cache.add(_lock_key("demo"), True)
+        self.assertEqual(cached_section("demo", lambda: self.fail("recomputed twice")), "old")
+
+
+class ReviewPaginationTests(TestCase):
+    def setUp(self):
+        # Identical timestamps force the id tie-breaker to keep pages disjoint.
+        created_at = timezone.now()
+        Review.objects.bulk_create(
+            Review(name=f"Guest {index}", comment="Great stay", rating=5, created_at=created_at)
+            for index in range(30)
+        )
+
+    def test_pages_cover_every_review_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = keyset_page(Review.objects.all(), cursor, size=7)
+            seen.extend(review.pk for review in page)
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(Review.objects.values_list("pk", flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_feed_returns_next_cursor_and_rejects_garbage(self):
+        first = self.client.get(reverse("core:reviews_feed")).json()
+        self.assertEqual(len(first["results"]), 12)
+        second = self.client.get(reverse("core:reviews_feed"), {"cursor": first["next"]}).json()
+        self.assertFalse({r["id"] for r in first["results"]} & {r["id"] for r in second["results"]})
+        self.assertEqual(self.client.get(reverse("core:reviews_feed"), {"cursor": "@@"}).status_code, 400)
+
+    def test_reviews_page_renders_first_page_only(self):
+        response = self.client.get(reverse("core:reviews"))
+        self.assertEqual(len(response.context["reviews"]), 12)
+        self.assertContains(response, "data-load-more")
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Room.objects.create(number="101", room_type="single")
+        for index in range(3):
+            Review.objects.create(name=f"Guest {index}", rating=4, comment="Calm and clean")
+
+    async def get(self, view, path="/", data=None, **kwargs):
+        request = AsyncRequestFactory().get(path, data)
+
+        async def auser():
+            return AnonymousUser()
+
+        request.auser = auser
+        return await view(request, **kwargs)
+
+    async def test_async_pages_render_the_synchronous_context(self):
+        for view, text in (
+            (async_views.home, "From Rs. 5,000"),
+            (async_views.rooms_view, "101"),
+            (async_views.services_view, "Services"),
+            (async_views.reviews_view, "Calm and clean"),
+        ):
+            response = await self.get(view)
+            self.assertContains(response, text)
+        feed = await self.get(async_views.reviews_feed, data={"size": 2})
+        synchronous = await sync_to_async(self.client.get)(reverse("core:reviews_feed"), {"size": 2})
+        self.assertEqual(json.loads(feed.content), synchronous.json())
+        self.assertEqual((await self.get(async_views.reviews_feed, data={"cursor": "@@"})).status_code, 400)
+
+    async def test_async_booking_pages(self):
+        booking = await sync_to_async(Booking.objects.create)(
+            full_name="Async Guest", cnic="4210112345671", address="Lahore", room_type="single",
+            check_in=timezone.localdate() + timedelta(days=2),
+        )
+        response = await self.get(booking_async_views.booking_confirmation, reference=booking.booking_reference)
+        self.assertContains(response, booking.booking_reference)
+        with self.assertRaises(Http404):
+            await self.get(booking_async_views.booking_confirmation, reference="MISSING")
+        availability = json.loads((await self.get(booking_async_views.availability_api)).content)
+        single = next(entry for entry in availability["room_types"] if entry["code"] == "single")
+        self.assertEqual(single["total"], 1)
+
+    def route_public_pages_to_async_views(self):
+        def reload_urlconfs():
+            for module in (core_urls, bookings_urls, project_urls):
+                importlib.reload(module)
+            clear_url_caches()
+
+        # Cleanups run last-in first-out: restore the setting, then reload.
+        self.addCleanup(reload_urlconfs)
+        self.enterContext(override_settings(ASYNC_VIEWS=True))
+        reload_urlconfs()
+
+    async def test_asgi_routing_serves_and_posts_through_the_async_views(self):
+        self.route_public_pages_to_async_views()
+        self.assertIs(resolve(reverse("core:contact")).func, async_views.contact_view)
+        self.assertIs(resolve(reverse("core:home")).func, async_views.home)
+
+        response = await self.async_client.get(reverse("core:home"))
+        self.assertContains(response, "From Rs. 5,000")
+        message = {"name": "Async Guest", "email": "guest@example.com", "subject": "Late arrival", "message": "Hi"}
+        response = await self.async_client.post(reverse("core:contact"), message)
+        self.assertRedirects(response, reverse("core:contact"), fetch_redirect_response=False)
+        response = await self.async_client.post(reverse("core:home"), {**message, "subject": "Parking"})
+        self.assertRedirects(response, f"{reverse('core:home')}#contact", fetch_redirect_response=False)
+        subjects = [subject async for subject in ContactMessage.objects.order_by("pk").values_list("subject", flat=True)]
+        self.assertEqual(subjects, ["Late arrival", "Parking"])
+        response = await self.async_client.post(reverse("core:contact"), {**message, "email": "not-an-email"})
+        self.assertContains(response, "Enter a valid email address.")
+
+
+class ReviewSummaryTests(TestCase):
+    def test_create_edit_and_delete_keep_summary_in_step(self):
+        review = ReviewForm({"name": "Amina", "comment": "Superb", "rating": 5}).save()
+        Review.objects.create(name="Daniel", comment="Good", rating=3)
+        summary = ratings.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum, summary.stars_5, summary.stars_3), (2, 8, 1, 1))
+
+        review.rating = 4
+        review.save()
+        summary = ratings.summary()
+        self.assertEqual((summary.rating_sum, summary.stars_5, summary.stars_4), (7, 0, 1))
+
+        review.delete()
+        summary = ratings.summary()
+        self.assertEqual((summary.review_count, summary.average), (1, 3))
+
+    def test_reviews_page_reads_summary_without_aggregating(self):
+        Review.objects.create(name="Daniel", comment="Good", rating=4)
+        ReviewSummary.objects.update(rating_sum=5)
+        response = self.client.get(reverse("core:reviews"))
+        self.assertEqual(response.context["average_rating"], 5)
+
+    def test_rebuild_recovers_from_bulk_loads(self):
+        Review.objects.bulk_create([Review(name="A", comment="x", rating=2), Review(name="B", comment="y", rating=4)])
+        summary = ratings.rebuild()
+        self.assertEqual((summary.review_count, summary.average, summary.stars_2), (2, 3, 1))
+
+
+class ScaleSeedTests(TestCase):
+    def seed(self):
+        call_command(
+            "seed_hotelease", rooms=60, bookings=800, reviews=200, messages=50, seed=3, batch_size=97, stdout=StringIO()
+        )
+
+    def test_scale_mode_generates_consistent_data(self):
+        self.seed()
+        self.assertEqual(Room.objects.count(), 66)
+        self.assertEqual(Booking.objects.count(), 801)
+        self.assertEqual(ContactMessage.objects.count(), 50)
+        self.assertEqual(ratings.summary().review_count, Review.objects.count())
+        self.assertFalse(
+            RoomNight.objects.values("room", "date").annotate(n=Count("id")).filter(n__gt=1).exists()
+        )
+        self.assertFalse(RoomNight.objects.filter(booking__status="cancelled").exists())
+        total, _, booked = counters.totals()
+        self.assertEqual((total, booked), (66, Room.objects.filter(is_available=False).count()))
+        # Sequences were reset, so ordinary saves keep working afterwards.
+        Review.objects.create(name="After", rating=4, comment="Fine")
+
+    def test_same_seed_produces_the_same_dataset(self):
+        self.seed()
+        first = list(Booking.objects.order_by("id").values_list("room_type", "check_in", "booking_days", "status"))
+        Booking.objects.all().delete()
+        self.seed()
+        second = list(Booking.objects.order_by("id").values_list("room_type", "check_in", "booking_days", "status"))
+        self.assertEqual(first[1:], second[1:])
+
+
+class ViewBenchmarkTests(TestCase):
+    def test_results_are_recorded_and_compared_with_baseline(self):
+        workdir = Path(tempfile.mkdtemp())
+        output, baseline = workdir / "views.json", workdir / "baseline.json"
+        options = {"scales": ["tiny"], "samples": 2, "warmup": 0, "output": str(output), "baseline": str(baseline)}
+
+        call_command("bench_views", save_baseline=True, stdout=StringIO(), **options)
+        endpoints = json.loads(output.read_text())["scales"]["tiny"]["endpoints"]
+        self.assertIn("booking_create POST", endpoints)
+        self.assertGreater(endpoints["dashboard"]["queries"], 0)
+
+        recorded = json.loads(baseline.read_text())
+        recorded["scales"]["tiny"]["endpoints"]["dashboard"]["queries"] = 1
+        baseline.write_text(json.dumps(recorded))
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("bench_views", stdout=out, **options)
+        self.assertIn("tiny/dashboard", out.getvalue())
+
+
+class IndexReportTests(TestCase):
+    def test_reports_scans_and_proposes_an_index_for_the_inbox_filter(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "core_contact_inbox_idx"')
+        call_command("seed_hotelease", rooms=12, bookings=60, reviews=30, messages=10, stdout=StringIO())
+        out = StringIO()
+        call_command("index_report", no_seed=True, min_rows=0, stdout=out)
+        report = out.getvalue()
+
+        self.assertIn("full scan of core_contactmessage", report)
+        self.assertIn("/admin/core/contactmessage/?handled__exact=0", report)
+        self.assertIn("core.ContactMessage: models.Index(fields=['handled']", report)
+        self.assertNotIn("Redundant index", report)
+
+
+class DashboardTrendTests(TestCase):
+    def test_dashboard_charts_the_selected_period(self):
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        Room.objects.create(number="101", room_type="single")
+        Booking.objects.create(
+            full_name="Guest", cnic="4210112345671", address="Lahore", room_type="single",
+            check_in=timezone.localdate() - timedelta(days=40), booking_days=2,
+        )
+        month = self.client.get(reverse("core:dashboard"))
+        quarter = self.client.get(reverse("core:dashboard"), {"days": 90})
+        self.assertEqual(month.context["period_totals"]["bookings"], 0)
+        self.assertEqual(quarter.context["period_totals"]["bookings"], 1)
+        self.assertEqual(quarter.context["period_totals"]["nights_sold"], 2)
+        self.assertEqual(quarter.context["booking_count"], 1)
+        self.assertEqual(self.client.get(reverse("core:dashboard"), {"days": "7"}).context["period"], 30)
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+
+@jobs.task("always_fails")
+def always_fails(payload):
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Room.objects.create(number="101", room_type="single")
+
+    def book(self, email):
+        return self.client.post(reverse("bookings:booking_form"), {
+            "form_name": "booking",
+            "full_name": "Queue Guest",
+            "cnic": "4210112345671",
+            "address": "Lahore",
+            "email": email,
+            "room_type": "single",
+            "check_in": (timezone.localdate() + timedelta(days=3)).isoformat(),
+            "booking_days": 2,
+        })
+
+    def test_booking_confirmation_is_queued_not_sent_inline(self):
+        self.assertEqual(self.book("guest@example.com").status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        job = Job.objects.get(name="send_booking_confirmation")
+        self.assertEqual(job.status, "queued")
+
+        call_command("run_worker", once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertEqual(mail.outbox[0].to, ["guest@example.com"])
+        self.assertTrue(mail.outbox[0].attachments[0][0].startswith("receipt-"))
+
+    def test_contact_messages_alert_staff(self):
+        self.client.post(reverse("core:contact"), {
+            "name": "Visitor", "email": "visitor@example.com", "subject": "Hello", "message": "Question",
+        })
+        call_command("run_worker", once=True, stdout=StringIO())
+        self.assertEqual(mail.outbox[0].reply_to, ["visitor@example.com"])
+
+    @override_settings(EMAIL_BACKEND="core.tests.CountingEmailBackend")
+    def test_emails_in_a_batch_share_one_connection(self):
+        for index in range(3):
+            jobs.enqueue("notify_staff_of_contact_message", {
+                "id": ContactMessage.objects.create(name="V", email="v@example.com", subject=str(index), message="m").pk,
+            })
+        CountingEmailBackend.opened = 0
+        self.assertEqual(jobs.run_due(), {"done": 3, "failed": 0})
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failures_back_off_then_give_up(self):
+        job = jobs.enqueue("always_fails", max_attempts=2)
+        jobs.run_due()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("queued", 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        jobs.run_due()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        jobs.enqueue("always_fails")
+        self.assertEqual(len(jobs.claim()), 1)
+        self.assertEqual(jobs.claim(), [])
+
+
+
+class WorkerPoolTests(TransactionTestCase):
+    def test_spawned_workers_run_jobs_and_stop_cleanly(self):
+        job = jobs.enqueue("build_image_renditions", {"model": "core.review", "pk": 0})
+        # The worker command runs against this test database; spawned workers set Django up themselves.
+        env = {**os.environ, "HOTELEASE_DB_NAME": str(connection.settings_dict["NAME"])}
+        manage = str(Path(settings.BASE_DIR) / "manage.py")
+        command = [sys.executable, manage, "run_worker", "--processes", "2", "--poll", "0.1", "--start-method", "spawn"]
+        worker = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            deadline = time.monotonic() + 60
+            while Job.objects.get(pk=job.pk).status != "done" and time.monotonic() < deadline:
+                time.sleep(0.2)
+        finally:
+            worker.send_signal(signal.SIGTERM)
+            out, err = worker.communicate(timeout=60)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, "done", err)
+        self.assertEqual(worker.returncode, 0, err)
+        self.assertIn("Workers stopped.", out)
+
+    def test_crashing_workers_are_restarted_then_fail_the_pool(self):
+        pool = WorkerPool(1, sys.exit, (3,), context=multiprocessing.get_context("spawn"), max_restarts=2)
+        pool.start()
+        with self.assertLogs("core.worker", "ERROR") as logs:
+            failures = pool.run()
+        self.assertEqual(failures, [("hotelease-worker-0", 3)])
+        self.assertEqual(sum("exited with code 3" in line for line in logs.output), 3)
+
+
+def jpeg_bytes(width=900, height=600):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (180, 120, 60)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class ResponsiveImageTests(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_renditions_are_never_upscaled(self):
+        width, height, rendered = renditions.render(jpeg_bytes())
+        self.assertEqual((width, height), (900, 600))
+        self.assertEqual(sorted({target for _, target, _ in rendered}), [160, 320, 480, 640, 900])
+        self.assertEqual({extension for extension, _, _ in rendered}, {"webp", "jpeg"})
+
+    def test_static_set_is_built_once_and_rendered_with_srcset(self):
+        (self.tmp / "static" / "images").mkdir(parents=True)
+        (self.tmp / "static" / "images" / "Lobby View.jpg").write_bytes(jpeg_bytes())
+        root = self.tmp / "static" / "responsive"
+        with override_settings(STATICFILES_DIRS=[self.tmp / "static"], RESPONSIVE_IMAGE_ROOT=root):
+            call_command("build_image_renditions", processes=1, stdout=StringIO())
+            out = StringIO()
+            call_command("build_image_renditions", processes=1, stdout=out)
+            self.assertIn("Built 0 of 1 images", out.getvalue())
+            html = Template('{% load responsive %}{% responsive_image "images/Lobby View.jpg" sizes="50vw" %}').render(
+                Context()
+            )
+            background = Template('{% load responsive %}{% image_set "images/Lobby View.jpg" 320 %}').render(Context())
+        self.assertIn('type="image/webp"', html)
+        self.assertIn("lobby-view-", html)
+        self.assertIn("480w", html)
+        self.assertIn('sizes="50vw"', html)
+        # 320px wide: the 320 rendition at 1x and the 640 one at 2x, in both formats.
+        self.assertTrue(background.startswith("image-set(url('"))
+        self.assertEqual(re.findall(r"-(\d+)\.(\w+)'\) (\dx)", background), [
+            ("320", "webp", "1x"), ("640", "webp", "2x"), ("320", "jpeg", "1x"), ("640", "jpeg", "2x"),
+        ])
+
+    def test_uploads_get_renditions_from_a_background_job(self):
+        with override_settings(MEDIA_ROOT=self.tmp / "media"):
+            with self.captureOnCommitCallbacks(execute=True):
+                review = Review.objects.create(
+                    name="Guest", comment="Great", photo=SimpleUploadedFile("me.jpg", jpeg_bytes(), "image/jpeg")
+                )
+            before = Template("{% load responsive %}{% responsive_image review.photo %}").render(
+                Context({"review": review})
+            )
+            self.assertNotIn("<picture>", before)
+            self.assertTrue(Job.objects.filter(name="build_image_renditions").exists())
+            jobs.run_due()
+            review.refresh_from_db()
+            self.assertEqual(review.renditions["photo"]["source"], review.photo.name)
+            after = Template('{% load responsive %}{% responsive_image review.photo sizes="56px" %}').render(
+                Context({"review": review})
+            )
+            self.assertIn("<picture>", after)
+            self.assertIn("/media/renditions/reviews/", after)
+
+    def test_saving_again_while_a_build_is_waiting_queues_no_second_job(self):
+        with override_settings(MEDIA_ROOT=self.tmp / "media"):
+            review = Review.objects.create(
+                name="Guest", comment="Great", photo=SimpleUploadedFile("me.jpg", jpeg_bytes(), "image/jpeg")
+            )
+            review.photo = SimpleUploadedFile("me-again.jpg", jpeg_bytes(640, 480), "image/jpeg")
+            review.save()
+            builds = Job.objects.filter(name="build_image_renditions")
+            self.assertEqual(builds.count(), 1)
+
+            jobs.run_due()
+            review.refresh_from_db()
+            self.assertEqual(review.renditions["photo"]["source"], review.photo.name)
+            review.photo = SimpleUploadedFile("me-later.jpg", jpeg_bytes(), "image/jpeg")
+            review.save()
+            self.assertEqual(builds.filter(status="queued").count(), 1)
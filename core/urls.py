@@ -1,14 +1,20 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "core"
 
+# Served through ASGI, the public pages use their async versions (see
+# hotel_management/asgi.py).
+public = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path("", views.home, name="home"),
-    path("rooms/", views.rooms_view, name="rooms"),
-    path("services/", views.services_view, name="services"),
-    path("reviews/", views.reviews_view, name="reviews"),
-    path("contact/", views.contact_view, name="contact"),
+    path("", public.home, name="home"),
+    path("rooms/", public.rooms_view, name="rooms"),
+    path("services/", public.services_view, name="services"),
+    path("reviews/", public.reviews_view, name="reviews"),
+    path("reviews/feed/", public.reviews_feed, name="reviews_feed"),
+    path("contact/", public.contact_view, name="contact"),
     path("dashboard/", views.dashboard, name="dashboard"),
 ]
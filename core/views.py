@@ -1,44 +1,54 @@
+from datetime import timedelta
+
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Avg, Count
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateformat import format as format_date
+from django.views.decorators.http import require_GET
 
+from bookings import inventory, pricing, rollups
 from bookings.models import Booking
-from .forms import ContactForm
+from . import counters, images, jobs, ratings
+from .cache import cached_section
+from .forms import AvailabilityForm, ContactForm
+from .hotel import hotel_context
+from .pagination import MAX_PAGE_SIZE, REVIEW_PAGE_SIZE, keyset_page
 from .models import Review, Room, Service
 
-HOTEL_TOTAL_ROOMS = 50
 HOME_HEADER_GALLERY = [
     {
         "title": "Meeting Room",
         "subtitle": "Executive boardroom seating with seamless AV integration",
         "image": "images/Meeting Room.jpg",
-        "price": 10000,
+        "room_type": "meeting",
     },
     {
         "title": "Standard Room",
         "subtitle": "Calming city-view sanctuaries for solo travellers",
         "image": "images/S Room.1.jpg",
-        "price": 5000,
+        "room_type": "single",
     },
     {
         "title": "Deluxe Room",
         "subtitle": "Spacious interiors with bespoke amenities",
         "image": "images/D Room.1.jpg",
-        "price": 8000,
+        "room_type": "deluxe",
     },
     {
         "title": "Executive Room",
         "subtitle": "Panoramic skyline views and dedicated workspace",
         "image": "images/E Area.1.jpg",
-        "price": 12000,
+        "room_type": "executive",
     },
     {
         "title": "Suites",
         "subtitle": "Signature suites curated for extended, indulgent stays",
         "image": "images/S Room.3.jpg",
-        "price": 15000,
+        "room_type": "suite",
     },
 ]
 DEFAULT_SERVICES = [
@@ -91,7 +101,7 @@ ROOM_COLLECTIONS = [
         "title": "Executive Meeting Room",
         "icon": "fa-solid fa-people-group",
         "summary": "Soundproof corporate suites with ergonomic seating, seamless conferencing tech, and on-call butler service for refreshments.",
-        "price": 10000,
+        "room_type": "meeting",
         "images": ["images/Meeting Room.jpg"],
     },
     {
@@ -99,7 +109,7 @@ ROOM_COLLECTIONS = [
         "title": "Bath Room Retreats",
         "icon": "fa-solid fa-bath",
         "summary": "Marble-clad bathrooms with rain showers, soaking tubs, and curated spa amenities for slow, restorative rituals.",
-        "price": None,
+        "room_type": None,
         "images": ["images/B Room.1.jpg", "images/B Room.2.jpg", "images/B Room.3.jpg"],
     },
     {
@@ -107,7 +117,7 @@ ROOM_COLLECTIONS = [
         "title": "Standard Room",
         "icon": "fa-solid fa-bed",
         "summary": "Queen bedding, curated minibar selections, and soft ambient lighting perfect for leisure escapes.",
-        "price": 5000,
+        "room_type": "single",
         "images": ["images/S Room.1.jpg", "images/S Room.2.jpg", "images/S Room.3.jpg"],
     },
     {
@@ -115,7 +125,7 @@ ROOM_COLLECTIONS = [
         "title": "Deluxe Room",
         "icon": "fa-solid fa-champagne-glasses",
         "summary": "Expansive living area, bespoke furniture, and concierge-crafted turndown experiences.",
-        "price": 8000,
+        "room_type": "deluxe",
         "images": ["images/D Room.1.jpg", "images/D Room.2.jpg", "images/D Room.3.jpg"],
     },
     {
@@ -123,7 +133,7 @@ ROOM_COLLECTIONS = [
         "title": "Executive Room",
         "icon": "fa-solid fa-briefcase",
         "summary": "Dedicated lounge access, smart workspace, and floor-to-ceiling views for discerning business travellers.",
-        "price": 12000,
+        "room_type": "executive",
         "images": ["images/E Area.1.jpg", "images/E Area.2.jpg", "images/E Area.3.jpg"],
     },
     {
@@ -131,7 +141,7 @@ ROOM_COLLECTIONS = [
         "title": "Luxury Suites",
         "icon": "fa-solid fa-crown",
         "summary": "Private living quarters, bespoke concierge, and artful interiors curated for extended stays.",
-        "price": 15000,
+        "room_type": "suite",
         "images": ["images/S Room.1.jpg", "images/S Room.2.jpg", "images/S Room.3.jpg"],
     },
 ]
@@ -146,93 +156,134 @@ EXTERIOR_GALLERY = [
 ]
 
 RATING_RANGE = range(1, 6)
+FEED_ERROR = {"error": "Invalid cursor or page size."}
+DASHBOARD_PERIODS = (30, 90, 365)
+CHART_WIDTH = 600
+CHART_HEIGHT = 120
+ROOM_TYPE_LABELS = dict(Booking.ROOM_TYPE_CHOICES)
 
 
-def _room_stats():
-    """Return total, available and booked room counts."""
-    total_rooms = HOTEL_TOTAL_ROOMS
-    available_rooms = Room.objects.filter(is_available=True).count()
-    booked_rooms = Room.objects.filter(is_available=False).count()
+def _room_stats(check_in=None, check_out=None, by_type=None):
+    """Return total, available and booked room counts.
+
+    Tonight's figures come from the maintained per-type counters; any other
+    stay is answered from the nightly inventory.
+    """
+    if by_type is None:
+        if check_in is None:
+            return counters.totals()
+        by_type = inventory.availability_by_type(check_in, check_out)
+    total_rooms = sum(counts["total"] for counts in by_type.values())
+    available_rooms = sum(counts["available"] for counts in by_type.values())
+    booked_rooms = sum(counts["booked"] for counts in by_type.values())
     return total_rooms, available_rooms, booked_rooms
 
 
-def _hotel_context():
-    return {
-        "hotel_name": "HotelEase",
-        "check_in": "Anytime (Welcome 24/7)",
-        "check_out": "12 PM Fixed",
-        "phone": "0307-2034454",
-        "email": "mursaleenmalik286@gmail.com",
-        "address": "Punjab University Employees Housing Society, Phase 2, Block A",
-    }
+def _featured_services():
+    return list(Service.objects.filter(featured=True)[:6]) or DEFAULT_SERVICES
 
 
-def home(request):
-    """HotelEase landing page with hero, highlights, and contact form."""
-    total_rooms, available_rooms, booked_rooms = _room_stats()
-    featured_services = list(Service.objects.filter(featured=True)[:6]) or DEFAULT_SERVICES
-    spotlight_reviews = list(Review.objects.all()[:3])
-    contact_form = ContactForm(request.POST or None)
+def _spotlight_reviews():
+    return list(Review.objects.all()[:3])
 
-    if request.method == "POST" and contact_form.is_valid():
-        contact_form.save()
-        messages.success(request, "Thank you for contacting HotelEase. Our team will reach out shortly.")
-        return redirect(f"{reverse('core:home')}#contact")
 
-    context = {
+def _save_contact_message(form):
+    """Save a contact form and queue the staff alert in the same transaction."""
+    with transaction.atomic():
+        message = form.save()
+        jobs.enqueue("notify_staff_of_contact_message", {"id": message.pk})
+    return message
+
+
+def _priced(entries, prices):
+    """Copy gallery entries with each one's "from" price filled in from its room type."""
+    return [{**entry, "price": prices.get(entry["room_type"])} for entry in entries]
+
+
+def _home_context(stats, services, reviews, from_prices, contact_form):
+    total_rooms, available_rooms, booked_rooms = stats
+    return {
         "total_rooms": total_rooms,
         "available_rooms": available_rooms,
         "booked_rooms": booked_rooms,
-        "hotel": _hotel_context(),
-        "services": featured_services,
-        "reviews": spotlight_reviews,
-        "header_gallery": HOME_HEADER_GALLERY,
-        "room_sections": ROOM_COLLECTIONS,
+        "hotel": hotel_context(),
+        "services": services,
+        "reviews": reviews,
+        "header_gallery": _priced(HOME_HEADER_GALLERY, from_prices),
+        "room_sections": _priced(ROOM_COLLECTIONS, from_prices),
         "exterior_gallery": EXTERIOR_GALLERY,
         "rating_range": RATING_RANGE,
         "contact_form": contact_form,
     }
+
+
+def home(request):
+    """HotelEase landing page with hero, highlights, and contact form."""
+    contact_form = ContactForm(request.POST or None)
+    if request.method == "POST" and contact_form.is_valid():
+        _save_contact_message(contact_form)
+        messages.success(request, "Thank you for contacting HotelEase. Our team will reach out shortly.")
+        return redirect(f"{reverse('core:home')}#contact")
+
+    context = _home_context(
+        cached_section("stats", _room_stats),
+        cached_section("featured_services", _featured_services),
+        cached_section("spotlight_reviews", _spotlight_reviews),
+        pricing.from_prices(),
+        contact_form,
+    )
     return render(request, "core/home.html", context)
 
 
-def rooms_view(request):
-    rooms = Room.objects.all().order_by("room_type", "number")
-    room_groups = []
+def _rooms_context(availability_form, rooms, by_type):
+    check_in, check_out = availability_form.stay()
     type_labels = dict(Room.ROOM_TYPES)
-    for item in rooms.values("room_type").annotate(total=Count("id")):
-        room_groups.append(
-            {
-                "code": item["room_type"],
-                "label": type_labels.get(item["room_type"], item["room_type"].title()),
-                "total": item["total"],
-            }
-        )
-    total_rooms, available_rooms, booked_rooms = _room_stats()
-    context = {
+    room_groups = [
+        {"code": code, "label": type_labels.get(code, code.title()), **counts}
+        for code, counts in sorted(by_type.items())
+    ]
+    total_rooms, available_rooms, booked_rooms = _room_stats(by_type=by_type)
+    return {
         "rooms": rooms,
         "room_groups": room_groups,
+        "availability_form": availability_form,
+        "check_in": check_in,
+        "check_out": check_out,
         "total_rooms": total_rooms,
         "available_rooms": available_rooms,
         "booked_rooms": booked_rooms,
-        "hotel": _hotel_context(),
+        "hotel": hotel_context(),
     }
+
+
+def _rooms_query(check_in, check_out):
+    return inventory.annotate_free(Room.objects.all(), check_in, check_out).order_by("room_type", "number")
+
+
+def rooms_view(request):
+    availability_form = AvailabilityForm(request.GET if "check_in" in request.GET else None)
+    check_in, check_out = availability_form.stay()
+    if availability_form.is_bound and availability_form.is_valid():
+        by_type = inventory.availability_by_type(check_in, check_out)
+    else:
+        by_type = counters.availability_by_type()
+    context = _rooms_context(availability_form, _rooms_query(check_in, check_out), by_type)
     return render(request, "core/rooms.html", context)
 
 
-def services_view(request):
-    services_qs = list(Service.objects.all())
-    services = services_qs or DEFAULT_SERVICES
-    context = {
-        "services": services,
-        "hotel": _hotel_context(),
+def _services_context(services):
+    return {
+        "services": services or DEFAULT_SERVICES,
+        "hotel": hotel_context(),
     }
-    return render(request, "core/services.html", context)
 
 
-def reviews_view(request):
-    reviews = Review.objects.all()
-    average_rating = reviews.aggregate(avg=Avg("rating"))
-    avg_value = average_rating.get("avg") or 0 if average_rating else 0
+def services_view(request):
+    return render(request, "core/services.html", _services_context(list(Service.objects.all())))
+
+
+def _reviews_context(reviews, next_cursor, summary):
+    avg_value = summary.average
     average_star_icons = []
     for star in RATING_RANGE:
         if avg_value >= star:
@@ -241,36 +292,110 @@ def reviews_view(request):
             average_star_icons.append("half")
         else:
             average_star_icons.append("empty")
-    context = {
+    return {
         "reviews": reviews,
+        "next_cursor": next_cursor,
         "average_rating": round(avg_value, 1),
         "average_star_icons": average_star_icons,
+        "review_count": summary.review_count,
+        "rating_histogram": summary.histogram,
         "rating_range": RATING_RANGE,
-        "hotel": _hotel_context(),
+        "hotel": hotel_context(),
     }
-    return render(request, "core/reviews.html", context)
+
+
+def reviews_view(request):
+    reviews, next_cursor = keyset_page(Review.objects.all())
+    return render(request, "core/reviews.html", _reviews_context(reviews, next_cursor, ratings.summary()))
+
+
+def _review_payload(review):
+    return {
+        "id": review.pk,
+        "name": review.name,
+        "location": review.location,
+        "rating": review.rating,
+        "comment": review.comment,
+        # Feed photos are shown as 56px avatars; send a rendition sharp on 2x screens.
+        "photo": images.best_url(review.photo, 112) if review.photo else None,
+        "created_at": review.created_at.isoformat(),
+        "stayed": format_date(review.created_at, "F Y"),
+        "posted": format_date(review.created_at, "M d, Y"),
+    }
+
+
+def _feed_size(request):
+    return min(max(int(request.GET.get("size", REVIEW_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+
+
+def _feed_response(reviews, next_cursor):
+    return JsonResponse({"results": [_review_payload(review) for review in reviews], "next": next_cursor})
+
+
+@require_GET
+def reviews_feed(request):
+    """JSON page of reviews for infinite scroll; pass ``cursor`` from the previous page."""
+    try:
+        reviews, next_cursor = keyset_page(Review.objects.all(), request.GET.get("cursor"), _feed_size(request))
+    except ValueError:
+        return JsonResponse(FEED_ERROR, status=400)
+    return _feed_response(reviews, next_cursor)
 
 
 def contact_view(request):
     form = ContactForm(request.POST or None)
     if request.method == "POST" and form.is_valid():
-        form.save()
+        _save_contact_message(form)
         messages.success(request, "Thanks for reaching out! We'll reply shortly.")
         return redirect("core:contact")
-    return render(request, "core/contact.html", {"form": form, "hotel": _hotel_context()})
+    return render(request, "core/contact.html", {"form": form, "hotel": hotel_context()})
+
+
+def _chart(values, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """SVG polyline points for ``values`` scaled into a ``width`` x ``height`` box."""
+    peak = max(values, default=0) or 1
+    step = width / max(len(values) - 1, 1)
+    points = " ".join(
+        f"{index * step:.1f},{height - value * height / peak:.1f}" for index, value in enumerate(values)
+    )
+    return {"points": points, "area": f"0,{height} {points} {width},{height}", "peak": max(values, default=0)}
 
 
 @staff_member_required
 def dashboard(request):
-    """Simple dashboard summarising bookings and occupancy."""
+    """Dashboard summarising occupancy and booking trends from the daily rollups."""
     total_rooms, available_rooms, booked_rooms = _room_stats()
-    bookings = Booking.objects.select_related("room").all()
+    try:
+        period = int(request.GET.get("days", DASHBOARD_PERIODS[0]))
+    except ValueError:
+        period = DASHBOARD_PERIODS[0]
+    if period not in DASHBOARD_PERIODS:
+        period = DASHBOARD_PERIODS[0]
+    end = timezone.localdate()
+    start = end - timedelta(days=period - 1)
+    days = rollups.daily_totals(start, end)
+    period_totals = {metric: sum(day[metric] for day in days) for metric in rollups.METRICS}
+    room_nights = total_rooms * period
     context = {
-        "hotel": _hotel_context(),
+        "hotel": hotel_context(),
         "total_rooms": total_rooms,
         "available_rooms": available_rooms,
         "booked_rooms": booked_rooms,
-        "booking_count": bookings.count(),
-        "recent_bookings": bookings[:10],
+        "booking_count": rollups.all_time_booking_count(),
+        "recent_bookings": Booking.objects.select_related("room")[:10],
+        "periods": DASHBOARD_PERIODS,
+        "period": period,
+        "period_start": start,
+        "period_end": end,
+        "period_totals": period_totals,
+        "occupancy": round(100 * period_totals["nights_sold"] / room_nights, 1) if room_nights else 0,
+        "by_type": [
+            {**row, "label": ROOM_TYPE_LABELS.get(row["room_type"], row["room_type"])}
+            for row in rollups.totals_by_type(start, end)
+        ],
+        "revenue_chart": _chart([day["revenue"] for day in days]),
+        "nights_chart": _chart([day["nights_sold"] for day in days]),
+        "chart_width": CHART_WIDTH,
+        "chart_height": CHART_HEIGHT,
     }
     return render(request, "core/dashboard.html", context)
@@ -0,0 +1,117 @@
+"""Worker processes behind ``manage.py run_worker``.
+
+Nothing here imports Django models at module level. Under the ``spawn`` and
+``forkserver`` start methods a worker imports this module in a fresh
+interpreter, so ``work`` sets Django up before it loads the job queue.
+``WorkerPool`` starts the workers, restarts any that exit on their own and
+gives up on a worker that keeps failing.
+"""
+
+import logging
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+
+logger = logging.getLogger(__name__)
+
+# A worker that exits unexpectedly is restarted, unless it already was this
+# many times within RESTART_WINDOW seconds: then it is crash-looping.
+MAX_RESTARTS = 5
+RESTART_WINDOW = 60.0
+# Exit codes of a worker stopped by the pool before it installed its handlers.
+STOPPED_EXIT_CODES = (0, -signal.SIGTERM, -signal.SIGINT)
+
+
+def work(batch_size, poll):
+    """Worker process loop: claim, run, sleep when idle; finish the current batch on SIGTERM."""
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    import django
+
+    django.setup()
+    from django.db import close_old_connections, connections
+
+    from . import jobs
+
+    while not stopping:
+        close_old_connections()
+        claimed = jobs.claim(batch_size)
+        if claimed:
+            jobs.run_batch(claimed)
+            continue
+        deadline = time.monotonic() + poll
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(0.1)
+    connections.close_all()
+
+
+class WorkerPool:
+    """``processes`` copies of ``target(*args)``, each in its own process, kept running until ``stop()``."""
+
+    def __init__(self, processes, target, args=(), context=None, max_restarts=MAX_RESTARTS):
+        self.processes = processes
+        self.target = target
+        self.args = args
+        self.context = context or multiprocessing.get_context()
+        self.max_restarts = max_restarts
+        self.workers = {}
+        self.restarts = {index: [] for index in range(processes)}
+        self.stopping = False
+
+    def start(self):
+        for index in range(self.processes):
+            self._start(index)
+
+    def _start(self, index):
+        worker = self.context.Process(target=self.target, args=self.args, name=f"hotelease-worker-{index}")
+        worker.start()
+        self.workers[index] = worker
+
+    @property
+    def pids(self):
+        return [worker.pid for worker in self.workers.values()]
+
+    def stop(self, signum=None, frame=None):
+        """Ask every worker to finish its current batch and exit; usable as a signal handler."""
+        self.stopping = True
+        for worker in self.workers.values():
+            if worker.is_alive():
+                worker.terminate()
+
+    def run(self):
+        """Supervise the workers until they have stopped; returns ``(name, exit code)`` of each that failed."""
+        failures = []
+        while True:
+            alive = [worker for worker in self.workers.values() if worker.is_alive()]
+            if self.stopping and not alive:
+                break
+            if alive:
+                wait([worker.sentinel for worker in alive], timeout=1.0)
+            if self.stopping:
+                continue
+            for index, worker in list(self.workers.items()):
+                if worker.exitcode is None:
+                    continue
+                logger.error("Worker %s (pid %s) exited with code %s.", worker.name, worker.pid, worker.exitcode)
+                now = time.monotonic()
+                recent = [moment for moment in self.restarts[index] if now - moment < RESTART_WINDOW]
+                if len(recent) >= self.max_restarts:
+                    logger.error("Worker %s keeps failing; stopping the pool.", worker.name)
+                    failures.append((worker.name, worker.exitcode))
+                    self.stop()
+                    break
+                self.restarts[index] = recent + [now]
+                self._start(index)
+        for worker in self.workers.values():
+            worker.join()
+            if worker.exitcode not in STOPPED_EXIT_CODES and (worker.name, worker.exitcode) not in failures:
+                failures.append((worker.name, worker.exitcode))
+        return failures
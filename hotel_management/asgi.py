@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotel_management.settings')
+# Serve the public pages with their async views (see settings.ASYNC_VIEWS).
+os.environ.setdefault('HOTELEASE_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
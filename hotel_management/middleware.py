@@ -0,0 +1,233 @@
+"""Opt-in per-request cost instrumentation.
+
+``RequestInstrumentationMiddleware`` counts SQL queries and DB time, template
+render time and view time for each sampled request, reports them in a
+``Server-Timing`` header and logs a structured entry for slow or query-heavy
+requests, including the statements that repeat most (the usual sign of an N+1
+loop). It runs natively under WSGI and ASGI, is configured with the
+``REQUEST_INSTRUMENTATION`` setting and removes itself from the middleware
+chain when disabled.
+"""
+
+import json
+import logging
+import random
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger("hotel_management.requests")
+
+DEFAULTS = {
+    "ENABLED": False,
+    # Share of requests instrumented; the rest pass straight through.
+    "SAMPLE_RATE": 1.0,
+    "SERVER_TIMING": True,
+    # A sampled request is logged when it crosses any of these thresholds.
+    "SLOW_REQUEST_MS": 500,
+    "MAX_QUERIES": 50,
+    "REPEATED_QUERY_COUNT": 10,
+    "TOP_QUERIES": 5,
+}
+
+_current = ContextVar("request_instrumentation", default=None)
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_original_render = DjangoTemplate.render
+_render_patched = False
+
+
+class RequestStats:
+    """Costs collected while one request is being handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.view_started = None
+        self.view_time = 0.0
+
+    def record(self, execute, sql, params, many, context):
+        began = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - began
+            self.queries += 1
+            self.db_time += elapsed
+            entry = self.statements[sql]
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def top_statements(self, limit):
+        """The most repeated statements, with ``IN (...)`` lists of any length folded together."""
+        folded = defaultdict(lambda: [0, 0.0])
+        for sql, (count, elapsed) in self.statements.items():
+            entry = folded[_IN_LIST.sub("IN (...)", sql)]
+            entry[0] += count
+            entry[1] += elapsed
+        ranked = sorted(folded.items(), key=lambda item: (-item[1][0], -item[1][1]))[:limit]
+        return [{"sql": sql, "count": count, "ms": round(elapsed * 1000, 2)} for sql, (count, elapsed) in ranked]
+
+
+def _timed_render(self, context=None, request=None):
+    stats = _current.get()
+    if stats is None:
+        return _original_render(self, context, request)
+    # Templates rendered from inside another template (inclusion tags,
+    # render_to_string in a filter) are already covered by the outer timer.
+    stats.template_depth += 1
+    began = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_time += time.perf_counter() - began
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.record(execute, sql, params, many, context)
+
+
+def _install_query_counter(connection, **kwargs):
+    # Connections belong to a thread, and async requests run their queries in
+    # a worker thread, so every connection carries the counter and finds the
+    # request's stats through the context that thread inherits.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _install_query_counters():
+    for alias in connections:
+        _install_query_counter(connections[alias])
+
+
+def _patch_template_render():
+    global _render_patched
+    if not _render_patched:
+        DjangoTemplate.render = _timed_render
+        _render_patched = True
+
+
+class RequestInstrumentationMiddleware:
+    """Measure what each request costs; list it first in ``MIDDLEWARE`` to include every layer."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.config = {**DEFAULTS, **getattr(settings, "REQUEST_INSTRUMENTATION", {})}
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        _patch_template_render()
+        connection_created.connect(_install_query_counter, dispatch_uid=__name__)
+        _install_query_counters()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        began = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, stats, began)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        began = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, stats, began)
+
+    def _sampled(self):
+        rate = self.config["SAMPLE_RATE"]
+        return rate >= 1 or random.random() < rate
+
+    def _report(self, request, response, stats, began):
+        total = time.perf_counter() - began
+        if stats.view_started is not None:
+            stats.view_time = time.perf_counter() - stats.view_started
+
+        if self.config["SERVER_TIMING"]:
+            self._add_server_timing(response, stats, total)
+        self._log_if_slow(request, response, stats, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # View time runs from here until the response is back in _report(),
+        # so it includes the view, its template and inner response hooks.
+        stats = _current.get()
+        if stats is not None:
+            # In async mode this runs in the thread the view's queries use;
+            # cover its connections if they were opened before the middleware loaded.
+            _install_query_counters()
+            stats.view_started = time.perf_counter()
+
+    def _add_server_timing(self, response, stats, total):
+        metrics = [
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+            f"tpl;dur={stats.template_time * 1000:.1f}",
+            f"view;dur={stats.view_time * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ]
+        existing = response.get("Server-Timing")
+        response["Server-Timing"] = ", ".join(([existing] if existing else []) + metrics)
+
+    def _log_if_slow(self, request, response, stats, total):
+        config = self.config
+        reasons = []
+        if total * 1000 >= config["SLOW_REQUEST_MS"]:
+            reasons.append("slow")
+        if stats.queries >= config["MAX_QUERIES"]:
+            reasons.append("many_queries")
+        # Folding statements costs a regex per distinct query, so only do it
+        # when the request ran enough queries for a repeat to cross the bar.
+        top = stats.top_statements(config["TOP_QUERIES"]) if stats.queries >= config["REPEATED_QUERY_COUNT"] else []
+        if top and top[0]["count"] >= config["REPEATED_QUERY_COUNT"]:
+            reasons.append("repeated_query")
+        if not reasons:
+            return
+        if not top:
+            top = stats.top_statements(config["TOP_QUERIES"])
+        entry = {
+            "event": "slow_request",
+            "reasons": reasons,
+            "method": request.method,
+            "path": request.path,
+            "view": getattr(request.resolver_match, "view_name", None),
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "view_ms": round(stats.view_time * 1000, 2),
+            "template_ms": round(stats.template_time * 1000, 2),
+            "db_ms": round(stats.db_time * 1000, 2),
+            "queries": stats.queries,
+            "top_queries": top,
+        }
+        logger.warning(json.dumps(entry), extra={"request_stats": entry})
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 from django.contrib.messages import constants as messages
@@ -45,7 +46,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Listed first so it sees the cost of every other layer; it removes
+    # itself unless REQUEST_INSTRUMENTATION['ENABLED'] is set.
+    'hotel_management.middleware.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Serves collected static files before sessions and CSRF get involved;
+    # removes itself until collectstatic has filled STATIC_ROOT.
+    'hotel_management.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,8 +61,23 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query/timing instrumentation (see hotel_management/middleware.py).
+# Sampling keeps it cheap enough to leave on in production.
+REQUEST_INSTRUMENTATION = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 1.0,
+    'SLOW_REQUEST_MS': 500,
+    'MAX_QUERIES': 50,
+    'REPEATED_QUERY_COUNT': 10,
+}
+
 ROOT_URLCONF = 'hotel_management.urls'
 
+# Route the public pages to their async views (core/async_views.py,
+# bookings/async_views.py). hotel_management/asgi.py turns this on, so ASGI
+# servers get native async views and WSGI servers keep the synchronous ones.
+ASYNC_VIEWS = os.environ.get('HOTELEASE_ASYNC_VIEWS', '0') == '1'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -77,10 +99,60 @@ WSGI_APPLICATION = 'hotel_management.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite profiles, picked with the HOTELEASE_DB_PROFILE environment variable.
+# "default" is Django's stock configuration. "production" suits a web server
+# handling concurrent requests:
+# - WAL lets readers carry on while one writer commits.
+# - synchronous=NORMAL is still crash-safe under WAL but skips an fsync per commit.
+# - busy_timeout makes a blocked writer wait instead of failing with "database is locked".
+# - cache_size and mmap_size keep hot pages in memory.
+# - IMMEDIATE transactions take the write lock when they start, so a
+#   transaction never fails trying to upgrade a read lock halfway through;
+#   keep write transactions short.
+# - Connections are reused across requests.
+# `manage.py bench_sqlite` compares the two.
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode = WAL;'
+                'PRAGMA synchronous = NORMAL;'
+                'PRAGMA busy_timeout = 5000;'
+                'PRAGMA cache_size = -65536;'
+                'PRAGMA mmap_size = 268435456;'
+                'PRAGMA temp_store = MEMORY;'
+            ),
+        },
+    },
+}
+DB_PROFILE = os.environ.get('HOTELEASE_DB_PROFILE', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('HOTELEASE_DB_NAME') or BASE_DIR / 'db.sqlite3',
+        # A file-backed test database keeps SQLite's normal locking, which the
+        # concurrent booking tests rely on (shared-cache memory DBs lock per table).
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        **SQLITE_PROFILES[DB_PROFILE],
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Page sections are cached per process by default. When running several
+# worker processes, point this at a shared backend (Redis, Memcached) so that
+# invalidations reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hotelease',
     }
 }
 
@@ -123,6 +195,17 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed copies plus gzip/brotli variants and
+# StaticFilesMiddleware serves them (see hotel_management/staticfiles.py).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'hotel_management.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -140,6 +223,12 @@ MESSAGE_TAGS = {
     messages.ERROR: 'alert-danger',
 }
 
+# Outgoing mail is sent by `manage.py run_worker`, never inside a request.
+# Point EMAIL_BACKEND/EMAIL_HOST at a real SMTP server in production.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'HotelEase <no-reply@hotelease.pk>'
+STAFF_NOTIFICATION_EMAILS = ['mursaleenmalik286@gmail.com']
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
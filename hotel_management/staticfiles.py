@@ -0,0 +1,232 @@
+"""Fingerprinted, precompressed static files served by Django itself.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` copies every
+asset to ``STATIC_ROOT`` under a content-hashed name (``styles.3f2a9c1b.css``),
+records the mapping in ``staticfiles.json`` and writes ``.gz`` and, when the
+``brotli`` package is installed, ``.br`` siblings for text assets. ``{% static %}``
+then emits the hashed names, so a changed file always gets a new URL.
+
+``StaticFilesMiddleware`` serves ``STATIC_ROOT`` without a CDN or web server
+in front: it indexes the directory once at startup, answers hashed names with
+a year-long ``immutable`` ``Cache-Control`` and picks the smallest variant the
+client's ``Accept-Encoding`` allows.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".html", ".xml", ".ico"}
+# A compressed variant is only kept if it saves at least this share of the bytes.
+MIN_SAVING = 0.05
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Unhashed names (the originals are collected too) may change on the next deploy.
+REVALIDATE_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+TEXT_TYPES = {"text/css", "text/javascript", "application/javascript", "application/json", "image/svg+xml"}
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """gzip and brotli encodings of ``data`` that are worth serving, keyed by file suffix."""
+    variants = {"gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) <= len(data) * (1 - MIN_SAVING)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """``ManifestStaticFilesStorage`` that also writes ``.gz``/``.br`` variants of text assets.
+
+    Names missing from the manifest (before the first ``collectstatic``, or in
+    tests) fall back to the unhashed name instead of raising.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if Path(name).suffix.lower() not in COMPRESSIBLE_EXTENSIONS or not self.exists(name):
+                continue
+            with self.open(name) as handle:
+                data = handle.read()
+            for suffix, body in compress(data).items():
+                compressed = f"{name}.{suffix}"
+                if self.exists(compressed):
+                    self.delete(compressed)
+                self._save(compressed, ContentFile(body))
+                yield name, compressed, True
+
+
+class StaticFile(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+    content_type: str
+    immutable: bool
+    # Encoding ("br", "gzip") to (path, size).
+    encodings: Dict[str, tuple]
+
+
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _content_type(name: str) -> str:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in TEXT_TYPES:
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+def index_static_root(root, prefix: str) -> Dict[str, StaticFile]:
+    """Map each URL under ``prefix`` to the collected file and its compressed variants."""
+    root = Path(root)
+    manifest = root / ManifestStaticFilesStorage.manifest_name
+    hashed = set()
+    if manifest.exists():
+        hashed = set(json.loads(manifest.read_text()).get("paths", {}).values())
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        present = set(filenames)
+        for filename in filenames:
+            if filename.endswith((".gz", ".br")) and filename[:-3] in present:
+                continue
+            path = os.path.join(directory, filename)
+            name = Path(path).relative_to(root).as_posix()
+            stat = os.stat(path)
+            encodings = {}
+            for encoding, suffix in ENCODING_SUFFIXES:
+                if filename + suffix in present:
+                    encodings[encoding] = (path + suffix, os.stat(path + suffix).st_size)
+            files[prefix + name] = StaticFile(
+                path, stat.st_size, stat.st_mtime, _content_type(filename), name in hashed, encodings
+            )
+    return files
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse ``Accept-Encoding`` into ``{coding: q}``."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(static_file: StaticFile, header: str) -> Optional[str]:
+    """The best precompressed variant the client accepts, or ``None`` for the plain file."""
+    if not static_file.encodings or not header:
+        return None
+    accepted = accepted_encodings(header)
+    for encoding, _ in ENCODING_SUFFIXES:
+        if encoding in static_file.encodings and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class StaticFilesMiddleware:
+    """Serve collected static files with far-future caching and precompressed variants.
+
+    Removes itself when ``STATIC_ROOT`` has not been collected or ``STATIC_URL``
+    points at another host. Works natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        prefix = settings.STATIC_URL or ""
+        root = settings.STATIC_ROOT
+        if not getattr(settings, "SERVE_STATIC_FILES", True) or not prefix.startswith("/") or not root:
+            raise MiddlewareNotUsed
+        if not Path(root).is_dir():
+            raise MiddlewareNotUsed
+        self.prefix = prefix
+        self.files = index_static_root(root, prefix)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        static_file = self.match(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        static_file = self.match(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+        return await self.get_response(request)
+
+    def match(self, request) -> Optional[StaticFile]:
+        if request.path_info.startswith(self.prefix) and request.method in ("GET", "HEAD"):
+            return self.files.get(request.path_info)
+        return None
+
+    def serve(self, request, static_file: StaticFile):
+        encoding = choose_encoding(static_file, request.headers.get("Accept-Encoding", ""))
+        path, size = static_file.encodings[encoding] if encoding else (static_file.path, static_file.size)
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if static_file.immutable else REVALIDATE_CACHE_CONTROL,
+            # Each variant has its own validator, so caches never mix encodings up.
+            "ETag": f'"{int(static_file.mtime):x}-{size:x}{"-" + encoding if encoding else ""}"',
+            "Last-Modified": http_date(static_file.mtime),
+        }
+        if static_file.encodings:
+            headers["Vary"] = "Accept-Encoding"
+        if headers["ETag"] in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        elif request.method == "HEAD":
+            response = HttpResponse(content_type=static_file.content_type)
+            headers["Content-Length"] = str(size)
+        elif self.async_mode:
+            # ASGI would buffer a file iterator through a worker thread anyway;
+            # collected assets are small and usually in the page cache.
+            with open(path, "rb") as handle:
+                response = HttpResponse(handle.read(), content_type=static_file.content_type)
+        else:
+            response = FileResponse(open(path, "rb"), content_type=static_file.content_type)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        for header, value in headers.items():
+            response[header] = value
+        return response
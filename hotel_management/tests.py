@@ -0,0 +1,141 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import path, reverse
+
+from core.models import Review
+
+from .staticfiles import StaticFilesMiddleware
+
+INSTRUMENTED = {"ENABLED": True, "SLOW_REQUEST_MS": 10_000, "MAX_QUERIES": 1_000, "REPEATED_QUERY_COUNT": 5}
+
+
+def reviews_one_by_one(request):
+    """An N+1 loop: one identical statement per review."""
+    pks = Review.objects.values_list("pk", flat=True)
+    return HttpResponse(str(sum(Review.objects.filter(pk=pk, rating=5).exists() for pk in pks)))
+
+
+async def reviews_one_by_one_async(request):
+    pks = [pk async for pk in Review.objects.values_list("pk", flat=True)]
+    return HttpResponse(str(sum([await Review.objects.filter(pk=pk, rating=5).aexists() for pk in pks])))
+
+
+urlpatterns = [
+    path("reviews-one-by-one/", reviews_one_by_one, name="reviews-one-by-one"),
+    path("reviews-one-by-one/async/", reviews_one_by_one_async),
+]
+
+
+class RequestInstrumentationTests(TestCase):
+    def test_disabled_middleware_adds_nothing(self):
+        response = self.client.get(reverse("core:services"))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_INSTRUMENTATION=INSTRUMENTED)
+    def test_server_timing_reports_queries_and_templates(self):
+        response = self.client.get(reverse("core:services"))
+        timing = response["Server-Timing"]
+        for metric in ("db;", "tpl;", "view;", "total;"):
+            self.assertIn(metric, timing)
+        self.assertRegex(timing, r'desc="[1-9]\d* queries"')
+
+    @override_settings(REQUEST_INSTRUMENTATION=INSTRUMENTED, ROOT_URLCONF=__name__)
+    def test_slow_request_log_lists_repeated_statements(self):
+        for index in range(6):
+            Review.objects.create(name=f"Guest {index}", rating=5, comment="Great")
+        with self.assertLogs("hotel_management.requests", "WARNING") as logs:
+            self.client.get("/reviews-one-by-one/")
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["event"], "slow_request")
+        self.assertEqual(entry["reasons"], ["repeated_query"])
+        self.assertEqual(entry["view"], "reviews-one-by-one")
+        self.assertEqual(entry["top_queries"][0]["count"], 6)
+        self.assertIn('"core_review"', entry["top_queries"][0]["sql"])
+
+    @override_settings(REQUEST_INSTRUMENTATION=INSTRUMENTED, ROOT_URLCONF=__name__)
+    async def test_async_requests_are_measured_too(self):
+        for index in range(6):
+            await Review.objects.acreate(name=f"Guest {index}", rating=5, comment="Great")
+        with self.assertLogs("hotel_management.requests", "WARNING") as logs:
+            response = await self.async_client.get("/reviews-one-by-one/async/")
+        self.assertRegex(response["Server-Timing"], r'desc="7 queries"')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["top_queries"][0]["count"], 6)
+
+    @override_settings(REQUEST_INSTRUMENTATION={**INSTRUMENTED, "SAMPLE_RATE": 0})
+    def test_unsampled_requests_pass_through(self):
+        response = self.client.get(reverse("core:services"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class StaticFilesPipelineTests(SimpleTestCase):
+    def setUp(self):
+        source = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        (source / "css").mkdir()
+        (source / "css" / "site.css").write_text("body { color: #123456; }\n" * 200)
+        self.enterContext(override_settings(
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATIC_ROOT=self.root,
+        ))
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.url = static("css/site.css")
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse("app"))
+
+    def get(self, url, **headers):
+        return self.middleware(RequestFactory().get(url, headers=headers))
+
+    def test_collectstatic_writes_hashed_and_compressed_copies(self):
+        self.assertRegex(self.url, r"^/static/css/site\.[0-9a-f]{12}\.css$")
+        hashed = self.root / self.url.removeprefix("/static/")
+        self.assertLess((self.root / f"{hashed}.gz").stat().st_size, hashed.stat().st_size)
+        self.assertTrue((self.root / f"{hashed}.br").exists())
+
+    def test_serves_best_accepted_encoding_with_immutable_caching(self):
+        response = self.get(self.url, accept_encoding="gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(self.get(self.url, accept_encoding="br;q=0, gzip")["Content-Encoding"], "gzip")
+        plain = self.get(self.url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(plain.streaming_content), ("body { color: #123456; }\n" * 200).encode())
+
+    def test_etag_revalidation_and_fallthrough(self):
+        etag = self.get(self.url, accept_encoding="gzip")["ETag"]
+        self.assertEqual(self.get(self.url, accept_encoding="gzip", if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(self.url, accept_encoding="br", if_none_match=etag).status_code, 200)
+        self.assertIn("must-revalidate", self.get("/static/css/site.css")["Cache-Control"])
+        self.assertEqual(self.get("/static/css/missing.css").content, b"app")
+
+
+class SqliteProfileTests(SimpleTestCase):
+    def test_production_profile_applies_pragmas_and_immediate_transactions(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        handler = ConnectionHandler({
+            "default": {},
+            "profile": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(Path(directory) / "profile.sqlite3"),
+                **settings.SQLITE_PROFILES["production"],
+            }
+        })
+        connection = handler["profile"]
+        self.addCleanup(connection.close)
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for pragma in ("journal_mode", "synchronous", "busy_timeout"):
+                cursor.execute(f"PRAGMA {pragma}")
+                pragmas[pragma] = cursor.fetchone()[0]
+        self.assertEqual(pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000})
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+        self.assertEqual(connection.settings_dict["CONN_MAX_AGE"], 600)
@@ -1,19 +1,24 @@
 document.addEventListener("DOMContentLoaded", () => {
-    const ratesScript = document.getElementById("room-rates-data");
+    const quotesScript = document.getElementById("room-quotes-data");
     const summaryCard = document.getElementById("bookingSummary");
-    if (!ratesScript || !summaryCard) {
+    if (!quotesScript || !summaryCard) {
         return;
     }
 
-    const rateMap = JSON.parse(ratesScript.textContent || "{}");
+    // Room rent per type and stay length for one check-in date, priced by the server.
+    const formQuotes = JSON.parse(quotesScript.textContent || "{}");
     const airportCharge = Number(summaryCard.dataset.airportCharge || 0);
+    const quoteUrl = summaryCard.dataset.quoteUrl;
+    const availabilityUrl = summaryCard.dataset.availabilityUrl;
 
     const roomTypeField = document.getElementById("id_room_type");
+    const checkInField = document.getElementById("id_check_in");
     const daysField = document.getElementById("id_booking_days");
     const airportField = document.getElementById("id_airport_pick_drop");
 
     const summaryRoomType = document.getElementById("summaryRoomType");
     const summaryDays = document.getElementById("summaryDays");
+    const summaryAvailability = document.getElementById("summaryAvailability");
     const summaryRoomRent = document.getElementById("summaryRoomRent");
     const summaryAirport = document.getElementById("summaryAirport");
     const summaryTotal = document.getElementById("summaryTotal");
@@ -22,9 +27,82 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const formatCurrency = (value) => `Rs. ${currencyFormatter.format(value)}`;
 
+    // Only the latest lookup may update the summary; older responses are dropped.
+    let quoteRequest = 0;
+    let availabilityRequest = 0;
+
+    function fetchJson(url, params) {
+        const query = new URLSearchParams(params).toString();
+        return fetch(`${url}?${query}`, { headers: { Accept: "application/json" } }).then((response) => {
+            if (!response.ok) {
+                throw new Error(`Request failed with status ${response.status}`);
+            }
+            return response.json();
+        });
+    }
+
+    function showPrices(roomRent, airportFee, total) {
+        if (summaryRoomRent) {
+            summaryRoomRent.textContent = roomRent === null ? "…" : formatCurrency(roomRent);
+        }
+        if (summaryAirport) {
+            summaryAirport.textContent = formatCurrency(airportFee);
+        }
+        if (summaryTotal) {
+            summaryTotal.textContent = total === null ? "…" : formatCurrency(total);
+        }
+    }
+
+    function seededRent(roomType, days) {
+        const checkIn = checkInField && checkInField.value ? checkInField.value : formQuotes.check_in;
+        const rents = checkIn === formQuotes.check_in && formQuotes.room_rent ? formQuotes.room_rent[roomType] : null;
+        return rents && rents.length >= days ? rents[days - 1] : null;
+    }
+
+    function refreshQuote(roomType, days, includeAirport) {
+        if (!quoteUrl || !roomType) return;
+        const params = { room_type: roomType, nights: days, airport: includeAirport ? "1" : "" };
+        if (checkInField && checkInField.value) {
+            params.check_in = checkInField.value;
+        }
+        const requestId = ++quoteRequest;
+        fetchJson(quoteUrl, params)
+            .then((quote) => {
+                if (requestId === quoteRequest) {
+                    showPrices(quote.room_rent, quote.airport_charge, quote.total);
+                }
+            })
+            .catch(() => {
+                // Keep the figures already shown.
+            });
+    }
+
+    function refreshAvailability(roomType, days) {
+        if (!availabilityUrl || !summaryAvailability) return;
+        const params = {};
+        if (checkInField && checkInField.value) {
+            const checkIn = new Date(`${checkInField.value}T00:00:00Z`);
+            if (!Number.isNaN(checkIn.getTime())) {
+                const checkOut = new Date(checkIn.getTime() + days * 86400000);
+                params.check_in = checkInField.value;
+                params.check_out = checkOut.toISOString().slice(0, 10);
+            }
+        }
+        const requestId = ++availabilityRequest;
+        fetchJson(availabilityUrl, params)
+            .then((data) => {
+                if (requestId !== availabilityRequest) return;
+                const match = data.room_types.find((entry) => entry.code === roomType);
+                const available = match ? match.available : 0;
+                summaryAvailability.textContent = available === 1 ? "1 room free" : `${available} rooms free`;
+            })
+            .catch(() => {
+                summaryAvailability.textContent = "—";
+            });
+    }
+
     function calculateTotal() {
         const roomType = roomTypeField ? roomTypeField.value : null;
-        const nightlyRate = rateMap[roomType] || 0;
         let days = Number(daysField?.value || 1);
         if (Number.isNaN(days)) {
             days = 1;
@@ -35,9 +113,9 @@ document.addEventListener("DOMContentLoaded", () => {
         }
         const includeAirport = airportField?.checked;
 
-        const baseRent = nightlyRate * days;
+        // Other check-in dates wait for the quote API rather than guess.
+        const baseRent = seededRent(roomType, days);
         const airportFee = includeAirport ? airportCharge : 0;
-        const total = baseRent + airportFee;
 
         if (summaryRoomType) {
             const selectedOption = roomTypeField?.options[roomTypeField.selectedIndex];
@@ -46,20 +124,14 @@ document.addEventListener("DOMContentLoaded", () => {
         if (summaryDays) {
             summaryDays.textContent = days === 1 ? "1 night" : `${days} nights`;
         }
-        if (summaryRoomRent) {
-            summaryRoomRent.textContent = formatCurrency(baseRent);
-        }
-        if (summaryAirport) {
-            summaryAirport.textContent = formatCurrency(airportFee);
-        }
-        if (summaryTotal) {
-            summaryTotal.textContent = formatCurrency(total);
-        }
+        showPrices(baseRent, airportFee, baseRent === null ? null : baseRent + airportFee);
+        refreshQuote(roomType, days, includeAirport);
+        refreshAvailability(roomType, days);
     }
 
-    [roomTypeField, daysField, airportField].forEach((field) => {
+    [roomTypeField, checkInField, daysField, airportField].forEach((field) => {
         if (!field) return;
-        const eventName = field.type === "checkbox" ? "change" : "input";
+        const eventName = field.type === "checkbox" || field.type === "date" ? "change" : "input";
         field.addEventListener(eventName, calculateTotal);
     });
 
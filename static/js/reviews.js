@@ -0,0 +1,117 @@
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("[data-load-more]").forEach((button) => {
+        const list = document.getElementById(button.dataset.loadMore);
+        if (!list) {
+            return;
+        }
+
+        const feedUrl = list.dataset.feedUrl;
+        const variant = list.dataset.variant || "full";
+        let nextCursor = list.dataset.nextCursor;
+        let loading = false;
+
+        const element = (tag, className, text) => {
+            const node = document.createElement(tag);
+            if (className) {
+                node.className = className;
+            }
+            if (text) {
+                node.textContent = text;
+            }
+            return node;
+        };
+
+        const stars = (rating, className) => {
+            const wrapper = element("div", className);
+            for (let star = 1; star <= 5; star += 1) {
+                wrapper.appendChild(element("i", star <= rating ? "fa-solid fa-star" : "fa-regular fa-star"));
+            }
+            return wrapper;
+        };
+
+        function fullCard(review) {
+            const column = element("div", "col-md-6 col-xl-4");
+            const card = element("div", "card border-0 shadow-sm h-100");
+            const body = element("div", "card-body");
+            const header = element("div", "d-flex align-items-center mb-3");
+            const avatar = element("div", "avatar rounded-circle bg-primary text-white d-flex align-items-center justify-content-center me-3");
+            if (review.photo) {
+                const img = element("img", "rounded-circle");
+                img.src = review.photo;
+                img.alt = review.name;
+                img.width = 56;
+                img.height = 56;
+                avatar.appendChild(img);
+            } else {
+                avatar.appendChild(element("span", "fw-semibold", review.name.charAt(0).toUpperCase()));
+            }
+            const who = element("div");
+            who.appendChild(element("h3", "h6 mb-1", review.name));
+            if (review.location) {
+                who.appendChild(element("p", "small text-muted mb-0", review.location));
+            }
+            header.append(avatar, who, stars(review.rating, "ms-auto text-warning"));
+            body.append(
+                header,
+                element("p", "text-muted", review.comment),
+                element("p", "small text-muted mb-0", `Stayed ${review.stayed}`)
+            );
+            card.appendChild(body);
+            column.appendChild(card);
+            return column;
+        }
+
+        function compactCard(review) {
+            const column = element("div", "col-sm-6");
+            const card = element("div", "card border-0 shadow-sm h-100");
+            const body = element("div", "card-body");
+            const header = element("div", "d-flex align-items-center justify-content-between mb-3");
+            const who = element("div");
+            who.append(element("h3", "h6 fw-semibold mb-1", review.name), stars(review.rating, "text-warning small"));
+            header.append(who, element("span", "badge bg-light text-muted", review.posted));
+            body.append(header, element("p", "text-muted small mb-0", `“${review.comment}”`));
+            card.appendChild(body);
+            column.appendChild(card);
+            return column;
+        }
+
+        async function loadMore() {
+            if (loading || !nextCursor) {
+                return;
+            }
+            loading = true;
+            button.disabled = true;
+            try {
+                const response = await fetch(`${feedUrl}?cursor=${encodeURIComponent(nextCursor)}`, {
+                    headers: { Accept: "application/json" },
+                });
+                if (!response.ok) {
+                    throw new Error(`Feed request failed with ${response.status}`);
+                }
+                const page = await response.json();
+                const render = variant === "compact" ? compactCard : fullCard;
+                page.results.forEach((review) => list.appendChild(render(review)));
+                nextCursor = page.next;
+            } catch (error) {
+                console.error(error);
+            } finally {
+                loading = false;
+                button.disabled = false;
+                if (!nextCursor) {
+                    button.parentElement.remove();
+                    observer.disconnect();
+                }
+            }
+        }
+
+        // Fetch the next page as the button scrolls into view; the button
+        // itself remains as a fallback for keyboard and no-observer browsers.
+        const observer = new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+                loadMore();
+            }
+        }, { rootMargin: "400px" });
+        observer.observe(button);
+        button.addEventListener("click", loadMore);
+    });
+});